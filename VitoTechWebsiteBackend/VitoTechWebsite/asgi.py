@@ -3,6 +3,14 @@ ASGI config for VitoTechWebsite project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The regular API is served by gunicorn through wsgi.py. This application
+serves the long-lived dashboard event stream (/api/notifications/events/,
+see notifications/events.py), where each open connection is a coroutine
+rather than a worker:
+
+    gunicorn VitoTechWebsite.asgi:application -k uvicorn.workers.UvicornWorker \
+        --bind 0.0.0.0:8001
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,146 @@
+# VitoTechWebsite/profiling.py
+"""
+Opt-in per-request profiling (``REQUEST_PROFILING=True``).
+
+``ProfilingMiddleware`` wraps every database connection with
+``connection.execute_wrapper`` for the length of a request and records each
+query's SQL and duration. Code can time its own sections with ``timed()``;
+the notifications API times request parsing, serialization and
+``perform_create``. At the end of the request the totals go out as a
+``Server-Timing`` header (visible in the browser's network panel) and as one
+JSON log line on the ``VitoTechWebsite.profiling`` logger, at WARNING level
+when the request ran a slow query (``REQUEST_PROFILING_SLOW_QUERY_MS``) or
+the same statement ``REQUEST_PROFILING_N_PLUS_ONE`` times or more -- the
+usual sign of an N+1 loop.
+
+When profiling is off the middleware raises ``MiddlewareNotUsed`` and drops
+out of the stack, and ``timed()`` is one context-variable lookup.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager, nullcontext
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("VitoTechWebsite.profiling")
+
+_current: contextvars.ContextVar[RequestProfile | None] = contextvars.ContextVar(
+    "request_profile", default=None
+)
+_NOT_PROFILING = nullcontext()
+
+
+class RequestProfile:
+    def __init__(self, slow_query_ms: float, n_plus_one: int):
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one = n_plus_one
+        self.started = time.perf_counter()
+        # name -> seconds; a section timed more than once adds up.
+        self.sections: dict[str, float] = {}
+        # (alias, sql, seconds) per query, in execution order.
+        self.queries: list[tuple[str, str, float]] = []
+
+    @contextmanager
+    def section(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections[name] = self.sections.get(name, 0.0) + time.perf_counter() - started
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                (context["connection"].alias, sql, time.perf_counter() - started)
+            )
+
+    @property
+    def db_time(self) -> float:
+        return sum(seconds for _, _, seconds in self.queries)
+
+    def repeated_queries(self) -> list[tuple[str, int]]:
+        """
+        Statements run at least ``n_plus_one`` times. Django hands the
+        wrapper SQL with placeholders, so repeats differ only in params.
+        """
+        counts = Counter(sql for _, sql, _ in self.queries)
+        return [(sql, count) for sql, count in counts.most_common() if count >= self.n_plus_one]
+
+    def slow_queries(self) -> list[tuple[str, float]]:
+        limit = self.slow_query_ms / 1000
+        return [(sql, seconds) for _, sql, seconds in self.queries if seconds >= limit]
+
+    def server_timing(self, total: float) -> str:
+        metrics = [f'db;dur={self.db_time * 1000:.1f};desc="{len(self.queries)} queries"']
+        metrics += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.sections.items()]
+        metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def as_dict(self, request, response, total: float) -> dict:
+        return {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 1),
+            "db_ms": round(self.db_time * 1000, 1),
+            "queries": len(self.queries),
+            "sections_ms": {
+                name: round(seconds * 1000, 1) for name, seconds in self.sections.items()
+            },
+            "repeated_queries": [
+                {"sql": sql, "count": count} for sql, count in self.repeated_queries()
+            ],
+            "slow_queries": [
+                {"sql": sql, "ms": round(seconds * 1000, 1)}
+                for sql, seconds in self.slow_queries()
+            ],
+        }
+
+
+def timed(name: str):
+    """Time a section of the current request (a no-op when not profiling)."""
+    profile = _current.get()
+    return _NOT_PROFILING if profile is None else profile.section(name)
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = RequestProfile(
+            slow_query_ms=float(getattr(settings, "REQUEST_PROFILING_SLOW_QUERY_MS", 100)),
+            n_plus_one=int(getattr(settings, "REQUEST_PROFILING_N_PLUS_ONE", 5)),
+        )
+        token = _current.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total = time.perf_counter() - profile.started
+        response["Server-Timing"] = profile.server_timing(total)
+        record = profile.as_dict(request, response, total)
+        level = (
+            logging.WARNING
+            if record["repeated_queries"] or record["slow_queries"]
+            else logging.INFO
+        )
+        logger.log(level, json.dumps(record), extra={"profile": record})
+        return response
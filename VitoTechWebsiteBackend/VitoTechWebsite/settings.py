@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 
 # ====== MIDDLEWARE ======
 MIDDLEWARE = [
+    # Drops itself out unless REQUEST_PROFILING is on (see PROFILING below).
+    "VitoTechWebsite.profiling.ProfilingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -51,6 +53,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Drops itself out unless DB_REPLICA_HOST is set (see READ REPLICA below).
+    "notifications.replica.ReadYourWritesMiddleware",
 ]
 
 ROOT_URLCONF = "VitoTechWebsite.urls"
@@ -76,6 +80,19 @@ WSGI_APPLICATION = "VitoTechWebsite.wsgi.application"
 
 # ====== DATABASE ======
 DB_ENGINE = os.environ.get("DB_ENGINE", "django.db.backends.sqlite3")
+# Also postgresql_psycopg2 and custom backends built on Django's.
+DB_IS_POSTGRESQL = "postgresql" in DB_ENGINE
+
+# SQLITE_TUNED: WAL, busy_timeout and BEGIN IMMEDIATE for several workers
+# sharing the file (see VitoTechWebsite/sqlite3). SQLITE_SERIALIZED_WRITES
+# additionally queues every writer on one lock.
+SQLITE_TUNED = os.environ.get("SQLITE_TUNED", "False").lower() == "true"
+SQLITE_SERIALIZED_WRITES = (
+    os.environ.get("SQLITE_SERIALIZED_WRITES", "False").lower() == "true"
+)
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(128 * 2**20)))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", "20000"))
 
 if DB_ENGINE == "django.db.backends.sqlite3":
     DATABASES = {
@@ -84,6 +101,9 @@ if DB_ENGINE == "django.db.backends.sqlite3":
             "NAME": os.environ.get("DB_NAME", BASE_DIR / "db.sqlite3"),
         }
     }
+    if SQLITE_TUNED:
+        DATABASES["default"]["ENGINE"] = "VitoTechWebsite.sqlite3"
+        DATABASES["default"]["OPTIONS"] = {"transaction_mode": "IMMEDIATE"}
 else:
     DATABASES = {
         "default": {
@@ -96,6 +116,85 @@ else:
         }
     }
 
+# Keep connections open between requests (seconds; 0 closes after every
+# request) and check them before reuse, so a restarted database costs one
+# failed check instead of a 500. Only PostgreSQL does so by default: an
+# SQLite connection is a file open, not a network handshake.
+DATABASES["default"]["CONN_MAX_AGE"] = int(
+    os.environ.get("DB_CONN_MAX_AGE", "60" if DB_IS_POSTGRESQL else "0")
+)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = (
+    os.environ.get("DB_CONN_HEALTH_CHECKS", "True").lower() == "true"
+)
+
+# DB_POOL: psycopg 3 connection pool per worker process (PostgreSQL only).
+# Size it so DB_POOL_MAX_SIZE x gunicorn workers stays under the server's
+# max_connections, and at least the worker's thread count.
+DB_POOL = os.environ.get("DB_POOL", "False").lower() == "true"
+if DB_POOL and DB_IS_POSTGRESQL:
+    # Pooled connections go back to the pool at the end of each request;
+    # Django refuses CONN_MAX_AGE alongside a pool.
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        }
+    }
+
+# ====== READ REPLICA ======
+# DB_REPLICA_HOST: a streaming replica for the admin's list, retrieve,
+# stats and export reads (notifications/replica.py). The other DB_REPLICA_*
+# connection settings default to the primary's.
+DB_REPLICA_HOST = os.environ.get("DB_REPLICA_HOST")
+if DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": DB_REPLICA_HOST,
+        "PORT": os.environ.get("DB_REPLICA_PORT", DATABASES["default"].get("PORT", "")),
+        "USER": os.environ.get("DB_REPLICA_USER", DATABASES["default"].get("USER", "")),
+        "PASSWORD": os.environ.get(
+            "DB_REPLICA_PASSWORD", DATABASES["default"].get("PASSWORD", "")
+        ),
+        # Tests run against default only.
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_ROUTERS = ["notifications.replica.ReplicaRouter"]
+# Fall back to default when the replica is further behind than this
+# (seconds), checked at most every DB_REPLICA_LAG_CHECK_INTERVAL per worker.
+DB_REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", "2"))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get("DB_REPLICA_LAG_CHECK_INTERVAL", "5"))
+# Staff clients whose writes succeeded read from default for this long
+# (read-your-writes).
+DB_REPLICA_PIN_SECONDS = float(os.environ.get("DB_REPLICA_PIN_SECONDS", "5"))
+
+# ====== CACHE ======
+# CACHE_BACKEND: locmem (default, per process), file (shared by every
+# worker on the host), dummy (no caching) or a full backend dotted path.
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "dummy": "django.core.cache.backends.dummy.DummyCache",
+}
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS.get(CACHE_BACKEND, CACHE_BACKEND),
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION",
+            str(BASE_DIR / "cache") if CACHE_BACKEND == "file" else "vitotech",
+        ),
+    }
+}
+
+# Admin list/retrieve/stats responses, invalidated on every write
+# (notifications/cache.py). With several workers use a shared backend.
+NOTIFICATIONS_RESPONSE_CACHE = (
+    os.environ.get("NOTIFICATIONS_RESPONSE_CACHE", "True").lower() == "true"
+)
+NOTIFICATIONS_CACHE_TIMEOUT = int(os.environ.get("NOTIFICATIONS_CACHE_TIMEOUT", "300"))
+
 # ====== PASSWORD VALIDATION ======
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -130,6 +229,24 @@ STATICFILES_DIRS = [
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+# Prefix of the nginx internal location that aliases MEDIA_ROOT; attachment
+# downloads then hand the transfer to nginx (X-Accel-Redirect). Empty:
+# Django streams the file itself.
+NOTIFICATIONS_ACCEL_REDIRECT = os.environ.get("NOTIFICATIONS_ACCEL_REDIRECT", "")
+
+# Attachments are stored once per distinct content and reference counted
+# (see notifications/storage.py).
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+    "attachments": {
+        "BACKEND": "notifications.storage.ContentAddressedStorage",
+    },
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -142,6 +259,9 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # Proxies in front of Django (nginx). Throttles take the client IP from
+    # that far along X-Forwarded-For, so clients can't spoof their own.
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", "1")),
 }
 
 SPECTACULAR_SETTINGS = {
@@ -160,6 +280,7 @@ EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "False").lower() == "true"
 EMAIL_USE_SSL = os.environ.get("EMAIL_USE_SSL", "True").lower() == "true"
 EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "info@vitohub.org")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
+EMAIL_TIMEOUT = int(os.environ.get("EMAIL_TIMEOUT", "30"))
 
 DEFAULT_FROM_EMAIL = os.environ.get(
     "DEFAULT_FROM_EMAIL",
@@ -172,6 +293,26 @@ NOTIFICATIONS_DEFAULT_RECIPIENT = os.environ.get(
     EMAIL_HOST_USER or "info@vitohub.org",
 )
 
+# ====== EMAIL OUTBOX ======
+# E-mails za contact form zinapita kwenye outbox; `manage.py deliver_emails`
+# ndiyo inazituma.
+NOTIFICATIONS_OUTBOX_BATCH_SIZE = int(os.environ.get("NOTIFICATIONS_OUTBOX_BATCH_SIZE", "20"))
+NOTIFICATIONS_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("NOTIFICATIONS_OUTBOX_MAX_ATTEMPTS", "8"))
+NOTIFICATIONS_OUTBOX_RETRY_BASE_SECONDS = int(
+    os.environ.get("NOTIFICATIONS_OUTBOX_RETRY_BASE_SECONDS", "30")
+)
+NOTIFICATIONS_OUTBOX_RETRY_MAX_SECONDS = int(
+    os.environ.get("NOTIFICATIONS_OUTBOX_RETRY_MAX_SECONDS", "3600")
+)
+NOTIFICATIONS_OUTBOX_LEASE_SECONDS = int(os.environ.get("NOTIFICATIONS_OUTBOX_LEASE_SECONDS", "600"))
+
+# Connections za SMTP zinazobaki wazi (logged in) kati ya batches
+NOTIFICATIONS_MAIL_POOL_SIZE = int(os.environ.get("NOTIFICATIONS_MAIL_POOL_SIZE", "2"))
+NOTIFICATIONS_MAIL_POOL_MAX_IDLE = int(os.environ.get("NOTIFICATIONS_MAIL_POOL_MAX_IDLE", "50"))
+NOTIFICATIONS_MAIL_POOL_MAX_LIFETIME = int(
+    os.environ.get("NOTIFICATIONS_MAIL_POOL_MAX_LIFETIME", "300")
+)
+
 # ====== CSRF TRUSTED ORIGINS ======
 _raw_trusted = os.environ.get("DJANGO_CSRF_TRUSTED_ORIGINS", "")
 if _raw_trusted:
@@ -189,10 +330,62 @@ CORS_ALLOWED_ORIGINS = [
     "https://vitohub.org",
 ]
 
+# ====== THROTTLING ======
+# Token buckets in front of the public contact form
+# (notifications/throttling.py): BURST requests at once, refilled at
+# PER_MINUTE. Kept in the cache, so use a shared CACHE_BACKEND with
+# several workers.
+NOTIFICATIONS_THROTTLE = os.environ.get("NOTIFICATIONS_THROTTLE", "True").lower() == "true"
+NOTIFICATIONS_THROTTLE_IP_BURST = int(os.environ.get("NOTIFICATIONS_THROTTLE_IP_BURST", "5"))
+NOTIFICATIONS_THROTTLE_IP_RATE = (
+    float(os.environ.get("NOTIFICATIONS_THROTTLE_IP_PER_MINUTE", "1")) / 60
+)
+NOTIFICATIONS_THROTTLE_GLOBAL_BURST = int(
+    os.environ.get("NOTIFICATIONS_THROTTLE_GLOBAL_BURST", "60")
+)
+NOTIFICATIONS_THROTTLE_GLOBAL_RATE = (
+    float(os.environ.get("NOTIFICATIONS_THROTTLE_GLOBAL_PER_MINUTE", "60")) / 60
+)
+# A contact form submission with the same e-mail, message and attachment as
+# one received this many seconds earlier returns that message instead.
+NOTIFICATIONS_DUPLICATE_WINDOW = int(os.environ.get("NOTIFICATIONS_DUPLICATE_WINDOW", "600"))
+
+# ====== PROFILING ======
+# Server-Timing header and one JSON log line per request with query count,
+# DB time and parse/serialize/perform_create times (VitoTechWebsite/profiling.py).
+REQUEST_PROFILING = os.environ.get("REQUEST_PROFILING", "False").lower() == "true"
+REQUEST_PROFILING_SLOW_QUERY_MS = float(os.environ.get("REQUEST_PROFILING_SLOW_QUERY_MS", "100"))
+# The same statement this many times in one request is flagged as N+1.
+REQUEST_PROFILING_N_PLUS_ONE = int(os.environ.get("REQUEST_PROFILING_N_PLUS_ONE", "5"))
+
+# ====== EVENT STREAM ======
+# /api/notifications/events/ (notifications/events.py), served by the ASGI
+# app. One poll of the event log per process every POLL_INTERVAL seconds.
+NOTIFICATIONS_EVENT_POLL_INTERVAL = float(
+    os.environ.get("NOTIFICATIONS_EVENT_POLL_INTERVAL", "1")
+)
+NOTIFICATIONS_EVENT_KEEPALIVE = float(os.environ.get("NOTIFICATIONS_EVENT_KEEPALIVE", "15"))
+# Newest events kept for Last-Event-ID resume; older resumes get "reset".
+NOTIFICATIONS_EVENT_RETENTION = int(os.environ.get("NOTIFICATIONS_EVENT_RETENTION", "1000"))
+# Longest a single stream stays open (it also ends when its token expires).
+NOTIFICATIONS_EVENT_MAX_STREAM = int(os.environ.get("NOTIFICATIONS_EVENT_MAX_STREAM", "3600"))
+# Seconds a ticket from POST /api/notifications/event_ticket/ can open a stream.
+NOTIFICATIONS_EVENT_TICKET_TTL = int(os.environ.get("NOTIFICATIONS_EVENT_TICKET_TTL", "30"))
+
+# ====== EXPORT ======
+# Rows fetched per round trip by /api/notifications/export/.
+NOTIFICATIONS_EXPORT_CHUNK_SIZE = int(os.environ.get("NOTIFICATIONS_EXPORT_CHUNK_SIZE", "2000"))
+
 # ====== UPLOAD LIMITS ======
 MAX_UPLOAD_SIZE = int(os.environ.get("MAX_UPLOAD_SIZE", "5242880"))
+# The contact form streams attachments to disk through
+# notifications.uploads.StreamingAttachmentUploadHandler, which enforces
+# MAX_UPLOAD_SIZE per file while reading; these cover everything else.
 FILE_UPLOAD_MAX_MEMORY_SIZE = MAX_UPLOAD_SIZE
 DATA_UPLOAD_MAX_MEMORY_SIZE = MAX_UPLOAD_SIZE
+# Attachment files freed by bulk deletes are removed this many at a time,
+# in a background thread after the DELETE commits.
+NOTIFICATIONS_PURGE_BATCH_SIZE = int(os.environ.get("NOTIFICATIONS_PURGE_BATCH_SIZE", "200"))
 
 # ====== PRODUCTION SECURITY HARDENING ======
 if not DEBUG:
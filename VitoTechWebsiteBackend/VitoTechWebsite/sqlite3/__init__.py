@@ -0,0 +1,107 @@
+# VitoTechWebsite/sqlite3/__init__.py
+"""
+SQLite backend for running several gunicorn workers against one database
+file (``SQLITE_TUNED=True``; settings then use ``VitoTechWebsite.sqlite3``
+as the ENGINE).
+
+Each new connection is tuned by a ``connection_created`` hook:
+
+- ``journal_mode=WAL``: readers and the writer no longer block each other.
+- ``busy_timeout``: a writer waits ``SQLITE_BUSY_TIMEOUT_MS`` for the write
+  lock instead of failing with "database is locked".
+- ``synchronous=NORMAL``: safe with WAL; fsync at checkpoints, not on every
+  commit.
+- ``mmap_size`` / ``cache_size``: ``SQLITE_MMAP_SIZE`` bytes and
+  ``SQLITE_CACHE_SIZE_KB`` KiB of page cache per connection.
+
+Transactions start with ``BEGIN IMMEDIATE`` (the ``transaction_mode``
+option), so a transaction takes the write lock up front. Under the default
+deferred mode it would start as a reader and fail to upgrade later, and
+``busy_timeout`` does not help in that case.
+
+With ``SQLITE_SERIALIZED_WRITES=True``, transactions and autocommit writes
+also wait for a single writer lock: a lock file next to the database for
+other processes, plus a thread lock inside each process. Writers then queue
+in turn instead of polling SQLite's busy handler. Autocommit reads never
+take the lock.
+
+WAL mode is stored in the database file and adds ``-wal``/``-shm`` files
+next to it.
+"""
+from __future__ import annotations
+
+import os
+import threading
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process, thread lock only
+    fcntl = None
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "DROP", "ALTER")
+
+
+def configure_connection(sender, connection, **kwargs):
+    """``connection_created`` hook: per-connection PRAGMAs."""
+    busy_timeout = int(getattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 5000))
+    mmap_size = int(getattr(settings, "SQLITE_MMAP_SIZE", 128 * 2**20))
+    cache_size = int(getattr(settings, "SQLITE_CACHE_SIZE_KB", 20000))
+    raw = connection.connection
+    raw.execute("PRAGMA journal_mode=WAL")
+    raw.execute(f"PRAGMA busy_timeout={busy_timeout}")
+    raw.execute("PRAGMA synchronous=NORMAL")
+    raw.execute(f"PRAGMA mmap_size={mmap_size}")
+    # Negative: size in KiB rather than pages.
+    raw.execute(f"PRAGMA cache_size=-{cache_size}")
+
+
+def is_write(sql: str) -> bool:
+    return sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS)
+
+
+class WriteLock:
+    """One writer at a time, across threads and (with ``path``) processes."""
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self.path is None or fcntl is None:
+            return
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def release(self):
+        try:
+            if self._file is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+        finally:
+            self._thread_lock.release()
+
+
+_locks: dict[tuple[int, str | None], WriteLock] = {}
+_locks_guard = threading.Lock()
+
+
+def write_lock(database: str | None) -> WriteLock:
+    """
+    The writer lock for a database file (``None``: in-memory, this process
+    only). Keyed by pid: a lock file opened before a fork would be shared
+    with the children and exclude none of them.
+    """
+    path = f"{database}.write-lock" if database else None
+    key = (os.getpid(), path)
+    with _locks_guard:
+        if key not in _locks:
+            _locks[key] = WriteLock(path)
+        return _locks[key]
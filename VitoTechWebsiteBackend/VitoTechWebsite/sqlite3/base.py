@@ -0,0 +1,76 @@
+# VitoTechWebsite/sqlite3/base.py
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.backends.sqlite3 import base
+
+from . import configure_connection, is_write, write_lock
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._holding_write_lock = False
+        # First in line, so execute_wrapper() blocks entered before this
+        # connection opened still pop their own wrapper.
+        self.execute_wrappers.insert(0, self._serialize_autocommit_write)
+
+    def _serialized(self) -> bool:
+        return getattr(settings, "SQLITE_SERIALIZED_WRITES", False)
+
+    def _write_lock(self):
+        return write_lock(None if self.is_in_memory_db() else str(self.settings_dict["NAME"]))
+
+    def _release_write_lock(self):
+        if self._holding_write_lock:
+            self._holding_write_lock = False
+            self._write_lock().release()
+
+    def _start_transaction_under_autocommit(self):
+        if self._serialized() and not self._holding_write_lock:
+            self._write_lock().acquire()
+            self._holding_write_lock = True
+        try:
+            super()._start_transaction_under_autocommit()
+        except BaseException:
+            self._release_write_lock()
+            raise
+
+    def _commit(self):
+        try:
+            super()._commit()
+        finally:
+            self._release_write_lock()
+
+    def _rollback(self):
+        try:
+            super()._rollback()
+        finally:
+            self._release_write_lock()
+
+    def _close(self):
+        try:
+            super()._close()
+        finally:
+            self._release_write_lock()
+
+    def _serialize_autocommit_write(self, execute, sql, params, many, context):
+        if (
+            self._holding_write_lock
+            or self.in_atomic_block
+            or not self._serialized()
+            or not is_write(sql)
+        ):
+            return execute(sql, params, many, context)
+        lock = self._write_lock()
+        lock.acquire()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            lock.release()
+
+
+connection_created.connect(
+    configure_connection,
+    sender=DatabaseWrapper,
+    dispatch_uid="VitoTechWebsite.sqlite3.configure_connection",
+)
@@ -0,0 +1,139 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings for the backend (``gunicorn -c gunicorn.conf.py
+VitoTechWebsite.wsgi:application``).
+
+Workers and threads are sized from the CPUs and memory the container is
+actually allowed (cgroup limits, not the host's), unless GUNICORN_WORKERS /
+GUNICORN_THREADS say otherwise. Threaded workers keep one slow upload from
+holding a whole process.
+
+The app is preloaded: settings, the URLconf, the DRF views and serializers
+are imported once in the master and shared copy-on-write by every worker.
+Each worker then drops any database connection it inherited, opens its own
+and resolves the URLconf before taking traffic, so its first request is not
+the slow one. Workers are recycled after ``max_requests`` (with jitter, so
+they don't all restart together) to cap slow memory growth.
+"""
+import math
+import multiprocessing
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Read before anything below looks at the environment; settings.py loads
+# the same file later without overriding what is already set.
+load_dotenv(Path(__file__).resolve().parent / ".env")
+
+GUNICORN_WORKER_MEMORY_MB = int(os.environ.get("GUNICORN_WORKER_MEMORY_MB", "150"))
+
+
+def cpu_limit() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = multiprocessing.cpu_count()
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as handle:
+            quota, period = handle.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def memory_limit_mb() -> int | None:
+    limits = []
+    try:
+        with open("/sys/fs/cgroup/memory.max") as handle:
+            raw = handle.read().strip()
+        if raw != "max":
+            limits.append(int(raw) // 2**20)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/proc/meminfo") as handle:
+            for line in handle:
+                if line.startswith("MemAvailable:"):
+                    limits.append(int(line.split()[1]) // 1024)
+                    break
+    except (OSError, ValueError):
+        pass
+    return min(limits) if limits else None
+
+
+def default_workers(cpus: int, memory_mb: int | None) -> int:
+    workers = 2 * cpus + 1
+    if memory_mb is not None:
+        workers = min(workers, memory_mb // GUNICORN_WORKER_MEMORY_MB)
+    return max(workers, 1)
+
+
+def default_threads(cpus: int, workers: int) -> int:
+    # Aim for the concurrency 2 * (2 * cpus + 1) sync workers would give;
+    # when memory caps the workers, threads make up the difference.
+    return min(max(math.ceil(2 * (2 * cpus + 1) / workers), 2), 8)
+
+
+_cpus = cpu_limit()
+_memory_mb = memory_limit_mb()
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", default_workers(_cpus, _memory_mb)))
+threads = int(os.environ.get("GUNICORN_THREADS", default_threads(_cpus, workers)))
+worker_class = "gthread"
+preload_app = True
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+# Worker heartbeats on tmpfs: a busy disk can't get healthy workers killed.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+# Several workers only share the response cache and the throttle buckets
+# through a shared backend; per-process locmem would serve stale pages.
+if workers > 1:
+    os.environ.setdefault("CACHE_BACKEND", "file")
+
+
+def when_ready(server):
+    # Import the URLconf (views, serializers, DRF) in the master, before
+    # fork, so workers share it instead of importing it on first request.
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    server.log.info(
+        "Sized for %d CPU(s), %s MB memory: %d workers x %d threads",
+        _cpus,
+        _memory_mb if _memory_mb is not None else "unknown",
+        workers,
+        threads,
+    )
+
+
+def post_fork(server, worker):
+    from django.db import connections
+    from django.urls import get_resolver, reverse
+
+    # Never share a socket opened by the master.
+    for connection in connections.all():
+        connection.close()
+    try:
+        connections["default"].ensure_connection()
+        get_resolver().url_patterns
+        reverse("notification-list")
+    except Exception:
+        # A database that isn't up yet is the first request's problem, not
+        # a reason to kill the worker.
+        worker.log.exception("Worker %s warm-up failed", worker.pid)
@@ -1,9 +1,22 @@
 # notifications/admin.py
 from django.contrib import admin
+from django.contrib.admin.utils import unquote
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import Http404
+from django.template.defaultfilters import filesizeformat
+from django.urls import path, reverse
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
-from .models import Notification
+from . import cache as response_cache
+from .bulk import bulk_delete_notifications
+from .downloads import attachment_response
+from .events import event_row
+from .export import export_response
+from .models import EmailOutbox, Notification, NotificationCounter, NotificationEvent
+from .replica import allow_replica_reads
+from .search import search_notifications
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
@@ -30,6 +43,8 @@ class NotificationAdmin(admin.ModelAdmin):
         "has_attachment_display",
     )
 
+    actions = ("export_csv", "export_ndjson")
+
     fieldsets = (
         (
             "Contact details",
@@ -51,6 +66,18 @@ class NotificationAdmin(admin.ModelAdmin):
         ),
     )
 
+    def changelist_view(self, request, extra_context=None):
+        # Browsing the inbox only reads; actions and list edits are POSTs.
+        if request.method == "GET":
+            allow_replica_reads()
+        return super().changelist_view(request, extra_context)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of icontains over every column.
+        if not search_term:
+            return queryset, False
+        return search_notifications(queryset, search_term), False
+
     def has_attachment_display(self, obj):
         return obj.has_attachment
     has_attachment_display.short_description = "Has Attachment"
@@ -60,16 +87,87 @@ class NotificationAdmin(admin.ModelAdmin):
         if obj.attachment:
             return format_html(
                 '<a href="{}" target="_blank">View Attachment</a>',
-                obj.attachment.url
+                reverse("admin:notifications_notification_attachment", args=[obj.pk]),
             )
         return "-"
     attachment_preview.short_description = "Attachment Preview"
 
-    # Override to avoid deleting files when deleting notifications in admin
+    def get_urls(self):
+        return [
+            path(
+                "<path:object_id>/attachment/",
+                self.admin_site.admin_view(self.attachment_view),
+                name="notifications_notification_attachment",
+            ),
+            *super().get_urls(),
+        ]
+
+    def attachment_view(self, request, object_id):
+        # Attachments are not public; same delivery as the API (downloads.py).
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            raise Http404
+        if not self.has_view_permission(request, obj):
+            raise PermissionDenied
+        return attachment_response(request, obj)
+
+    def save_model(self, request, obj, form, change):
+        # Keep the stats counters in step with edits made here.
+        with transaction.atomic():
+            old = (
+                Notification.objects.filter(pk=obj.pk)
+                .values_list("service", "is_read")
+                .first()
+                if change
+                else None
+            )
+            super().save_model(request, obj, form, change)
+            if old is None:
+                NotificationCounter.objects.record_created(obj)
+            else:
+                NotificationCounter.objects.record_changed(old, (obj.service, obj.is_read))
+            NotificationEvent.objects.record(
+                NotificationEvent.UPDATED if change else NotificationEvent.CREATED,
+                [obj.pk],
+                event_row(obj),
+            )
+            response_cache.invalidate()
+
+    @admin.action(description="Export selected messages as CSV")
+    def export_csv(self, request, queryset):
+        return export_response(queryset, "csv", request)
+
+    @admin.action(description="Export selected messages as NDJSON")
+    def export_ndjson(self, request, queryset):
+        return export_response(queryset, "ndjson", request)
+
     def delete_queryset(self, request, queryset):
-        for obj in queryset:
-            # This will call the model's delete method which handles file deletion
-            obj.delete()
+        # One DELETE for the whole selection; files are removed in the background.
+        report = bulk_delete_notifications(queryset)
+        if report.files:
+            self.message_user(
+                request,
+                f"{report.files} attachment file(s) ({filesizeformat(report.bytes_freed)}) "
+                "will be removed in the background.",
+            )
 
     def delete_model(self, request, obj):
-        obj.delete()
\ No newline at end of file
+        obj.delete()
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = (
+        "subject",
+        "recipients",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+        "created_at",
+    )
+    list_filter = ("status",)
+    search_fields = ("subject", "recipients")
+    ordering = ("-created_at",)
+    raw_id_fields = ("notification",)
+    readonly_fields = ("created_at", "sent_at", "claimed_at", "claimed_by", "last_error")
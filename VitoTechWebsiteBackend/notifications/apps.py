@@ -5,3 +5,24 @@ from django.apps import AppConfig
 class NotificationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "notifications"
+
+    def ready(self):
+        from django.core.signals import request_finished
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+
+        from .db_metrics import count_connection, count_request
+        from .search import repair_sqlite_triggers
+
+        def _repair_search_triggers(sender, using, **kwargs):
+            repair_sqlite_triggers(using)
+
+        post_migrate.connect(
+            _repair_search_triggers,
+            sender=self,
+            dispatch_uid="notifications.repair_search_triggers",
+        )
+        connection_created.connect(
+            count_connection, dispatch_uid="notifications.count_connection"
+        )
+        request_finished.connect(count_request, dispatch_uid="notifications.count_request")
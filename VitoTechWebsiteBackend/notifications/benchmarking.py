@@ -0,0 +1,78 @@
+# notifications/benchmarking.py
+"""
+Shared pieces of the ``benchmark_api`` and ``benchmark_serializers``
+management commands: deterministic synthetic messages and latency
+summaries.
+
+Seeded messages use the reserved ``benchmark.invalid`` e-mail domain, so
+they can never be confused with (or mailed as) real ones.
+``benchmark_serializers`` only reads them and rolls its seeding back;
+``benchmark_api`` commits like production and deletes them afterwards.
+"""
+from __future__ import annotations
+
+import itertools
+import statistics
+
+from django.utils import timezone
+
+from .models import Notification
+
+BENCHMARK_DOMAIN = "benchmark.invalid"
+MESSAGE = "We would like a quote for a new website. "
+
+
+def benchmark_queryset():
+    return Notification.objects.filter(email__endswith=f"@{BENCHMARK_DOMAIN}")
+
+
+def seed_notifications(size: int, attachment_every: int = 0, batch_size: int = 5000) -> int:
+    """
+    Top the benchmark rows up to ``size``; returns how many were added.
+    Every ``attachment_every``-th row gets an attachment name (no file is
+    written; only the URL is ever built from it).
+    """
+    existing = benchmark_queryset().count()
+    now = timezone.now()
+    services = [choice for choice, _ in Notification.SERVICE_CHOICES]
+
+    def rows():
+        for i in range(existing, size):
+            with_attachment = attachment_every and i % attachment_every == 0
+            yield Notification(
+                name=f"Benchmark Visitor {i}",
+                email=f"visitor{i}@{BENCHMARK_DOMAIN}",
+                phone="+255700000000",
+                company="Benchmark Ltd" if i % 2 else "",
+                service=services[i % len(services)],
+                message=MESSAGE * 8,
+                attachment=f"attachments/ab/cd/{i:064x}.pdf" if with_attachment else "",
+                is_read=i % 3 == 0,
+                read_at=now if i % 3 == 0 else None,
+            )
+
+    # bulk_create() materialises its input, so feed it one batch at a time.
+    pending = rows()
+    while batch := list(itertools.islice(pending, batch_size)):
+        Notification.objects.bulk_create(batch)
+    return max(size - existing, 0)
+
+
+def summarize(latencies: list[float], elapsed: float, queries: int, errors: int) -> dict:
+    """Latency percentiles (ms), throughput and queries per request."""
+    count = len(latencies)
+    if count > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "requests": count,
+        "errors": errors,
+        "p50_ms": round(p50 * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+        "p99_ms": round(p99 * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "throughput_rps": round(count / elapsed, 1) if elapsed else None,
+        "queries_per_request": round(queries / count, 2) if count else 0.0,
+    }
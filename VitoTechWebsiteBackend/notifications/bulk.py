@@ -0,0 +1,178 @@
+# notifications/bulk.py
+"""
+Set-based operations on many notifications at once, shared by the admin
+actions and the bulk API endpoints.
+
+Nothing here loads model instances: a selection is turned into a handful
+of aggregate queries and a single UPDATE/DELETE, and the stats counters
+are adjusted per ``(service, is_read)`` group instead of per row.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import cache as response_cache
+from .models import (
+    AttachmentBlob,
+    EmailOutbox,
+    Notification,
+    NotificationCounter,
+    NotificationEvent,
+    attachment_storage,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BulkDeleteReport:
+    deleted: int = 0
+    # Attachment references released by the deleted messages.
+    attachments: int = 0
+    # Files no longer referenced by anything; removed in the background.
+    files: int = 0
+    bytes_freed: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _selection(queryset):
+    """
+    ``queryset`` as a plain ``id IN (subquery)`` filter, so search ranking,
+    ordering and other annotations never end up in the UPDATE/DELETE.
+    """
+    return Notification.objects.filter(pk__in=queryset.order_by().values("pk"))
+
+
+def _groups(selection) -> list[tuple[str, bool, int]]:
+    return [
+        (row["service"], row["is_read"], row["count"])
+        for row in selection.order_by()
+        .values("service", "is_read")
+        .annotate(count=Count("id"))
+    ]
+
+
+def _event_ids(selection) -> list[int]:
+    """Ids for the change event; more than the event can list is plenty."""
+    limit = NotificationEvent.objects.max_ids() + 1
+    return list(selection.order_by().values_list("pk", flat=True)[:limit])
+
+
+def purge_files(storage, names: list[str]) -> int:
+    """Remove unreferenced attachment files in batches; returns bytes freed."""
+    batch_size = int(getattr(settings, "NOTIFICATIONS_PURGE_BATCH_SIZE", 200))
+    freed = 0
+    for start in range(0, len(names), batch_size):
+        freed += storage.purge(names[start:start + batch_size])
+    return freed
+
+
+def purge_files_in_background(storage, names: list[str]) -> None:
+    if not names:
+        return
+    if not getattr(settings, "NOTIFICATIONS_PURGE_IN_BACKGROUND", True):
+        purge_files(storage, names)
+        return
+
+    def run():
+        try:
+            freed = purge_files(storage, names)
+            logger.info("Removed %d attachment files, %d bytes freed", len(names), freed)
+        except Exception:
+            logger.exception("Removing %d attachment files failed", len(names))
+        finally:
+            # This thread's own connection; the request's is untouched.
+            connection.close()
+
+    # Not a daemon: a worker shutting down finishes the current batch first.
+    threading.Thread(target=run, name="notifications-purge").start()
+
+
+def bulk_delete_notifications(queryset) -> BulkDeleteReport:
+    """
+    Delete every notification in ``queryset`` with one DELETE statement and
+    release their attachments. Files that are no longer referenced are
+    removed in batches after commit, off the request thread.
+    """
+    selection = _selection(queryset)
+    storage = attachment_storage()
+    report = BulkDeleteReport()
+
+    with transaction.atomic():
+        groups = _groups(selection)
+        ids = _event_ids(selection)
+        names = list(
+            selection.exclude(attachment__isnull=True)
+            .exclude(attachment="")
+            .values_list("attachment", flat=True)
+        )
+        EmailOutbox.objects.filter(notification__in=selection).update(notification=None)
+        # No signals or cascades on Notification, so this is a single
+        # "fast" DELETE rather than a per-row collector walk.
+        report.deleted, _ = selection.delete()
+
+        if report.deleted == sum(count for _, _, count in groups):
+            NotificationCounter.objects.record_deleted(groups)
+        else:
+            # Rows were added or removed concurrently; recount instead of guessing.
+            NotificationCounter.objects.rebuild()
+        if report.deleted:
+            NotificationEvent.objects.record(NotificationEvent.DELETED, ids)
+        response_cache.invalidate()
+
+        report.attachments = len(names)
+        unreferenced = AttachmentBlob.objects.release(names)
+        sizes = dict(
+            AttachmentBlob.objects.filter(name__in=unreferenced).values_list("name", "size")
+        )
+        for name in unreferenced:
+            if name not in sizes:
+                # Legacy file saved before blobs were tracked.
+                try:
+                    sizes[name] = storage.size(name)
+                except OSError:
+                    continue
+            report.files += 1
+            report.bytes_freed += sizes[name]
+
+        transaction.on_commit(lambda: purge_files_in_background(storage, unreferenced))
+
+    return report
+
+
+def bulk_set_read(queryset, is_read: bool) -> int:
+    """
+    Mark every message in ``queryset`` read (or unread) with one UPDATE and
+    return how many actually changed. Messages already in that state are
+    left alone, so their ``read_at`` and ``updated_at`` stay as they were.
+    """
+    selection = _selection(queryset).filter(is_read=not is_read)
+    now = timezone.now()
+    sign = 1 if is_read else -1
+
+    with transaction.atomic():
+        groups = _groups(selection)
+        ids = _event_ids(selection)
+        updated = selection.update(
+            is_read=is_read, read_at=now if is_read else None, updated_at=now
+        )
+        if updated == sum(count for _, _, count in groups):
+            for service, _, count in groups:
+                NotificationCounter.objects.record_read_changed(service, sign * count)
+        else:
+            NotificationCounter.objects.rebuild()
+        if updated:
+            NotificationEvent.objects.record(
+                NotificationEvent.READ if is_read else NotificationEvent.UNREAD, ids
+            )
+            response_cache.invalidate()
+    return updated
@@ -0,0 +1,166 @@
+# notifications/cache.py
+"""
+Response cache for the admin read endpoints (list, retrieve, stats).
+
+Entries are keyed on the absolute URL with its query string normalised and
+on a *generation* number. Every write bumps the generation, so all cached
+responses go stale at once and simply age out; nothing has to track which
+pages a given write affected.
+
+The generation lives in the cache itself, so it is only shared between
+worker processes when the backend is (``file``, Redis, ...). ``locmem`` is
+fine for a single worker or for development.
+
+Responses read from the read replica are served from the cache but never
+stored in it (replica.py): only reads from ``default`` are known to be at
+least as new as the generation they are filed under.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from .conditional import not_modified, set_validators
+from .replica import REPLICA, read_database
+
+GENERATION_KEY = "notifications:generation"
+KEY_PREFIX = "notifications:response"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "invalidations": self.invalidations,
+        }
+
+
+_stats = CacheStats()
+_stats_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        setattr(_stats, name, getattr(_stats, name) + 1)
+
+
+def get_cache():
+    return caches[getattr(settings, "NOTIFICATIONS_CACHE_ALIAS", "default")]
+
+
+def is_enabled() -> bool:
+    return bool(getattr(settings, "NOTIFICATIONS_RESPONSE_CACHE", True))
+
+
+def generation() -> int:
+    cache = get_cache()
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        # Start from the clock, not 1, so an evicted counter can never come
+        # back to a generation that still has entries cached under it.
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        value = cache.get(GENERATION_KEY)
+    return value
+
+
+def _bump() -> None:
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+    _count("invalidations")
+
+
+def invalidate() -> None:
+    """
+    Drop every cached notifications response.
+
+    Bumped now and again after commit: the second bump covers a reader that
+    fetched the old rows between our write and the commit and cached them
+    under the first new generation.
+    """
+    if not is_enabled():
+        return
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def cache_key(request) -> str:
+    params = sorted(
+        (key, sorted(request.query_params.getlist(key))) for key in request.query_params
+    )
+    # The host is part of the key: attachment URLs in the body are absolute.
+    raw = f"{request.build_absolute_uri(request.path)}?{params!r}"
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return f"{KEY_PREFIX}:{generation()}:{digest}"
+
+
+def lookup(request):
+    """
+    ``(key, response)``: the cached response for ``request`` (or a 304 for
+    it), with ``response`` ``None`` on a miss. Pass ``key`` to ``store()`` so the entry is
+    filed under the generation that was current before the rows were read.
+    """
+    if not is_enabled():
+        return None, None
+    key = cache_key(request)
+    entry = get_cache().get(key)
+    if entry is None:
+        _count("misses")
+        return key, None
+    _count("hits")
+    cached = not_modified(request, entry["etag"], entry["last_modified"])
+    if cached is None:
+        cached = set_validators(
+            Response(entry["data"]), entry["etag"], entry["last_modified"]
+        )
+    cached["X-Cache"] = "HIT"
+    return key, cached
+
+
+def store(key, response, etag: str, last_modified=None):
+    """Cache a successful response's data with its validators."""
+    if key is not None and response.status_code == 200 and read_database() != REPLICA:
+        get_cache().set(
+            key,
+            {"data": response.data, "etag": etag, "last_modified": last_modified},
+            timeout=int(getattr(settings, "NOTIFICATIONS_CACHE_TIMEOUT", 300)),
+        )
+        _count("stores")
+        response["X-Cache"] = "MISS"
+    return response
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters for this process plus the current generation."""
+    with _stats_lock:
+        stats = _stats.as_dict()
+    cache = get_cache()
+    stats["backend"] = f"{type(cache).__module__}.{type(cache).__name__}"
+    stats["enabled"] = is_enabled()
+    stats["generation"] = generation()
+    return stats
+
+
+def reset_cache_stats() -> None:
+    global _stats
+    with _stats_lock:
+        _stats = CacheStats()
@@ -0,0 +1,67 @@
+# notifications/conditional.py
+"""
+Conditional GET (``ETag`` / ``Last-Modified``) for the notifications API.
+
+Validators are built from one small aggregate (``MAX(updated_at)`` and
+``COUNT(*)`` over the filtered rows) plus the query string, so a poll that
+finds nothing new is answered with ``304 Not Modified`` before any page is
+fetched or serialized. The count makes deletions change the ETag too;
+``Last-Modified`` alone cannot see them, which is why ``If-None-Match`` wins
+when a client sends both.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime
+
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+# Bump when the response format changes so old cached copies are refetched.
+ETAG_VERSION = 1
+
+
+def make_etag(request, *parts) -> str:
+    """Weak ETag over the path, the normalised query string and ``parts``."""
+    params = sorted(
+        (key, sorted(request.query_params.getlist(key))) for key in request.query_params
+    )
+    payload = json.dumps(
+        [ETAG_VERSION, request.path, params, *parts],
+        default=str,
+        separators=(",", ":"),
+    )
+    return 'W/"%s"' % hashlib.sha1(payload.encode()).hexdigest()
+
+
+def queryset_validators(request, queryset) -> tuple[str, datetime | None]:
+    """ETag and Last-Modified for the rows in ``queryset``, from one aggregate."""
+    summary = queryset.order_by().aggregate(latest=Max("updated_at"), count=Count("id"))
+    return make_etag(request, summary["latest"], summary["count"]), summary["latest"]
+
+
+def set_validators(response, etag: str, last_modified: datetime | None = None):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    # Cache per browser, but always revalidate: the 304 path is the cheap one.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def not_modified(request, etag: str, last_modified: datetime | None = None):
+    """
+    The ``304`` (or ``412``) response if the client's copy is still current,
+    otherwise ``None``.
+    """
+    headers = set_validators(HttpResponse(), etag, last_modified)
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+        response=headers,
+    )
+    return None if response is headers else response
@@ -0,0 +1,61 @@
+# notifications/db_metrics.py
+"""
+Per-process database connection metrics for ``GET /api/notifications/db_stats/``.
+
+Counts the connections each alias opened (``connection_created``) and the
+requests served (``request_finished``). Without persistent connections the
+ratio is about one connection per request; with ``CONN_MAX_AGE`` or a pool
+it should drop towards zero. For a pooled PostgreSQL alias the psycopg pool's
+own statistics (size, available, waiting, wait times) are included.
+
+The receivers are connected in ``NotificationsConfig.ready()``.
+"""
+from __future__ import annotations
+
+import threading
+from collections import Counter
+
+from django.db import connections
+
+_lock = threading.Lock()
+_opened: Counter[str] = Counter()
+_requests = 0
+
+
+def count_connection(sender, connection, **kwargs):
+    with _lock:
+        _opened[connection.alias] += 1
+
+
+def count_request(sender, **kwargs):
+    global _requests
+    with _lock:
+        _requests += 1
+
+
+def connection_stats() -> dict:
+    with _lock:
+        opened, requests = dict(_opened), _requests
+    aliases = {}
+    for alias in connections:
+        connection = connections[alias]
+        # The PostgreSQL backend creates its pool lazily; None when unpooled.
+        pool = getattr(connection, "pool", None)
+        aliases[alias] = {
+            "vendor": connection.vendor,
+            "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+            "health_checks": connection.settings_dict["CONN_HEALTH_CHECKS"],
+            "connections_opened": opened.get(alias, 0),
+            "connections_per_request": (
+                round(opened.get(alias, 0) / requests, 3) if requests else None
+            ),
+            "pool": pool.get_stats() if pool is not None else None,
+        }
+    return {"requests": requests, "databases": aliases}
+
+
+def reset_connection_stats() -> None:
+    global _requests
+    with _lock:
+        _opened.clear()
+        _requests = 0
@@ -0,0 +1,161 @@
+# notifications/downloads.py
+"""
+Attachment downloads for staff: ``GET /api/notifications/{id}/download/``
+and the admin's attachment link. Nothing else serves attachment files.
+
+With ``NOTIFICATIONS_ACCEL_REDIRECT`` set to the prefix of an nginx
+``internal`` location that aliases MEDIA_ROOT, Django checks the user and
+answers with headers only. Its ``X-Accel-Redirect`` tells nginx which file
+to send, and nginx does the transfer with sendfile and Range support, so
+the bytes never pass through a gunicorn worker.
+
+Without it, Django sends the file itself with ``FileResponse``. A single
+``Range: bytes=...`` gets 206 Partial Content, which lets browsers resume.
+Under gunicorn the body goes out through ``wsgi.file_wrapper``, which uses
+``os.sendfile`` for real files. In both cases the file is never read into
+memory.
+
+A stored name never points at different bytes: new files are named after
+their content (storage.py) and older ones were uniquified on save. So the
+name is all a strong ETag needs.
+"""
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.encoding import filepath_to_uri
+from django.utils.http import content_disposition_header
+
+from .models import Notification
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    ``(start, stop)`` (stop exclusive) for a single-range ``Range`` header,
+    or ``None`` to send the whole file: no header, a malformed one, or
+    several ranges, which RFC 9110 lets a server ignore. Raises
+    ``RangeNotSatisfiable`` for a range that starts past the end.
+    """
+    match = RANGE_RE.match((header or "").strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes.
+        start, stop = max(size - int(last), 0), size
+    else:
+        start = int(first)
+        stop = min(int(last) + 1, size) if last else size
+        if last and int(last) < start:
+            return None
+    if start >= size or start >= stop:
+        raise RangeNotSatisfiable
+    return start, stop
+
+
+class _RangeFile:
+    """
+    A file positioned at ``start`` that reads no further than ``length``
+    bytes. It keeps ``fileno()``/``tell()``, so gunicorn can still sendfile
+    exactly Content-Length bytes from the current offset.
+    """
+
+    def __init__(self, file, start: int, length: int):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def _accel_response(notification: Notification, prefix: str, content_type: str):
+    storage = notification.attachment.storage
+    name = notification.attachment.name
+    try:
+        # Rejects names that would leave the storage root; remote storages
+        # have no local path for nginx to send.
+        storage.path(name)
+    except NotImplementedError:
+        return None
+    response = HttpResponse(content_type=content_type)
+    response["X-Accel-Redirect"] = f"{prefix.rstrip('/')}/{filepath_to_uri(name)}"
+    return response
+
+
+def _file_response(request, notification: Notification, etag: str, content_type: str):
+    storage = notification.attachment.storage
+    try:
+        file = storage.open(notification.attachment.name, "rb")
+    except FileNotFoundError:
+        raise Http404("Attachment file is missing.")
+    size = os.fstat(file.fileno()).st_size
+
+    header = request.headers.get("Range") if request.method in ("GET", "HEAD") else None
+    if request.headers.get("If-Range", etag) != etag:
+        # The client's partial copy is of another file: send all of this one.
+        header = None
+    try:
+        span = byte_range(header, size)
+    except RangeNotSatisfiable:
+        file.close()
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if span is None:
+        response = FileResponse(file, content_type=content_type)
+        response["Content-Length"] = str(size)
+    else:
+        start, stop = span
+        response = FileResponse(
+            _RangeFile(file, start, stop - start), status=206, content_type=content_type
+        )
+        response["Content-Length"] = str(stop - start)
+        response["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def attachment_response(request, notification: Notification):
+    """The attachment of ``notification`` as a download (404 without one)."""
+    if not notification.attachment:
+        raise Http404("This message has no attachment.")
+    filename = notification.attachment_filename
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    etag = f'"{hashlib.sha1(notification.attachment.name.encode()).hexdigest()}"'
+
+    prefix = getattr(settings, "NOTIFICATIONS_ACCEL_REDIRECT", "")
+    response = _accel_response(notification, prefix, content_type) if prefix else None
+    if response is None:
+        response = _file_response(request, notification, etag, content_type)
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, max-age=3600"
+    return response
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
 from django.utils import timezone
 
 from .models import Notification
@@ -17,9 +17,11 @@ def _get_default_from_email() -> str:
     )
 
 
-def send_admin_notification_email(notification: Notification) -> None:
+def build_admin_notification_email(notification: Notification) -> EmailMessage | None:
     """
     E-mail to the VitoTech team when a new contact message is submitted.
+
+    Returns ``None`` when no admin address is configured.
     """
     subject = f"[VitoTech Website] New contact message from {notification.name}"
     from_email = _get_default_from_email()
@@ -27,7 +29,7 @@ def send_admin_notification_email(notification: Notification) -> None:
 
     if not to_email:
         # No configured admin e-mail – nothing to send.
-        return
+        return None
 
     created_local = timezone.localtime(notification.created_at)
     created_str = created_local.strftime("%Y-%m-%d %H:%M")
@@ -65,26 +67,16 @@ def send_admin_notification_email(notification: Notification) -> None:
     ])
     body = "\n".join(body_lines)
 
-    try:
-        send_mail(
-            subject,
-            body,
-            from_email or None,
-            to_email,
-            fail_silently=True,
-        )
-    except Exception:
-        # We don't want contact form to fail because of e-mail issues.
-        pass
+    return EmailMessage(subject, body, from_email or None, to_email)
 
 
-def send_user_ack_email(notification: Notification) -> None:
+def build_user_ack_email(notification: Notification) -> EmailMessage | None:
     """
     Acknowledgement e-mail to the visitor confirming that
     VitoTech has received the message.
     """
     if not notification.email:
-        return
+        return None
 
     subject = "We have received your message – VitoTech"
 
@@ -131,13 +123,19 @@ def send_user_ack_email(notification: Notification) -> None:
     ])
     body = "\n".join(body_lines)
 
-    try:
-        send_mail(
-            subject,
-            body,
-            from_email or None,
-            to_email,
-            fail_silently=True,
-        )
-    except Exception:
-        pass
\ No newline at end of file
+    return EmailMessage(subject, body, from_email or None, to_email)
+
+
+def build_notification_emails(notification: Notification) -> list[EmailMessage]:
+    """
+    All e-mails that go out for a new contact message:
+
+    - one to the VitoTech team (admin notification),
+    - one to the visitor confirming receipt.
+    """
+    messages = [
+        build_admin_notification_email(notification),
+        build_user_ack_email(notification),
+    ]
+    return [message for message in messages if message is not None]
+
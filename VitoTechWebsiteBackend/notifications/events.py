@@ -0,0 +1,280 @@
+# notifications/events.py
+"""
+Server-Sent Events stream of notification changes for the admin dashboard.
+
+``GET /api/notifications/events/`` stays open and pushes one compact event
+per change (``created``, ``updated``, ``read``, ``unread``, ``deleted``),
+read from the ``NotificationEvent`` log. Each event carries its log id, so a
+browser ``EventSource`` that reconnects sends ``Last-Event-ID`` and picks up
+exactly where it left off; if that id has already been trimmed from the log
+the stream sends ``reset`` and the dashboard reloads once.
+
+The view is async and only runs under the ASGI application
+(``VitoTechWebsite/asgi.py``); under WSGI or runserver it answers 501 rather
+than hold a worker for the life of the stream. An open stream is a
+suspended coroutine, not a worker thread, and a single poller per process
+reads new events from the database and wakes every stream, so a hundred
+idle dashboards cost one small query per
+``NOTIFICATIONS_EVENT_POLL_INTERVAL`` rather than a hundred.
+
+``EventSource`` cannot send headers, and a JWT in the query string would
+end up in access logs and browser history. So the dashboard first calls
+``POST /api/notifications/event_ticket/`` with its access token and opens
+the stream with the returned ``?ticket=``: signed, good only for this
+endpoint and only for ``NOTIFICATIONS_EVENT_TICKET_TTL`` seconds. The stream
+ends when the access token it was issued for expires; the dashboard then
+fetches a new ticket and reconnects. Other clients can still send
+``Authorization: Bearer``.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import weakref
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .models import NotificationEvent
+from .serializers import NotificationListSerializer
+
+
+def _setting(name: str, default: float) -> float:
+    return float(getattr(settings, name, default))
+
+
+def event_row(notification) -> dict:
+    """The compact list row sent with ``created`` / ``updated`` events."""
+    return dict(NotificationListSerializer(notification).data)
+
+
+def format_event(event: dict) -> str:
+    data = {"ids": event["notification_ids"], **event["data"]}
+    payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    return f"id: {event['id']}\nevent: {event['kind']}\ndata: {payload}\n\n"
+
+
+def _fetch_events(after: int, up_to: int | None = None, limit: int = 500) -> list[dict]:
+    events = NotificationEvent.objects.filter(pk__gt=after)
+    if up_to is not None:
+        events = events.filter(pk__lte=up_to)
+    rows = list(
+        events.order_by("pk").values("id", "kind", "notification_ids", "data")[:limit]
+    )
+    for row in rows:
+        row["text"] = format_event(row)
+    return rows
+
+
+def _latest_id() -> int:
+    return NotificationEvent.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+
+
+def _oldest_id() -> int | None:
+    return NotificationEvent.objects.order_by("pk").values_list("pk", flat=True).first()
+
+
+class EventBroadcaster:
+    """
+    Polls the event log for the streams of one event loop and wakes them
+    when something new arrives. Runs only while at least one stream is open.
+    """
+
+    def __init__(self):
+        self.last_id: int | None = None
+        self.recent: deque[dict] = deque(
+            maxlen=int(getattr(settings, "NOTIFICATIONS_EVENT_BUFFER", 500))
+        )
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+        self._task: asyncio.Task | None = None
+        self._gap_since: float | None = None
+
+    async def subscribe(self) -> None:
+        self.subscribers += 1
+        if self.last_id is None:
+            self.last_id = await sync_to_async(_latest_id)()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def unsubscribe(self) -> None:
+        self.subscribers -= 1
+        if self.subscribers <= 0 and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        interval = _setting("NOTIFICATIONS_EVENT_POLL_INTERVAL", 1.0)
+        while True:
+            events = self._contiguous(await sync_to_async(_fetch_events)(self.last_id))
+            if events:
+                self.recent.extend(events)
+                self.last_id = events[-1]["id"]
+                changed, self.changed = self.changed, asyncio.Event()
+                changed.set()
+            await asyncio.sleep(interval)
+
+    def _contiguous(self, events: list[dict]) -> list[dict]:
+        """
+        Events up to the first hole in the ids. With concurrent writers a
+        lower id can commit after a higher one, so a hole is given
+        ``NOTIFICATIONS_EVENT_GAP_TIMEOUT`` seconds to fill (or turn out to
+        be a rolled-back write) before it is skipped.
+        """
+        expected = self.last_id + 1
+        for index, event in enumerate(events):
+            if event["id"] != expected:
+                now = time.monotonic()
+                if self._gap_since is None:
+                    self._gap_since = now
+                if now - self._gap_since < _setting("NOTIFICATIONS_EVENT_GAP_TIMEOUT", 2.0):
+                    return events[:index]
+            self._gap_since = None
+            expected = event["id"] + 1
+        return events
+
+    async def events_after(self, cursor: int) -> list[dict] | None:
+        """Events a stream at ``cursor`` hasn't seen; ``None`` if they're gone."""
+        if cursor >= self.last_id:
+            return []
+        if self.recent and cursor >= self.recent[0]["id"] - 1:
+            return [event for event in self.recent if event["id"] > cursor]
+        oldest = await sync_to_async(_oldest_id)()
+        if oldest is None or cursor < oldest - 1:
+            return None
+        return await sync_to_async(_fetch_events)(cursor, self.last_id, limit=None)
+
+
+_broadcasters: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_broadcaster() -> EventBroadcaster:
+    loop = asyncio.get_running_loop()
+    if loop not in _broadcasters:
+        _broadcasters[loop] = EventBroadcaster()
+    return _broadcasters[loop]
+
+
+TICKET_SALT = "notifications.events.ticket"
+
+
+def issue_ticket(user, token=None) -> str:
+    """
+    A stream ticket for ``user``. ``token`` is the access token the ticket
+    is issued against; the stream ends when it expires.
+    """
+    expires = int(token["exp"]) if token is not None else None
+    return signing.dumps({"user": user.pk, "exp": expires}, salt=TICKET_SALT)
+
+
+def _authenticate(request):
+    """
+    ``(user, expires)`` from ``?ticket=`` or the Authorization header, where
+    ``expires`` is the epoch time the stream must end by (or ``None``).
+    """
+    ticket = request.GET.get("ticket")
+    if ticket:
+        try:
+            data = signing.loads(
+                ticket,
+                salt=TICKET_SALT,
+                max_age=_setting("NOTIFICATIONS_EVENT_TICKET_TTL", 30),
+            )
+        except signing.BadSignature:
+            raise AuthenticationFailed("Stream ticket is invalid or expired.")
+        user = get_user_model().objects.filter(pk=data["user"]).first()
+        if user is None:
+            raise AuthenticationFailed("Stream ticket is invalid or expired.")
+        return user, data["exp"]
+
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw = auth.get_raw_token(header) if header else None
+    if not raw:
+        return None, None
+    token = auth.get_validated_token(raw)
+    return auth.get_user(token), token["exp"]
+
+
+def _last_event_id(request) -> int | None:
+    raw = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
+
+
+async def _stream(broadcaster: EventBroadcaster, cursor: int | None, deadline: float):
+    await broadcaster.subscribe()
+    try:
+        if cursor is None:
+            cursor = broadcaster.last_id
+        retry_ms = int(_setting("NOTIFICATIONS_EVENT_RETRY", 3.0) * 1000)
+        yield f"retry: {retry_ms}\n\n"
+        keepalive = _setting("NOTIFICATIONS_EVENT_KEEPALIVE", 15.0)
+        while True:
+            changed = broadcaster.changed
+            events = await broadcaster.events_after(cursor)
+            if events is None:
+                cursor = broadcaster.last_id
+                yield f"id: {cursor}\nevent: reset\ndata: {{}}\n\n"
+            else:
+                for event in events:
+                    cursor = event["id"]
+                    yield event["text"]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), min(keepalive, remaining))
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle stream.
+                yield ": keepalive\n\n"
+    finally:
+        broadcaster.unsubscribe()
+
+
+async def notification_events(request):
+    """``GET /api/notifications/events/``: SSE stream for staff users."""
+    if request.method != "GET":
+        return JsonResponse({"detail": "Method not allowed."}, status=405)
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would be held by the stream until it ends.
+        return JsonResponse(
+            {"detail": "The event stream is only served by the ASGI application."},
+            status=501,
+        )
+    try:
+        user, expires = await sync_to_async(_authenticate)(request)
+    except (InvalidToken, AuthenticationFailed) as exc:
+        detail = exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}
+        return JsonResponse(detail, status=401)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+    if not (user.is_active and user.is_staff):
+        return JsonResponse(
+            {"detail": "You do not have permission to perform this action."}, status=403
+        )
+
+    lifetime = _setting("NOTIFICATIONS_EVENT_MAX_STREAM", 3600)
+    if expires is not None:
+        lifetime = min(lifetime, expires - time.time())
+    deadline = time.monotonic() + lifetime
+    response = StreamingHttpResponse(
+        _stream(get_broadcaster(), _last_event_id(request), deadline),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Tell nginx not to buffer the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,63 @@
+# notifications/idempotency.py
+"""
+Duplicate suppression for the public contact form.
+
+A submission is a repeat of an earlier one when either
+
+- it carries the same ``Idempotency-Key`` header (client retries), or
+- it has the same fingerprint -- a hash of the e-mail address, the message
+  and the attachment's SHA-256 -- as a message created within the last
+  ``NOTIFICATIONS_DUPLICATE_WINDOW`` seconds (double clicks, resubmits;
+  ``0`` turns this check off).
+
+Both are answered by a single query: ``notif_idempotency_key_uniq`` serves
+the key match and ``notif_fingerprint_idx`` the windowed fingerprint match.
+A repeat gets the original message back instead of a new row, so nothing is
+written to storage and no e-mails are queued.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Case, Q, When
+from django.utils import timezone
+
+from .storage import content_sha256
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+def submission_fingerprint(attrs: dict) -> str:
+    """SHA-256 over the normalised e-mail, message and attachment digest."""
+    attachment = attrs.get("attachment")
+    parts = [
+        (attrs.get("email") or "").strip().lower(),
+        " ".join((attrs.get("message") or "").split()),
+        content_sha256(attachment) if attachment else "",
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def duplicate_window() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "NOTIFICATIONS_DUPLICATE_WINDOW", 600)))
+
+
+def find_original(queryset, key: str | None, fingerprint: str):
+    """
+    The earlier message this submission repeats, or ``None``. A key match
+    wins over a fingerprint match.
+    """
+    window = duplicate_window()
+    match = Q(pk__in=[])
+    if window:
+        match |= Q(fingerprint=fingerprint, created_at__gte=timezone.now() - window)
+    ordering = ["-created_at", "-id"]
+    if key:
+        match |= Q(idempotency_key=key)
+        ordering.insert(0, Case(When(idempotency_key=key, then=0), default=1))
+    elif not window:
+        return None
+    return queryset.filter(match).order_by(*ordering).first()
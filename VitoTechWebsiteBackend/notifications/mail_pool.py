@@ -0,0 +1,244 @@
+# notifications/mail_pool.py
+"""
+Pool of authenticated mail server connections.
+
+Opening an SSL connection to PrivateEmail and logging in costs hundreds of
+milliseconds, so instead of one handshake per ``send_mail`` call we keep a
+few logged-in connections warm and hand them out to whoever needs to send.
+Connections are NOOP-checked before reuse and retired after
+``NOTIFICATIONS_MAIL_POOL_MAX_LIFETIME`` seconds.
+"""
+from __future__ import annotations
+
+import smtplib
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+@dataclass
+class _PooledConnection:
+    backend: object
+    opened_at: float
+    last_used_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class PoolStats:
+    handshakes: int = 0
+    handshake_seconds: float = 0.0
+    reuses: int = 0
+    health_checks: int = 0
+    health_check_failures: int = 0
+    discarded: int = 0
+    messages_sent: int = 0
+    messages_failed: int = 0
+
+    def as_dict(self) -> dict:
+        average = self.handshake_seconds / self.handshakes if self.handshakes else 0.0
+        return {
+            "handshakes": self.handshakes,
+            "handshake_seconds": round(self.handshake_seconds, 4),
+            "average_handshake_seconds": round(average, 4),
+            "reuses": self.reuses,
+            # Every reuse is a handshake we did not have to do.
+            "handshake_seconds_saved": round(self.reuses * average, 4),
+            "health_checks": self.health_checks,
+            "health_check_failures": self.health_check_failures,
+            "discarded": self.discarded,
+            "messages_sent": self.messages_sent,
+            "messages_failed": self.messages_failed,
+        }
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of open e-mail backend connections.
+    """
+
+    def __init__(
+        self,
+        backend: str | None = None,
+        max_size: int = 2,
+        max_idle: float = 50.0,
+        max_lifetime: float = 300.0,
+    ):
+        self.backend = backend
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.stats = PoolStats()
+        self._idle: list[_PooledConnection] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "SMTPConnectionPool":
+        return cls(
+            backend=getattr(settings, "NOTIFICATIONS_MAIL_POOL_BACKEND", None) or None,
+            max_size=int(getattr(settings, "NOTIFICATIONS_MAIL_POOL_SIZE", 2)),
+            max_idle=float(getattr(settings, "NOTIFICATIONS_MAIL_POOL_MAX_IDLE", 50)),
+            max_lifetime=float(getattr(settings, "NOTIFICATIONS_MAIL_POOL_MAX_LIFETIME", 300)),
+        )
+
+    # ------------------------------------------------------------------
+    # Connection lifecycle
+    # ------------------------------------------------------------------
+    def _open(self) -> _PooledConnection:
+        backend = get_connection(self.backend, fail_silently=False)
+        started = time.monotonic()
+        backend.open()
+        now = time.monotonic()
+        with self._lock:
+            self.stats.handshakes += 1
+            self.stats.handshake_seconds += now - started
+        return _PooledConnection(backend=backend, opened_at=now, last_used_at=now)
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        with self._lock:
+            self.stats.discarded += 1
+        try:
+            pooled.backend.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, pooled: _PooledConnection) -> bool:
+        now = time.monotonic()
+        if now - pooled.opened_at > self.max_lifetime:
+            return False
+        if now - pooled.last_used_at > self.max_idle:
+            return False
+
+        smtp = getattr(pooled.backend, "connection", None)
+        if smtp is None:
+            # Non-SMTP backends (console, locmem, ...) have nothing to check.
+            return not hasattr(pooled.backend, "connection")
+
+        with self._lock:
+            self.stats.health_checks += 1
+        try:
+            healthy = smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            healthy = False
+        if not healthy:
+            with self._lock:
+                self.stats.health_check_failures += 1
+        return healthy
+
+    def acquire(self) -> _PooledConnection:
+        """Return a checked, open connection; opens a new one if needed."""
+        while True:
+            with self._lock:
+                pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                return self._open()
+            if self._is_healthy(pooled):
+                with self._lock:
+                    self.stats.reuses += 1
+                return pooled
+            self._discard(pooled)
+
+    def release(
+        self, pooled: _PooledConnection, broken: bool = False, touch: bool = True
+    ) -> None:
+        if touch:
+            pooled.last_used_at = time.monotonic()
+        if not broken:
+            with self._lock:
+                if len(self._idle) < self.max_size:
+                    self._idle.append(pooled)
+                    return
+        self._discard(pooled)
+
+    def keepalive(self) -> None:
+        """
+        NOOP idle connections so they stay logged in between bursts, and
+        drop the ones the server has closed or that are past their lifetime.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        now = time.monotonic()
+        for pooled in idle:
+            if now - pooled.last_used_at < self.max_idle / 2:
+                # Recently used, no need to ping it yet.
+                self.release(pooled, touch=False)
+            elif self._is_healthy(pooled):
+                self.release(pooled)
+            else:
+                self._discard(pooled)
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._discard(pooled)
+
+    # ------------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------------
+    def send_messages(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        """
+        Send ``messages`` as one batch over a single pooled connection.
+
+        Returns one entry per message: ``None`` if it was sent, otherwise the
+        exception it failed with. A dropped connection fails the rest of the
+        batch and is not returned to the pool.
+        """
+        results: list[Exception | None] = []
+        if not messages:
+            return results
+
+        try:
+            pooled = self.acquire()
+        except Exception as exc:
+            with self._lock:
+                self.stats.messages_failed += len(messages)
+            return [exc] * len(messages)
+
+        broken = False
+        try:
+            for message in messages:
+                if broken:
+                    results.append(smtplib.SMTPServerDisconnected("connection lost"))
+                    continue
+                try:
+                    # The connection is already open, so the backend reuses it
+                    # instead of opening (and closing) its own.
+                    pooled.backend.send_messages([message])
+                except Exception as exc:
+                    broken = isinstance(exc, (smtplib.SMTPServerDisconnected, OSError))
+                    results.append(exc)
+                else:
+                    results.append(None)
+        finally:
+            self.release(pooled, broken=broken)
+
+        sent = results.count(None)
+        with self._lock:
+            self.stats.messages_sent += sent
+            self.stats.messages_failed += len(results) - sent
+        return results
+
+
+_pool: SMTPConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_mail_pool() -> SMTPConnectionPool:
+    """Process-wide pool, created lazily from settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPConnectionPool.from_settings()
+    return _pool
+
+
+def reset_mail_pool() -> None:
+    """Close and forget the process-wide pool (e.g. after settings change)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close_all()
@@ -0,0 +1,269 @@
+# notifications/management/commands/benchmark_api.py
+import json
+import platform
+import random
+import shutil
+import tempfile
+import time
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from notifications.benchmarking import (
+    BENCHMARK_DOMAIN,
+    benchmark_queryset,
+    seed_notifications,
+    summarize,
+)
+from notifications.bulk import bulk_delete_notifications
+from notifications.models import EmailOutbox, Notification, NotificationCounter
+
+ENDPOINTS = ("create", "list", "search", "stats", "mark_read", "delete")
+VARIANTS = {"plain": 0, "attachments": 5}
+PDF = b"%PDF-1.4\n" + b"0" * 4096
+BENCHMARK_SENDER = f"benchmark@{BENCHMARK_DOMAIN}"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic contact messages and drive the notifications API "
+        "through the real URLconf, reporting p50/p95/p99 latency, throughput "
+        "and queries per request as JSON. Every request commits, as in "
+        "production; the synthetic messages, their outbox e-mails and "
+        "attachments and the benchmark user are deleted afterwards. Queued "
+        "e-mail is addressed to benchmark.invalid only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10000,100000,1000000",
+            help="Comma-separated table sizes (default: 10000,100000,1000000).",
+        )
+        parser.add_argument(
+            "--variants",
+            default=",".join(VARIANTS),
+            help="plain and/or attachments (every 5th message has a file).",
+        )
+        parser.add_argument(
+            "--endpoints",
+            default=",".join(ENDPOINTS),
+            help=f"Comma-separated subset of {', '.join(ENDPOINTS)}.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=100, help="Requests per endpoint and size."
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+        parser.add_argument(
+            "--compare", help="Earlier JSON report to print p95 changes against."
+        )
+
+    def _split(self, value, allowed, option):
+        items = [item.strip() for item in value.split(",") if item.strip()]
+        unknown = [item for item in items if item not in allowed]
+        if unknown:
+            raise CommandError(f"Unknown {option}: {', '.join(unknown)}")
+        return items
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options["sizes"].split(","))
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers.")
+        variants = self._split(options["variants"], VARIANTS, "--variants")
+        endpoints = self._split(options["endpoints"], ENDPOINTS, "--endpoints")
+        self.requests = max(options["requests"], 1)
+        self.random = random.Random(options["seed"])
+
+        media_root = tempfile.mkdtemp(prefix="benchmark-media-")
+        results = []
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=["testserver"],
+                MEDIA_ROOT=media_root,
+                EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+                # Measure the work itself, not the shortcuts in front of it.
+                NOTIFICATIONS_RESPONSE_CACHE=False,
+                NOTIFICATIONS_THROTTLE=False,
+                NOTIFICATIONS_DUPLICATE_WINDOW=0,
+                NOTIFICATIONS_PURGE_IN_BACKGROUND=False,
+                # The outbox rows commit too; keep a running mail worker
+                # away from real addresses until they are deleted.
+                DEFAULT_FROM_EMAIL=BENCHMARK_SENDER,
+                EMAIL_HOST_USER="",
+            ):
+                admin = self._setup_clients()
+                try:
+                    for variant in variants:
+                        try:
+                            for size in sizes:
+                                results += self._run_size(size, variant, endpoints)
+                        finally:
+                            self._cleanup()
+                finally:
+                    admin.delete()
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        report = {"meta": self._meta(options), "results": results}
+        output = json.dumps(report, indent=2)
+        self.stdout.write(output)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                handle.write(output + "\n")
+        if options["compare"]:
+            self._compare(options["compare"], results)
+
+    def _setup_clients(self):
+        admin = get_user_model().objects.create_user(
+            f"benchmark-admin-{time.time_ns()}", is_staff=True
+        )
+        self.admin_client = APIClient()
+        self.admin_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(admin).access_token}"
+        )
+        # The contact form is public; visitors send no token.
+        self.public_client = APIClient()
+        return admin
+
+    def _cleanup(self):
+        """Delete everything the benchmark committed, the way the API would."""
+        # Rows of messages the delete endpoint removed are already unlinked.
+        EmailOutbox.objects.filter(from_email=BENCHMARK_SENDER).delete()
+        report = bulk_delete_notifications(benchmark_queryset())
+        self.stderr.write(f"cleaned up {report.deleted} messages, {report.files} files")
+
+    def _run_size(self, size, variant, endpoints):
+        added = seed_notifications(size, attachment_every=VARIANTS[variant])
+        if added:
+            NotificationCounter.objects.rebuild()
+        self.stderr.write(f"{variant}, {size} rows: seeded {added}")
+        # Warm up URL resolution, middleware and the first query plans.
+        self.admin_client.get("/api/notifications/")
+        self.admin_client.get("/api/notifications/stats/")
+
+        rows = []
+        for endpoint in endpoints:
+            requests = list(getattr(self, f"_{endpoint}_requests")(size, variant))
+            rows.append(
+                {"rows": size, "variant": variant, "endpoint": endpoint, **self._drive(requests)}
+            )
+        return rows
+
+    def _drive(self, requests) -> dict:
+        latencies, errors = [], 0
+        counter = QueryCounter()
+        with connections["default"].execute_wrapper(counter):
+            started = time.perf_counter()
+            for send in requests:
+                request_started = time.perf_counter()
+                response = send()
+                latencies.append(time.perf_counter() - request_started)
+                if response.status_code >= 400:
+                    errors += 1
+            elapsed = time.perf_counter() - started
+        return summarize(latencies, elapsed, counter.count, errors)
+
+    # One callable per request, built before the clock starts.
+
+    def _create_requests(self, size, variant):
+        for i in range(self.requests):
+            data = {
+                "name": f"Benchmark Sender {i}",
+                "email": f"sender{i}@{BENCHMARK_DOMAIN}",
+                "service": "Website Development",
+                "message": f"Benchmark message {i}. " * 20,
+            }
+            if VARIANTS[variant] and i % VARIANTS[variant] == 0:
+                data["attachment"] = SimpleUploadedFile(f"brief{i}.pdf", PDF)
+            yield lambda data=data: self.public_client.post(
+                "/api/notifications/", data, format="multipart"
+            )
+
+    def _list_requests(self, size, variant):
+        services = [choice for choice, _ in Notification.SERVICE_CHOICES]
+        params = [{}, {"is_read": "false"}, {"view": "compact"}]
+        for i in range(self.requests):
+            query = dict(params[i % len(params)])
+            if i % 4 == 3:
+                query["service"] = self.random.choice(services)
+            yield lambda query=query: self.admin_client.get("/api/notifications/", query)
+
+    def _search_requests(self, size, variant):
+        for i in range(self.requests):
+            term = (
+                "website quote"
+                if i % 2
+                else f"visitor{self.random.randrange(size)}@{BENCHMARK_DOMAIN}"
+            )
+            yield lambda term=term: self.admin_client.get(
+                "/api/notifications/", {"search": term}
+            )
+
+    def _stats_requests(self, size, variant):
+        params = [{}, {"is_read": "false"}, {"service": "Other"}]
+        for i in range(self.requests):
+            query = params[i % len(params)]
+            yield lambda query=query: self.admin_client.get(
+                "/api/notifications/stats/", query
+            )
+
+    def _ids(self, **filters) -> list[int]:
+        candidates = benchmark_queryset().filter(**filters).values_list("pk", flat=True)
+        ids = list(candidates[: self.requests * 10])
+        return self.random.sample(ids, min(self.requests, len(ids)))
+
+    def _mark_read_requests(self, size, variant):
+        for pk in self._ids(is_read=False):
+            yield lambda pk=pk: self.admin_client.post(f"/api/notifications/{pk}/mark_read/")
+
+    def _delete_requests(self, size, variant):
+        for pk in self._ids():
+            yield lambda pk=pk: self.admin_client.delete(f"/api/notifications/{pk}/")
+
+    def _meta(self, options) -> dict:
+        return {
+            "generated_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connections["default"].vendor,
+            "requests_per_endpoint": self.requests,
+            "seed": options["seed"],
+        }
+
+    def _compare(self, path, results):
+        try:
+            with open(path) as handle:
+                baseline = json.load(handle)["results"]
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        before = {(r["rows"], r["variant"], r["endpoint"]): r for r in baseline}
+        self.stderr.write(
+            f"{'rows':>8}  {'variant':<12}{'endpoint':<10}{'p95 before':>12}{'p95 now':>10}  change"
+        )
+        for row in results:
+            old = before.get((row["rows"], row["variant"], row["endpoint"]))
+            if old is None:
+                continue
+            change = (row["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0.0
+            self.stderr.write(
+                f"{row['rows']:>8}  {row['variant']:<12}{row['endpoint']:<10}"
+                f"{old['p95_ms']:>10.1f}ms{row['p95_ms']:>8.1f}ms  {change:+.0f}%"
+            )
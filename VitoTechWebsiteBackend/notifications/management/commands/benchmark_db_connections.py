@@ -0,0 +1,118 @@
+# notifications/management/commands/benchmark_db_connections.py
+import copy
+import json
+import platform
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+from django.db.utils import load_backend
+from django.utils import timezone
+
+from notifications.benchmarking import summarize
+from notifications.models import Notification
+
+MODES = ("per_request", "persistent", "pooled")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database latency with a new connection per "
+        "request, persistent connections (CONN_MAX_AGE + health checks) and, "
+        "on PostgreSQL, a psycopg connection pool. Each simulated request "
+        "runs Django's request_started/request_finished connection handling "
+        "around one COUNT query. Prints a JSON report; point DB_* at the "
+        "server you want to measure."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Database alias.")
+        parser.add_argument(
+            "--modes",
+            default=",".join(MODES),
+            help=f"Comma-separated subset of {', '.join(MODES)}.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Requests per mode."
+        )
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        if alias not in connections:
+            raise CommandError(f"Unknown database alias: {alias}")
+        modes = [mode.strip() for mode in options["modes"].split(",") if mode.strip()]
+        unknown = [mode for mode in modes if mode not in MODES]
+        if unknown:
+            raise CommandError(f"Unknown --modes: {', '.join(unknown)}")
+
+        base = connections[alias].settings_dict
+        requests = max(options["requests"], 1)
+        results = []
+        for mode in modes:
+            if mode == "pooled" and connections[alias].vendor != "postgresql":
+                self.stderr.write("pooled: skipped, pooling needs PostgreSQL")
+                continue
+            results.append({"mode": mode, **self._run(base, alias, mode, requests)})
+
+        report = {
+            "meta": {
+                "generated_at": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connections[alias].vendor,
+                "requests_per_mode": requests,
+            },
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        self.stdout.write(output)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                handle.write(output + "\n")
+
+    def _settings(self, base, mode):
+        settings_dict = copy.deepcopy(base)
+        options = settings_dict.setdefault("OPTIONS", {})
+        pool = options.pop("pool", None)
+        if mode == "per_request":
+            settings_dict["CONN_MAX_AGE"] = 0
+        elif mode == "persistent":
+            settings_dict["CONN_MAX_AGE"] = 600
+            settings_dict["CONN_HEALTH_CHECKS"] = True
+        else:
+            settings_dict["CONN_MAX_AGE"] = 0
+            options["pool"] = pool if isinstance(pool, dict) else {"min_size": 2, "max_size": 4}
+        return settings_dict
+
+    def _run(self, base, alias, mode, requests) -> dict:
+        settings_dict = self._settings(base, mode)
+        backend = load_backend(settings_dict["ENGINE"])
+        # A separate alias: PostgreSQL pools are kept per alias.
+        connection = backend.DatabaseWrapper(settings_dict, f"{alias}-benchmark-{mode}")
+        sql = f"SELECT COUNT(*) FROM {connection.ops.quote_name(Notification._meta.db_table)}"
+        latencies, errors = [], 0
+        try:
+            started = time.perf_counter()
+            for _ in range(requests):
+                request_started = time.perf_counter()
+                try:
+                    # What close_old_connections does on request_started
+                    # and request_finished.
+                    connection.close_if_unusable_or_obsolete()
+                    with connection.cursor() as cursor:
+                        cursor.execute(sql)
+                        cursor.fetchone()
+                    connection.close_if_unusable_or_obsolete()
+                except DatabaseError:
+                    errors += 1
+                latencies.append(time.perf_counter() - request_started)
+            elapsed = time.perf_counter() - started
+            pool = getattr(connection, "pool", None)
+            stats = pool.get_stats() if pool is not None else None
+        finally:
+            connection.close()
+            if getattr(connection, "pool", None) is not None:
+                connection.close_pool()
+        return {**summarize(latencies, elapsed, requests, errors), "pool": stats}
@@ -0,0 +1,95 @@
+# notifications/management/commands/benchmark_serializers.py
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from notifications.benchmarking import benchmark_queryset, seed_notifications
+from notifications.fast_serializers import FastNotificationSerializer
+from notifications.serializers import NotificationSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare NotificationSerializer with the fast values() serializer on "
+        "seeded rows. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000,10000,100000",
+            help="Comma-separated row counts (default: 1000,10000,100000).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs per size; the fastest is reported.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options["sizes"].split(","))
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers.")
+
+        # Attachment URLs are built from the request host, as in the API.
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            request = Request(APIRequestFactory().get("/api/notifications/"))
+            context = {"request": request}
+            results = []
+            with transaction.atomic():
+                for size in sizes:
+                    seed_notifications(size, attachment_every=5)
+                    results.append(self._measure(size, context, options["repeat"]))
+                transaction.set_rollback(True)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{'rows':>8}  {'serializer':>12}  {'fast path':>12}  speedup")
+        for row in results:
+            self.stdout.write(
+                f"{row['rows']:>8}  {row['serializer_ms']:>10.1f}ms  "
+                f"{row['fast_ms']:>10.1f}ms  {row['speedup']:>6.1f}x"
+            )
+
+    def _queryset(self, size):
+        return benchmark_queryset().order_by("-created_at", "-id")[:size]
+
+    @staticmethod
+    def _best(fn, repeat):
+        best, result = None, None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def _measure(self, size, context, repeat):
+        queryset = self._queryset(size)
+        fast = FastNotificationSerializer.compile(NotificationSerializer(context=context))
+
+        slow_seconds, slow = self._best(
+            lambda: NotificationSerializer(list(queryset), many=True, context=context).data,
+            repeat,
+        )
+        fast_seconds, quick = self._best(
+            lambda: fast.many(queryset.values(*fast.columns)), repeat
+        )
+        if json.dumps(slow) != json.dumps(quick):
+            raise CommandError(f"Fast serializer output differs at {size} rows.")
+
+        return {
+            "rows": size,
+            "serializer_ms": round(slow_seconds * 1000, 1),
+            "fast_ms": round(fast_seconds * 1000, 1),
+            "speedup": round(slow_seconds / fast_seconds, 1) if fast_seconds else None,
+        }
@@ -0,0 +1,85 @@
+# notifications/management/commands/deliver_emails.py
+import json
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from notifications.mail_pool import get_mail_pool
+from notifications.outbox import deliver_batch, queue_depth
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notification e-mails from the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows to claim per batch (default: NOTIFICATIONS_OUTBOX_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Deliver everything that is due now, then exit.",
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Print the queue depth as JSON and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            self.stdout.write(json.dumps(queue_depth()))
+            return
+
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        pool = get_mail_pool()
+        self.stdout.write(f"Outbox worker {worker_id} started.")
+
+        try:
+            while not self._stopping:
+                close_old_connections()
+                result = deliver_batch(worker_id, options["batch_size"])
+
+                if result.claimed:
+                    self.stdout.write(
+                        "claimed={0.claimed} sent={0.sent} retried={0.retried} "
+                        "failed={0.failed} depth={1} smtp={2}".format(
+                            result,
+                            json.dumps(queue_depth()),
+                            json.dumps(pool.stats.as_dict()),
+                        )
+                    )
+                    continue
+
+                if options["once"]:
+                    break
+                # Keep the logged-in connections warm for the next burst.
+                pool.keepalive()
+                time.sleep(options["interval"])
+        finally:
+            pool.close_all()
+
+        self.stdout.write(
+            f"Outbox worker {worker_id} stopped. smtp={json.dumps(pool.stats.as_dict())}"
+        )
+
+    def _stop(self, signum, frame):
+        # Finish the batch in flight, then exit.
+        self._stopping = True
@@ -0,0 +1,31 @@
+# notifications/management/commands/rebuild_notification_counters.py
+from django.core.management.base import BaseCommand
+
+from notifications.cache import invalidate
+from notifications.models import NotificationCounter
+
+
+class Command(BaseCommand):
+    help = "Recount the notification stats counters from the notifications table."
+
+    def handle(self, *args, **options):
+        before = {c.scope: (c.total, c.read) for c in NotificationCounter.objects.all()}
+        NotificationCounter.objects.rebuild()
+        invalidate()
+        after = {c.scope: (c.total, c.read) for c in NotificationCounter.objects.all()}
+
+        drifted = sorted(
+            scope for scope in before.keys() | after.keys()
+            if before.get(scope) != after.get(scope)
+        )
+        for scope in drifted:
+            old_total, old_read = before.get(scope, (0, 0))
+            new_total, new_read = after.get(scope, (0, 0))
+            self.stdout.write(
+                f"{scope}: total {old_total} -> {new_total}, read {old_read} -> {new_read}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {len(after)} counters ({len(drifted)} had drifted)."
+            )
+        )
@@ -0,0 +1,114 @@
+from django.db import migrations
+
+# The DDL is frozen here so this migration keeps doing what it did when it
+# was written; notifications/search.py has its own copy of the SQLite
+# triggers for the post_migrate repair hook.
+
+SQLITE_CREATE_FTS_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notifications_notification_fts USING fts5(
+        name, email, phone, company, message,
+        content='notifications_notification', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+SQLITE_CREATE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS notifications_notification_fts_ai
+    AFTER INSERT ON notifications_notification BEGIN
+        INSERT INTO notifications_notification_fts(rowid, name, email, phone, company, message)
+        VALUES (new.id, new.name, new.email, new.phone, new.company, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notifications_notification_fts_ad
+    AFTER DELETE ON notifications_notification BEGIN
+        INSERT INTO notifications_notification_fts(
+            notifications_notification_fts, rowid, name, email, phone, company, message
+        )
+        VALUES ('delete', old.id, old.name, old.email, old.phone, old.company, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notifications_notification_fts_au
+    AFTER UPDATE OF name, email, phone, company, message ON notifications_notification BEGIN
+        INSERT INTO notifications_notification_fts(
+            notifications_notification_fts, rowid, name, email, phone, company, message
+        )
+        VALUES ('delete', old.id, old.name, old.email, old.phone, old.company, old.message);
+        INSERT INTO notifications_notification_fts(rowid, name, email, phone, company, message)
+        VALUES (new.id, new.name, new.email, new.phone, new.company, new.message);
+    END
+    """,
+]
+
+SQLITE_REBUILD_FTS = (
+    "INSERT INTO notifications_notification_fts(notifications_notification_fts) "
+    "VALUES ('rebuild')"
+)
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS notifications_notification_fts_ai",
+    "DROP TRIGGER IF EXISTS notifications_notification_fts_ad",
+    "DROP TRIGGER IF EXISTS notifications_notification_fts_au",
+    "DROP TABLE IF EXISTS notifications_notification_fts",
+]
+
+# E-mail addresses and phone numbers are split on punctuation so their
+# parts are searchable ("asha@example.com" -> "asha example com").
+POSTGRES_CREATE = [
+    """
+    ALTER TABLE notifications_notification
+    ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A')
+        || setweight(to_tsvector('simple'::regconfig,
+               regexp_replace(coalesce(email, ''), '[^[:alnum:]]+', ' ', 'g')), 'A')
+        || setweight(to_tsvector('simple'::regconfig, coalesce(company, '')), 'B')
+        || setweight(to_tsvector('simple'::regconfig,
+               regexp_replace(coalesce(phone, ''), '[^[:alnum:]]+', ' ', 'g')), 'B')
+        || setweight(to_tsvector('simple'::regconfig, coalesce(message, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS notif_search_vector_gin "
+    "ON notifications_notification USING GIN (search_vector)",
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS notif_search_vector_gin",
+    "ALTER TABLE notifications_notification DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def forwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(SQLITE_CREATE_FTS_TABLE)
+            except Exception:
+                # SQLite compiled without FTS5: search keeps using icontains.
+                return
+            for statement in SQLITE_CREATE_TRIGGERS:
+                cursor.execute(statement)
+            cursor.execute(SQLITE_REBUILD_FTS)
+    elif connection.vendor == "postgresql":
+        for statement in POSTGRES_CREATE:
+            schema_editor.execute(statement)
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_email_outbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
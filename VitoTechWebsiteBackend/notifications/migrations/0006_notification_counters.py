@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:29
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def build_counters(apps, schema_editor):
+    Notification = apps.get_model('notifications', 'Notification')
+    NotificationCounter = apps.get_model('notifications', 'NotificationCounter')
+
+    overall = NotificationCounter(scope='all')
+    counters = [overall]
+    grouped = (
+        Notification.objects.order_by()
+        .values('service')
+        .annotate(total=Count('id'), read=Count('id', filter=Q(is_read=True)))
+    )
+    for group in grouped:
+        counters.append(
+            NotificationCounter(
+                scope=f"service:{group['service']}",
+                total=group['total'],
+                read=group['read'],
+            )
+        )
+        overall.total += group['total']
+        overall.read += group['read']
+    NotificationCounter.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_notification_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('scope', models.CharField(max_length=80, primary_key=True, serialize=False, verbose_name='Scope')),
+                ('total', models.BigIntegerField(default=0, verbose_name='Total')),
+                ('read', models.BigIntegerField(default=0, verbose_name='Read')),
+            ],
+            options={
+                'verbose_name': 'Notification Counter',
+                'verbose_name_plural': 'Notification Counters',
+            },
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:33
+
+import django.core.validators
+import notifications.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_notification_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentBlob',
+            fields=[
+                ('name', models.CharField(max_length=500, primary_key=True, serialize=False, verbose_name='Name')),
+                ('size', models.BigIntegerField(default=0, verbose_name='Size')),
+                ('refcount', models.IntegerField(default=0, verbose_name='References')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Attachment Blob',
+                'verbose_name_plural': 'Attachment Blobs',
+            },
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='attachment',
+            field=models.FileField(blank=True, help_text='Uploaded file (max 5MB)', max_length=500, null=True, storage=notifications.models.attachment_storage, upload_to=notifications.models.attachment_upload_path, validators=[django.core.validators.FileExtensionValidator(['pdf', 'doc', 'docx', 'ppt', 'pptx', 'zip', 'jpg', 'jpeg', 'png'])], verbose_name='Attachment File'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:37
+
+from django.db import migrations, models
+
+from notifications.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('notifications', '0008_outbox_notification_do_nothing'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(fields=['updated_at'], name='notif_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', True)), fields=['updated_at'], name='notif_read_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:53
+
+from django.db import migrations, models
+
+from notifications.operations import AddIndexConcurrently, RunSQLConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('notifications', '0009_notification_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64, verbose_name='Submission Fingerprint'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, verbose_name='Idempotency Key'),
+        ),
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(fields=['fingerprint', 'created_at'], name='notif_fingerprint_idx'),
+        ),
+        # The same partial unique index AddConstraint would create, built
+        # without locking out writes on PostgreSQL.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                RunSQLConcurrently(
+                    sql=(
+                        "CREATE UNIQUE INDEX {concurrently}IF NOT EXISTS notif_idempotency_key_uniq "
+                        "ON notifications_notification (idempotency_key) "
+                        "WHERE idempotency_key IS NOT NULL"
+                    ),
+                    reverse_sql="DROP INDEX {concurrently}IF EXISTS notif_idempotency_key_uniq",
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='notification',
+                    constraint=models.UniqueConstraint(condition=models.Q(('idempotency_key__isnull', False)), fields=('idempotency_key',), name='notif_idempotency_key_uniq'),
+                ),
+            ],
+        ),
+    ]
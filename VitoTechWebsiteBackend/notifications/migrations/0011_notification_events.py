@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0010_notification_idempotency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('read', 'Read'), ('unread', 'Unread'), ('deleted', 'Deleted')], max_length=10, verbose_name='Kind')),
+                ('notification_ids', models.JSONField(blank=True, null=True, verbose_name='Notification IDs')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='Data')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Notification Event',
+                'verbose_name_plural': 'Notification Events',
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -1,12 +1,28 @@
 # notifications/models.py
 import os
 import uuid
-from django.db import models
+from collections import Counter
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F, Q
 from django.core.validators import FileExtensionValidator
+from django.utils import timezone
+
+from .cache import invalidate as invalidate_response_cache
+
+
+def attachment_storage():
+    # Resolved lazily so tests and deployments can swap STORAGES["attachments"].
+    from django.core.files.storage import storages
+
+    return storages["attachments"]
 
 
 def attachment_upload_path(instance, filename):
-    """Generate upload path for attachments: attachments/2024/01/unique_filename.pdf"""
+    # Only the extension of this name survives: ContentAddressedStorage
+    # (storage.py) names files after their content. Kept because the field
+    # and migrations 0002 and 0007 reference it; changing upload_to would
+    # rebuild the table on SQLite for nothing.
     ext = filename.split('.')[-1]
     filename = f"{uuid.uuid4().hex}.{ext}"
     return os.path.join('attachments', filename)
@@ -48,6 +64,7 @@ class Notification(models.Model):
     attachment = models.FileField(
         "Attachment File",
         upload_to=attachment_upload_path,
+        storage=attachment_storage,
         validators=[
             FileExtensionValidator([
                 'pdf', 'doc', 'docx', 'ppt', 'pptx', 
@@ -67,10 +84,59 @@ class Notification(models.Model):
     created_at = models.DateTimeField("Created At", auto_now_add=True)
     updated_at = models.DateTimeField("Updated At", auto_now=True)
 
+    # Duplicate suppression for the contact form (notifications/idempotency.py)
+    idempotency_key = models.CharField(
+        "Idempotency Key", max_length=255, null=True, blank=True, editable=False
+    )
+    fingerprint = models.CharField(
+        "Submission Fingerprint", max_length=64, blank=True, default="", editable=False
+    )
+
     class Meta:
         ordering = ("-created_at",)
         verbose_name = "Contact Message"
         verbose_name_plural = "Contact Messages"
+        # Every list call orders by (created_at, id) and optionally filters
+        # on is_read or service; the admin uses the same fields for
+        # list_filter and date_hierarchy.
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="notif_created_idx"),
+            models.Index(
+                fields=["is_read", "created_at", "id"],
+                name="notif_read_created_idx",
+            ),
+            models.Index(
+                fields=["service", "created_at", "id"],
+                name="notif_service_created_idx",
+            ),
+            # MAX(updated_at) + COUNT(*) for the list ETag. SQLite compiles
+            # is_read=True to a bare "is_read" test, which only a partial
+            # index can serve (the unread side has notif_unread_created_idx).
+            models.Index(fields=["updated_at"], name="notif_updated_idx"),
+            models.Index(
+                fields=["updated_at"],
+                condition=models.Q(is_read=True),
+                name="notif_read_updated_idx",
+            ),
+            # Small index for the hot "unread inbox" view.
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(is_read=False),
+                name="notif_unread_created_idx",
+            ),
+            # Repeat-submission check: same fingerprint within the window.
+            models.Index(
+                fields=["fingerprint", "created_at"],
+                name="notif_fingerprint_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["idempotency_key"],
+                condition=models.Q(idempotency_key__isnull=False),
+                name="notif_idempotency_key_uniq",
+            ),
+        ]
 
     def __str__(self) -> str:
         status = "read" if self.is_read else "unread"
@@ -90,11 +156,358 @@ class Notification(models.Model):
             return os.path.basename(self.attachment.name)
         return ""
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored attachment name (the raw column value), so save() can
+        # release it when the file is replaced or cleared. Not set when the
+        # column was deferred; such a save doesn't write it either.
+        if "attachment" in instance.__dict__:
+            instance._stored_attachment = instance.__dict__["attachment"] or None
+        return instance
+
+    def _replaced_attachment(self) -> str | None:
+        """The stored name this save replaces or clears, if any."""
+        previous = getattr(self, "_stored_attachment", None)
+        if not previous or "attachment" not in self.__dict__:
+            return None
+        current = self.attachment
+        # A new upload of the same bytes gets the same name but takes its own
+        # reference, so the old one is still released.
+        if current and current._committed and current.name == previous:
+            return None
+        return previous
+
+    def save(self, *args, **kwargs):
+        """Save, releasing the previous attachment if this save replaced it"""
+        update_fields = kwargs.get("update_fields")
+        replaced = None
+        if update_fields is None or "attachment" in update_fields:
+            replaced = self._replaced_attachment()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if replaced:
+                # Dropped after commit, once nothing else references it.
+                self._meta.get_field("attachment").storage.delete(replaced)
+        if "attachment" in self.__dict__:
+            self._stored_attachment = self.attachment.name or None
+
     def delete(self, *args, **kwargs):
-        """Override delete to remove the actual file from storage"""
-        if self.attachment:
-            storage, path = self.attachment.storage, self.attachment.path
-            super().delete(*args, **kwargs)
-            storage.delete(path)
-        else:
-            super().delete(*args, **kwargs)
\ No newline at end of file
+        """Override delete to release the attachment file in storage"""
+        pk = self.pk
+        with transaction.atomic():
+            # Done by hand (not on_delete=SET_NULL) so bulk deletes stay a
+            # single DELETE statement.
+            EmailOutbox.objects.filter(notification=self).update(notification=None)
+            result = super().delete(*args, **kwargs)
+            if self.attachment:
+                # Content-addressed storage drops the file only when this was
+                # its last reference, and only once the row is really gone.
+                self.attachment.storage.delete(self.attachment.name)
+            NotificationCounter.objects.record_deleted([(self.service, self.is_read, 1)])
+            NotificationEvent.objects.record(NotificationEvent.DELETED, [pk])
+            invalidate_response_cache()
+        return result
+
+
+class NotificationCounterManager(models.Manager):
+    """
+    Keeps the running totals behind ``/api/notifications/stats/`` in step
+    with writes. Call these inside the transaction that changes the
+    notifications so the counters commit (or roll back) with them.
+    """
+
+    OVERALL = "all"
+
+    @classmethod
+    def service_scope(cls, service: str) -> str:
+        return f"service:{service}"
+
+    def _bump(self, scopes, total: int = 0, read: int = 0) -> None:
+        if not scopes or (total == 0 and read == 0):
+            return
+        scopes = list(dict.fromkeys(scopes))
+        changes = {"total": F("total") + total, "read": F("read") + read}
+        updated = self.filter(scope__in=scopes).update(**changes)
+        if updated < len(scopes):
+            # First message for this service: create the row, then apply.
+            existing = set(self.filter(scope__in=scopes).values_list("scope", flat=True))
+            missing = [scope for scope in scopes if scope not in existing]
+            self.bulk_create(
+                [self.model(scope=scope) for scope in missing], ignore_conflicts=True
+            )
+            self.filter(scope__in=missing).update(**changes)
+
+    def record_created(self, notification: "Notification") -> None:
+        self._bump(
+            [self.OVERALL, self.service_scope(notification.service)],
+            total=1,
+            read=int(notification.is_read),
+        )
+
+    def record_read_changed(self, service: str, delta: int) -> None:
+        """``delta`` messages with this service became read (or unread if < 0)."""
+        self._bump([self.OVERALL, self.service_scope(service)], read=delta)
+
+    def record_changed(self, old: tuple[str, bool], new: tuple[str, bool]) -> None:
+        """A message's ``(service, is_read)`` went from ``old`` to ``new``."""
+        (old_service, old_read), (new_service, new_read) = old, new
+        if old_service == new_service:
+            self.record_read_changed(new_service, int(new_read) - int(old_read))
+            return
+        self._bump([self.service_scope(old_service)], total=-1, read=-int(old_read))
+        self._bump([self.service_scope(new_service)], total=1, read=int(new_read))
+        self._bump([self.OVERALL], read=int(new_read) - int(old_read))
+
+    def record_deleted(self, groups) -> None:
+        """``groups`` is an iterable of ``(service, is_read, count)``."""
+        for service, is_read, count in groups:
+            self._bump(
+                [self.OVERALL, self.service_scope(service)],
+                total=-count,
+                read=-count if is_read else 0,
+            )
+
+    def stats(self, service: str | None = None) -> dict | None:
+        """
+        Totals from a single primary-key lookup, or ``None`` if the counters
+        have never been built (``manage.py rebuild_notification_counters``).
+        """
+        scope = self.service_scope(service) if service else self.OVERALL
+        rows = {
+            row[0]: row[1:]
+            for row in self.filter(scope__in={self.OVERALL, scope}).values_list(
+                "scope", "total", "read"
+            )
+        }
+        if self.OVERALL not in rows:
+            return None
+        total, read = rows.get(scope, (0, 0))
+        return {"total": total, "read": read, "unread": total - read}
+
+    def rebuild(self) -> None:
+        """Recount everything from the notifications table."""
+        rows = {self.OVERALL: [0, 0]}
+        grouped = (
+            Notification.objects.order_by()
+            .values("service")
+            .annotate(total=Count("id"), read=Count("id", filter=Q(is_read=True)))
+        )
+        for group in grouped:
+            rows[self.service_scope(group["service"])] = [group["total"], group["read"]]
+            rows[self.OVERALL][0] += group["total"]
+            rows[self.OVERALL][1] += group["read"]
+
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(
+                [
+                    self.model(scope=scope, total=total, read=read)
+                    for scope, (total, read) in rows.items()
+                ]
+            )
+
+
+class NotificationCounter(models.Model):
+    """
+    Running message totals: one row overall (``all``) and one per service
+    (``service:<name>``), so unfiltered stats never count the table.
+    """
+
+    scope = models.CharField("Scope", max_length=80, primary_key=True)
+    total = models.BigIntegerField("Total", default=0)
+    read = models.BigIntegerField("Read", default=0)
+
+    objects = NotificationCounterManager()
+
+    class Meta:
+        verbose_name = "Notification Counter"
+        verbose_name_plural = "Notification Counters"
+
+    def __str__(self) -> str:
+        return f"{self.scope}: {self.total} total, {self.read} read"
+
+    @property
+    def unread(self) -> int:
+        return self.total - self.read
+
+
+class AttachmentBlobManager(models.Manager):
+    """
+    Reference counts for content-addressed attachment files. Like the
+    counters, call these inside the transaction that saves or deletes the
+    notifications holding the references.
+    """
+
+    def acquire(self, name: str, size: int) -> None:
+        updated = self.filter(name=name).update(refcount=F("refcount") + 1)
+        if not updated:
+            self.bulk_create(
+                [self.model(name=name, size=size, refcount=0)], ignore_conflicts=True
+            )
+            self.filter(name=name).update(refcount=F("refcount") + 1)
+
+    def release(self, names) -> list[str]:
+        """
+        Drop one reference per entry in ``names`` and return the names that
+        are no longer referenced (including legacy files with no blob row).
+        """
+        counts = Counter(names)
+        by_count: dict[int, list[str]] = {}
+        for name, count in counts.items():
+            by_count.setdefault(count, []).append(name)
+        # One UPDATE per distinct decrement, not one per file.
+        for count, group in by_count.items():
+            self.filter(name__in=group).update(refcount=F("refcount") - count)
+
+        referenced = set(
+            self.filter(name__in=list(counts), refcount__gt=0).values_list("name", flat=True)
+        )
+        return [name for name in counts if name not in referenced]
+
+
+class AttachmentBlob(models.Model):
+    """
+    One stored attachment file, shared by every message that uploaded the
+    same bytes. ``name`` is the storage path (``attachments/ab/cd/<sha256>.ext``).
+    """
+
+    name = models.CharField("Name", max_length=500, primary_key=True)
+    size = models.BigIntegerField("Size", default=0)
+    refcount = models.IntegerField("References", default=0)
+    created_at = models.DateTimeField("Created At", auto_now_add=True)
+
+    objects = AttachmentBlobManager()
+
+    class Meta:
+        verbose_name = "Attachment Blob"
+        verbose_name_plural = "Attachment Blobs"
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.refcount} refs)"
+
+
+class NotificationEventManager(models.Manager):
+    """
+    Append-only change log behind the dashboard event stream
+    (notifications/events.py). Record inside the transaction that makes the
+    change, so an event is only ever seen for a change that committed.
+    """
+
+    def max_ids(self) -> int:
+        return int(getattr(settings, "NOTIFICATIONS_EVENT_MAX_IDS", 1000))
+
+    def record(self, kind: str, ids, data: dict | None = None) -> "NotificationEvent":
+        """
+        Log one event for ``ids``. More ids than ``max_ids()`` are stored as
+        ``None``: "many messages changed, refetch".
+        """
+        ids = None if ids is None else list(ids)
+        if ids is not None and len(ids) > self.max_ids():
+            ids = None
+        event = self.create(kind=kind, notification_ids=ids, data=data or {})
+        # Keep only the newest events; a stream resuming from before them is
+        # told to reload instead.
+        keep = int(getattr(settings, "NOTIFICATIONS_EVENT_RETENTION", 1000))
+        self.filter(pk__lte=event.pk - keep).delete()
+        return event
+
+
+class NotificationEvent(models.Model):
+    """A change to one or more notifications, as pushed to the dashboard."""
+
+    CREATED = "created"
+    UPDATED = "updated"
+    READ = "read"
+    UNREAD = "unread"
+    DELETED = "deleted"
+    KIND_CHOICES = [
+        (CREATED, "Created"),
+        (UPDATED, "Updated"),
+        (READ, "Read"),
+        (UNREAD, "Unread"),
+        (DELETED, "Deleted"),
+    ]
+
+    kind = models.CharField("Kind", max_length=10, choices=KIND_CHOICES)
+    # Plain ids, not a foreign key: deleted messages keep their events.
+    notification_ids = models.JSONField("Notification IDs", null=True, blank=True)
+    data = models.JSONField("Data", default=dict, blank=True)
+    created_at = models.DateTimeField("Created At", auto_now_add=True)
+
+    objects = NotificationEventManager()
+
+    class Meta:
+        ordering = ("id",)
+        verbose_name = "Notification Event"
+        verbose_name_plural = "Notification Events"
+
+    def __str__(self) -> str:
+        return f"#{self.pk} {self.kind} {self.notification_ids}"
+
+
+class EmailOutbox(models.Model):
+    """
+    An e-mail waiting to be delivered by the ``deliver_emails`` worker.
+
+    Rows are written in the same transaction as the Notification they belong
+    to, so mail is never lost when a web worker is recycled mid-send.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    # Unlinked explicitly before a notification is deleted (see
+    # Notification.delete and bulk_delete_notifications).
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name="outbox_emails",
+    )
+
+    # Rendered message – kept here so delivery does not depend on the
+    # notification still existing.
+    subject = models.CharField("Subject", max_length=255)
+    body = models.TextField("Body")
+    from_email = models.CharField("From", max_length=254, blank=True)
+    recipients = models.JSONField("Recipients", default=list)
+
+    # Delivery state
+    status = models.CharField(
+        "Status",
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField("Attempts", default=0)
+    next_attempt_at = models.DateTimeField("Next Attempt At", default=timezone.now)
+    claimed_at = models.DateTimeField("Claimed At", null=True, blank=True)
+    claimed_by = models.CharField("Claimed By", max_length=100, blank=True)
+    last_error = models.TextField("Last Error", blank=True)
+
+    created_at = models.DateTimeField("Created At", auto_now_add=True)
+    sent_at = models.DateTimeField("Sent At", null=True, blank=True)
+
+    class Meta:
+        ordering = ("next_attempt_at", "id")
+        verbose_name = "Outbox E-mail"
+        verbose_name_plural = "Outbox E-mails"
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="notif_outbox_due_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
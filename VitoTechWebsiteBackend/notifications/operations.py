@@ -0,0 +1,50 @@
+# notifications/operations.py
+"""
+Custom migration operations.
+"""
+from django.db import migrations
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    ``AddIndex`` that builds the index with ``CREATE INDEX CONCURRENTLY`` on
+    PostgreSQL, so production keeps accepting writes while it is built.
+    Other databases get a plain ``CREATE INDEX``.
+
+    Migrations using it must set ``atomic = False``.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+    def describe(self):
+        return f"{super().describe()} (concurrently on PostgreSQL)"
+
+
+class RunSQLConcurrently(migrations.RunSQL):
+    """
+    ``RunSQL`` for index DDL written with a ``{concurrently}`` placeholder:
+    ``CONCURRENTLY`` on PostgreSQL, nothing on other databases. Pair it with
+    ``SeparateDatabaseAndState`` to record the matching index or constraint.
+
+    Migrations using it must set ``atomic = False``.
+    """
+
+    def _run_sql(self, schema_editor, sqls):
+        keyword = "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+        if isinstance(sqls, (list, tuple)):
+            sqls = [sql.format(concurrently=keyword) for sql in sqls]
+        else:
+            sqls = sqls.format(concurrently=keyword)
+        super()._run_sql(schema_editor, sqls)
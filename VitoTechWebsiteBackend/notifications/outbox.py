@@ -0,0 +1,191 @@
+# notifications/outbox.py
+"""
+Durable e-mail outbox.
+
+The API only *queues* e-mails (inside the same transaction that saves the
+Notification); the ``deliver_emails`` management command claims due rows in
+batches and sends them over pooled SMTP connections, retrying failures with
+exponential backoff.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .emails import build_notification_emails
+from .mail_pool import get_mail_pool
+from .models import EmailOutbox, Notification
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+@dataclass
+class DeliveryResult:
+    claimed: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+def enqueue_notification_emails(notification: Notification) -> list[EmailOutbox]:
+    """
+    Queue the admin notification and visitor acknowledgement for delivery.
+
+    Call this inside the transaction that saved ``notification`` so the
+    e-mails are committed (or rolled back) together with it.
+    """
+    rows = [
+        EmailOutbox(
+            notification=notification,
+            subject=message.subject,
+            body=message.body,
+            from_email=message.from_email or "",
+            recipients=list(message.to),
+        )
+        for message in build_notification_emails(notification)
+    ]
+    return EmailOutbox.objects.bulk_create(rows)
+
+
+def claim_batch(worker_id: str, batch_size: int | None = None) -> list[EmailOutbox]:
+    """
+    Atomically mark up to ``batch_size`` due e-mails as ``sending`` for
+    ``worker_id`` and return them.
+
+    Rows left in ``sending`` by a worker that died are released again once
+    their lease (``NOTIFICATIONS_OUTBOX_LEASE_SECONDS``) has expired.
+    """
+    batch_size = batch_size or _setting("NOTIFICATIONS_OUTBOX_BATCH_SIZE", 20)
+    now = timezone.now()
+    lease_expired = now - timedelta(
+        seconds=_setting("NOTIFICATIONS_OUTBOX_LEASE_SECONDS", 600)
+    )
+
+    with transaction.atomic():
+        EmailOutbox.objects.filter(
+            status=EmailOutbox.STATUS_SENDING,
+            claimed_at__lt=lease_expired,
+        ).update(status=EmailOutbox.STATUS_PENDING, claimed_by="")
+
+        due = EmailOutbox.objects.filter(
+            status=EmailOutbox.STATUS_PENDING,
+            next_attempt_at__lte=now,
+        ).order_by("next_attempt_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list("id", flat=True)[:batch_size])
+
+        if not ids:
+            return []
+
+        # The status guard makes the claim safe even without row locks
+        # (SQLite): a row another worker already took is simply not updated.
+        EmailOutbox.objects.filter(
+            id__in=ids,
+            status=EmailOutbox.STATUS_PENDING,
+        ).update(
+            status=EmailOutbox.STATUS_SENDING,
+            claimed_at=now,
+            claimed_by=worker_id,
+        )
+
+    return list(
+        EmailOutbox.objects.filter(
+            id__in=ids,
+            status=EmailOutbox.STATUS_SENDING,
+            claimed_by=worker_id,
+        )
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff: base * 2^(attempts - 1), capped."""
+    base = _setting("NOTIFICATIONS_OUTBOX_RETRY_BASE_SECONDS", 30)
+    cap = _setting("NOTIFICATIONS_OUTBOX_RETRY_MAX_SECONDS", 3600)
+    return timedelta(seconds=min(cap, base * 2 ** max(attempts - 1, 0)))
+
+
+def _to_message(row: EmailOutbox) -> EmailMessage:
+    return EmailMessage(row.subject, row.body, row.from_email or None, row.recipients)
+
+
+def _mark_sent(row: EmailOutbox) -> None:
+    row.status = EmailOutbox.STATUS_SENT
+    row.attempts += 1
+    row.sent_at = timezone.now()
+    row.last_error = ""
+    row.save(update_fields=["status", "attempts", "sent_at", "last_error"])
+
+
+def _mark_failed(row: EmailOutbox, error: Exception) -> bool:
+    """Record a failed attempt. Returns True if the row will be retried."""
+    row.attempts += 1
+    row.last_error = f"{type(error).__name__}: {error}"
+    row.claimed_by = ""
+    max_attempts = _setting("NOTIFICATIONS_OUTBOX_MAX_ATTEMPTS", 8)
+    if row.attempts >= max_attempts:
+        row.status = EmailOutbox.STATUS_FAILED
+    else:
+        row.status = EmailOutbox.STATUS_PENDING
+        row.next_attempt_at = timezone.now() + retry_delay(row.attempts)
+    row.save(
+        update_fields=[
+            "status",
+            "attempts",
+            "last_error",
+            "claimed_by",
+            "next_attempt_at",
+        ]
+    )
+    return row.status == EmailOutbox.STATUS_PENDING
+
+
+def deliver_batch(worker_id: str, batch_size: int | None = None) -> DeliveryResult:
+    """
+    Claim one batch of due e-mails and send them together over a pooled,
+    already-authenticated connection. Each row is settled individually so
+    one bad recipient does not fail the whole batch.
+    """
+    rows = claim_batch(worker_id, batch_size)
+    result = DeliveryResult(claimed=len(rows))
+    if not rows:
+        return result
+
+    errors = get_mail_pool().send_messages([_to_message(row) for row in rows])
+    for row, error in zip(rows, errors):
+        if error is None:
+            _mark_sent(row)
+            result.sent += 1
+            continue
+        logger.warning("Delivery of outbox e-mail %s failed: %s", row.pk, error)
+        if _mark_failed(row, error):
+            result.retried += 1
+        else:
+            result.failed += 1
+
+    return result
+
+
+def queue_depth() -> dict[str, int]:
+    """
+    Number of outbox rows per status, plus how many pending rows are due now.
+    """
+    depth = {status: 0 for status, _ in EmailOutbox.STATUS_CHOICES}
+    for row in EmailOutbox.objects.order_by().values("status").annotate(n=Count("id")):
+        depth[row["status"]] = row["n"]
+    depth["due"] = EmailOutbox.objects.filter(
+        status=EmailOutbox.STATUS_PENDING,
+        next_attempt_at__lte=timezone.now(),
+    ).count()
+    return depth
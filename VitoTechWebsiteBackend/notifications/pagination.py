@@ -0,0 +1,218 @@
+# notifications/pagination.py
+"""
+Keyset ("seek") pagination for the notifications API.
+
+Pages are addressed by the ordering values of the last row seen, e.g.
+``WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id
+DESC LIMIT n``, so every page costs one index range scan no matter how deep
+into the history it is, and no ``COUNT(*)`` is ever needed.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on a unique, fully ordered tuple of columns.
+
+    The view may set ``keyset_ordering`` (or define ``get_keyset_ordering``)
+    to change the key; the last entry must be unique (normally ``id``).
+    """
+
+    page_size = 25
+    max_page_size = 200
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    ordering = ("-id",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_ordering(self, request, queryset, view) -> tuple[str, ...]:
+        if hasattr(view, "get_keyset_ordering"):
+            return tuple(view.get_keyset_ordering(queryset))
+        return tuple(getattr(view, "keyset_ordering", self.ordering))
+
+    def get_page_size(self, request) -> int:
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                value = int(raw)
+            except ValueError:
+                value = 0
+            if value > 0:
+                return min(value, self.max_page_size)
+        return self.page_size
+
+    # ------------------------------------------------------------------
+    # Cursor encoding
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def _decode_value(self, model, field_name: str, value):
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            # Annotations (e.g. a search rank) are plain JSON numbers.
+            return value
+        return field.to_python(value)
+
+    def encode_cursor(self, values, reverse: bool) -> str:
+        payload = {"v": [self._encode_value(v) for v in values]}
+        if reverse:
+            payload["r"] = 1
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        encoded = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, model, fields):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            values = payload["v"]
+            if len(values) != len(fields):
+                raise ValueError
+            values = [
+                self._decode_value(model, field, value)
+                for field, value in zip(fields, values)
+            ]
+        except (TypeError, ValueError, KeyError, binascii.Error, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(payload.get("r"))
+
+    # ------------------------------------------------------------------
+    # Query building
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _seek_filter(ordering, values) -> Q:
+        """
+        Rows strictly after ``values`` in ``ordering``:
+        (a > x) OR (a = x AND b > y) OR ...
+
+        The leading ``a >= x`` bound is redundant but lets the planner turn
+        the OR into a single index range scan.
+        """
+        condition = Q()
+        equal_prefix = Q()
+        for term, value in zip(ordering, values):
+            name = term.lstrip("-")
+            lookup = "lt" if term.startswith("-") else "gt"
+            condition |= equal_prefix & Q(**{f"{name}__{lookup}": value})
+            equal_prefix &= Q(**{name: value})
+
+        first = ordering[0]
+        bound = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{bound}": values[0]}) & condition
+
+    @staticmethod
+    def _reverse(ordering):
+        return tuple(t[1:] if t.startswith("-") else f"-{t}" for t in ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = remove_query_param(
+            request.build_absolute_uri(), self.cursor_query_param
+        )
+        self.page_size = self.get_page_size(request)
+        self.keyset = self.get_ordering(request, queryset, view)
+        fields = [term.lstrip("-") for term in self.keyset]
+
+        values, reverse = self.decode_cursor(request, queryset.model, fields)
+        self.has_cursor = values is not None
+
+        ordering = self._reverse(self.keyset) if reverse else self.keyset
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, values))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.has_cursor
+
+        self.page = rows
+        return rows
+
+    def _key(self, obj):
+        # Rows are model instances, or dicts when the view paginates values().
+        if isinstance(obj, dict):
+            return [obj[term.lstrip("-")] for term in self.keyset]
+        return [getattr(obj, term.lstrip("-")) for term in self.keyset]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._key(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self._key(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Number of results per page (max {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class NotificationPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
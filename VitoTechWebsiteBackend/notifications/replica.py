@@ -0,0 +1,185 @@
+# notifications/replica.py
+"""
+Optional read replica for the admin's heavy reads (``DB_REPLICA_HOST``).
+
+Only the requests that opt in read from the replica: the API's list,
+retrieve, stats and export, plus the admin changelist. They opt in with
+``allow_replica_reads()``, which ``ReplicaRouter`` then honours for that
+request. Every other read and every write goes to ``default``. This matters
+for the contact form's duplicate check and for ``mark_read``'s
+read-then-update, which must never see a lagging copy.
+
+Even an opted-in request stays on ``default`` when:
+
+- it already wrote, since ``db_for_write`` marks the request;
+- the client wrote within ``DB_REPLICA_PIN_SECONDS``. A successful (2xx)
+  unsafe request by a staff user sets a short-lived cookie, so an admin
+  sees their own ``mark_read`` or the message they just created on the next
+  page load. Only that client is pinned: anonymous contact-form posts and
+  failed requests pin nobody;
+- the replica is more than ``DB_REPLICA_MAX_LAG`` seconds behind, or
+  cannot be reached. This is checked at most every
+  ``DB_REPLICA_LAG_CHECK_INTERVAL`` seconds per process.
+
+Responses read from the replica are never stored in the shared response
+cache (cache.py): a lagging copy could otherwise be filed under the
+generation a newer write started and served to everyone until the next one.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA = "replica"
+PIN_COOKIE = "db_primary_until"
+UNSAFE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+# Streaming replicas: zero when the replica has replayed all the WAL it has
+# received (idle primaries included), else the age of the last replayed
+# transaction. NULL-safe on a server that is not a standby.
+POSTGRESQL_LAG_SQL = """
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+"""
+
+
+@dataclass
+class RequestState:
+    pinned: bool = False
+    replica_allowed: bool = False
+    wrote: bool = False
+
+
+_state: contextvars.ContextVar[RequestState | None] = contextvars.ContextVar(
+    "replica_request_state", default=None
+)
+_lag = {"checked_at": float("-inf"), "caught_up": False}
+
+
+def replica_configured() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+def pin_seconds() -> float:
+    return float(getattr(settings, "DB_REPLICA_PIN_SECONDS", 5))
+
+
+def replica_lag() -> float:
+    """Seconds the replica is behind (raises ``DatabaseError`` if it's down)."""
+    connection = connections[REPLICA]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRESQL_LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def replica_caught_up() -> bool:
+    now = time.monotonic()
+    if now - _lag["checked_at"] < float(getattr(settings, "DB_REPLICA_LAG_CHECK_INTERVAL", 5)):
+        return _lag["caught_up"]
+    try:
+        lag = replica_lag()
+    except DatabaseError:
+        logger.warning("Read replica unreachable; reading from %s", DEFAULT_DB_ALIAS, exc_info=True)
+        caught_up = False
+    else:
+        caught_up = lag <= float(getattr(settings, "DB_REPLICA_MAX_LAG", 2))
+        if not caught_up:
+            logger.warning("Read replica %.1fs behind; reading from %s", lag, DEFAULT_DB_ALIAS)
+    _lag.update(checked_at=now, caught_up=caught_up)
+    return caught_up
+
+
+def allow_replica_reads() -> bool:
+    """
+    Let the rest of this request read from the replica, unless the client
+    wrote recently or the replica lags. Returns whether it will.
+    """
+    state = _state.get()
+    if state is None:
+        return False
+    state.replica_allowed = not state.pinned and replica_caught_up()
+    return state.replica_allowed
+
+
+def read_database() -> str:
+    """The alias this request's reads go to (for querysets read lazily)."""
+    state = _state.get()
+    if state is not None and state.replica_allowed and not state.wrote:
+        return REPLICA
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_database()
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        # Explicit: left to Django, an instance read from the replica would
+        # be saved back to it.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
+
+
+class ReadYourWritesMiddleware:
+    """
+    Tracks the request for ``ReplicaRouter`` and pins staff clients whose
+    writes succeeded to ``default`` for ``DB_REPLICA_PIN_SECONDS``.
+    """
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned = float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            pinned = False
+
+        token = _state.set(RequestState(pinned=pinned))
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if self._pins(request, response):
+            seconds = pin_seconds()
+            response.set_cookie(
+                PIN_COOKIE,
+                f"{time.time() + seconds:.3f}",
+                max_age=int(seconds) + 1,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    @staticmethod
+    def _pins(request, response) -> bool:
+        # DRF copies the user it authenticated (JWT) onto the Django request.
+        user = getattr(request, "user", None)
+        return (
+            request.method in UNSAFE_METHODS
+            and 200 <= response.status_code < 300
+            and user is not None
+            and user.is_authenticated
+            and user.is_staff
+        )
@@ -0,0 +1,174 @@
+# notifications/search.py
+"""
+Full-text search over contact messages.
+
+- SQLite:     an FTS5 table (``notifications_notification_fts``) kept in sync
+              with the notifications table by triggers.
+- PostgreSQL: a generated ``search_vector`` tsvector column with a GIN index.
+
+Both are created by migration 0004 and maintained by the database itself,
+so every save, ``update()`` and delete is reflected without any
+application code. When the index is not there (e.g. SQLite built without
+FTS5) search falls back to the old ``icontains`` scan.
+"""
+from __future__ import annotations
+
+import re
+
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+
+TABLE = "notifications_notification"
+SQLITE_FTS_TABLE = "notifications_notification_fts"
+POSTGRES_VECTOR_COLUMN = "search_vector"
+
+SEARCH_FIELDS = ("name", "email", "phone", "company", "message")
+
+# bm25() column weights, in SEARCH_FIELDS order.
+SQLITE_WEIGHTS = "10.0, 10.0, 5.0, 5.0, 1.0"
+
+# Keep prefix queries cheap: a handful of terms is plenty for an inbox.
+MAX_TERMS = 8
+
+_index_cache: dict[tuple[str, str], bool] = {}
+
+
+def search_terms(raw: str) -> list[str]:
+    return re.findall(r"\w+", raw.lower())[:MAX_TERMS]
+
+
+# ----------------------------------------------------------------------
+# Index maintenance (migration 0004 creates the index with its own DDL)
+# ----------------------------------------------------------------------
+def _sqlite_trigger_sql() -> list[str]:
+    columns = ", ".join(SEARCH_FIELDS)
+    new_values = ", ".join(f"new.{f}" for f in SEARCH_FIELDS)
+    old_values = ", ".join(f"old.{f}" for f in SEARCH_FIELDS)
+    fts = SQLITE_FTS_TABLE
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {TABLE} BEGIN
+            INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {TABLE} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {columns})
+            VALUES ('delete', old.id, {old_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {TABLE} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {columns})
+            VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+        """,
+    ]
+
+
+def _sqlite_has_table(cursor, name: str, kind: str = "table") -> bool:
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = %s AND name = %s", [kind, name]
+    )
+    return cursor.fetchone() is not None
+
+
+def repair_sqlite_triggers(using: str) -> None:
+    """
+    SQLite migrations that rebuild the notifications table (most AddField /
+    AlterField operations) silently drop its triggers. Re-create them and
+    rebuild the index if that happened.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        if not _sqlite_has_table(cursor, SQLITE_FTS_TABLE):
+            return
+        if _sqlite_has_table(cursor, f"{SQLITE_FTS_TABLE}_au", kind="trigger"):
+            return
+        for statement in _sqlite_trigger_sql():
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def has_search_index(using: str) -> bool:
+    connection = connections[using]
+    key = (using, str(connection.settings_dict["NAME"]))
+    if key not in _index_cache:
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                found = _sqlite_has_table(cursor, SQLITE_FTS_TABLE)
+            elif connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT 1 FROM information_schema.columns "
+                    "WHERE table_name = %s AND column_name = %s",
+                    [TABLE, POSTGRES_VECTOR_COLUMN],
+                )
+                found = cursor.fetchone() is not None
+            else:
+                found = False
+        _index_cache[key] = found
+    return _index_cache[key]
+
+
+# ----------------------------------------------------------------------
+# Querying
+# ----------------------------------------------------------------------
+def _icontains(queryset, raw: str):
+    condition = models.Q()
+    for field in SEARCH_FIELDS:
+        condition |= models.Q(**{f"{field}__icontains": raw})
+    return queryset.filter(condition)
+
+
+def search_notifications(queryset, raw: str):
+    """
+    Filter ``queryset`` to messages matching ``raw``.
+
+    With a search index the result is annotated with ``search_rank``
+    (higher is better) and ordered by it; every term is prefix-matched so
+    partial words typed in the admin UI already match.
+    """
+    terms = search_terms(raw)
+    if not terms or not has_search_index(queryset.db):
+        return _icontains(queryset, raw)
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite":
+        fts = SQLITE_FTS_TABLE
+        match = " ".join(f'"{term}"*' for term in terms)
+        queryset = queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match])
+        ).annotate(
+            # bm25() is "lower is better"; negate so both backends sort DESC.
+            search_rank=RawSQL(
+                f"SELECT -bm25({fts}, {SQLITE_WEIGHTS}) FROM {fts} "
+                f"WHERE {fts} MATCH %s AND {fts}.rowid = {TABLE}.id",
+                [match],
+                output_field=models.FloatField(),
+            )
+        )
+    else:
+        query = " & ".join(f"{term}:*" for term in terms)
+        vector = f"{TABLE}.{POSTGRES_VECTOR_COLUMN}"
+        queryset = queryset.filter(
+            RawSQL(
+                f"{vector} @@ to_tsquery('simple', %s)",
+                [query],
+                output_field=models.BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank_cd({vector}, to_tsquery('simple', %s))",
+                [query],
+                output_field=models.FloatField(),
+            )
+        )
+
+    return queryset.order_by("-search_rank", "-id")
+
+
+def is_ranked(queryset) -> bool:
+    return "search_rank" in queryset.query.annotations
@@ -1,8 +1,66 @@
 # notifications/serializers.py
+from django.db import models
 from rest_framework import serializers
+from rest_framework.reverse import reverse
+
 from .models import Notification
+from .uploads import EXTENSION_TYPES, max_upload_size
+
+class SparseFieldsMixin:
+    """
+    Accepts ``fields=[...]`` to return only some of the declared fields, and
+    says which model columns those need so the view can ``only()`` them.
+    """
+
+    # Serializer fields backed by something other than a same-named column.
+    field_columns: dict[str, tuple[str, ...]] = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def field_names(cls) -> list[str]:
+        return list(cls.Meta.fields)
+
+    @classmethod
+    def columns_for(cls, fields=None) -> list[str]:
+        columns = []
+        for name in fields or cls.field_names():
+            columns.extend(cls.field_columns.get(name, (name,)))
+        return list(dict.fromkeys(columns))
+
+
+class AttachmentField(serializers.FileField):
+    """
+    Accepts the upload, and reads back as the message's protected
+    ``/api/notifications/{id}/download/`` URL: the storage path is not
+    served to anyone.
+    """
+
+    def download_url_builder(self):
+        """``pk -> download URL``, resolving the route only once."""
+        base = reverse("notification-list", request=self.context.get("request"))
+        return lambda pk: f"{base}{pk}/download/"
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return self.download_url_builder()(value.instance.pk)
+
+
+class NotificationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Keeps the label, help text and validators generated from the model.
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FileField: AttachmentField,
+    }
+
+    # The download URL is built from the message's id.
+    field_columns = {"attachment": ("attachment", "id")}
 
-class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = [
@@ -30,15 +88,82 @@ class NotificationSerializer(serializers.ModelSerializer):
     def validate_attachment(self, value):
         """Validate the uploaded file"""
         if value:
-            max_size = 5 * 1024 * 1024 
+            max_size = max_upload_size()
             if value.size > max_size:
-                raise serializers.ValidationError("File size must be less than 5MB.")
-            
+                raise serializers.ValidationError(
+                    f"File size must be less than {max_size // (1024 * 1024)}MB."
+                )
+
             allowed_extensions = ['pdf', 'doc', 'docx', 'ppt', 'pptx', 'zip', 'jpg', 'jpeg', 'png']
             ext = value.name.split('.')[-1].lower()
             if ext not in allowed_extensions:
                 raise serializers.ValidationError(
                     f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}"
                 )
-        
+
+            # Set by StreamingAttachmentUploadHandler from the file's first bytes
+            sniffed_type = getattr(value, "sniffed_type", False)
+            if sniffed_type is not False and sniffed_type != EXTENSION_TYPES[ext]:
+                raise serializers.ValidationError(
+                    "File content does not match its extension."
+                )
+
         return value
+
+    def validate(self, attrs):
+        # Files the upload handler refused never reach the field validators.
+        request = self.context.get("request")
+        upload_errors = getattr(request, "upload_errors", None) if request else None
+        if upload_errors:
+            raise serializers.ValidationError(upload_errors)
+        return attrs
+
+class NotificationListSerializer(NotificationSerializer):
+    """
+    Compact inbox row (``?view=compact``): no message body and only a flag
+    for the attachment, so neither is read from the database.
+    """
+
+    has_attachment = serializers.BooleanField(read_only=True)
+
+    field_columns = {"has_attachment": ("attachment",)}
+
+    class Meta(NotificationSerializer.Meta):
+        fields = [
+            "id",
+            "name",
+            "email",
+            "company",
+            "service",
+            "has_attachment",
+            "is_read",
+            "read_at",
+            "created_at",
+        ]
+
+
+class BulkSelectionSerializer(serializers.Serializer):
+    """Body of the bulk endpoints: explicit ids, or none to use the query filters."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=10000,
+    )
+
+
+class BulkDeleteReportSerializer(serializers.Serializer):
+    deleted = serializers.IntegerField()
+    attachments = serializers.IntegerField()
+    files = serializers.IntegerField()
+    bytes_freed = serializers.IntegerField()
+
+
+class BulkUpdateResultSerializer(serializers.Serializer):
+    updated = serializers.IntegerField()
+
+
+class EventTicketSerializer(serializers.Serializer):
+    ticket = serializers.CharField()
+    expires_in = serializers.IntegerField()
@@ -0,0 +1,116 @@
+# notifications/storage.py
+"""
+Content-addressed storage for contact-form attachments.
+
+Files are named after the SHA-256 of their bytes and sharded two levels deep
+(``attachments/ab/cd/abcd…ef.pdf``) so no directory grows huge. The same
+brochure uploaded ten times is written once; ``AttachmentBlob`` counts the
+messages referencing it and the file is removed when the last one is deleted
+or has its attachment replaced or cleared (``Notification.save()``).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+ROOT = "attachments"
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+
+
+def content_sha256(content) -> str:
+    """
+    SHA-256 of an uploaded file. Uploads that went through
+    ``StreamingAttachmentUploadHandler`` already carry it.
+    """
+    digest = getattr(content, "sha256", None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+def blob_name(digest: str, extension: str = "") -> str:
+    shards = [
+        digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_LEVELS)
+    ]
+    return "/".join([ROOT, *shards, f"{digest}{extension.lower()}"])
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that deduplicates by content.
+
+    ``save()`` ignores the suggested name apart from its extension and keeps
+    a reference count per file; ``delete()`` drops one reference and removes
+    the file after commit once nothing uses it. Files saved before this
+    storage existed have no blob row and are removed on delete as before.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # Two uploads of the same bytes racing to create the blob write
+        # identical content, so letting the second one win is harmless.
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(*args, **kwargs)
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save().
+        return name
+
+    def _save(self, name, content):
+        # Imported here: the model module resolves this storage at import time.
+        from .models import AttachmentBlob
+
+        extension = os.path.splitext(name)[1]
+        name = blob_name(content_sha256(content), extension)
+        with transaction.atomic():
+            AttachmentBlob.objects.acquire(name, content.size)
+            if not self.exists(name):
+                name = super()._save(name, content)
+        return name
+
+    def delete(self, name):
+        from .models import AttachmentBlob
+
+        if not name:
+            raise ValueError("The name must be given to delete().")
+        with transaction.atomic():
+            unreferenced = AttachmentBlob.objects.release([name])
+            if unreferenced:
+                transaction.on_commit(lambda: self.purge(unreferenced))
+
+    def purge(self, names) -> int:
+        """
+        Remove the files for ``names`` that are still unreferenced and
+        return the number of bytes freed. A name re-acquired by an upload
+        since it was released is left alone.
+        """
+        from .models import AttachmentBlob
+
+        freed = 0
+        with transaction.atomic():
+            # Deleting the rows first makes a concurrent upload of the same
+            # content wait for us and then write the file again.
+            AttachmentBlob.objects.filter(name__in=names, refcount__lte=0).delete()
+            kept = set(
+                AttachmentBlob.objects.filter(name__in=names).values_list("name", flat=True)
+            )
+            for name in names:
+                if name in kept:
+                    continue
+                try:
+                    size = self.size(name)
+                except OSError:
+                    continue
+                super().delete(name)
+                freed += size
+        return freed
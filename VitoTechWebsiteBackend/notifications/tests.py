@@ -1,3 +1,1651 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+from unittest import addModuleCleanup, mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+from VitoTechWebsite.profiling import RequestProfile
+from VitoTechWebsite.sqlite3 import write_lock as sqlite_write_lock
+from VitoTechWebsite.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+from . import replica
+from .benchmarking import benchmark_queryset, seed_notifications
+from .cache import cache_stats, get_cache, reset_cache_stats
+from .db_metrics import reset_connection_stats
+from .fast_serializers import FastNotificationSerializer
+from .mail_pool import get_mail_pool, reset_mail_pool
+from .models import (
+    AttachmentBlob,
+    EmailOutbox,
+    Notification,
+    NotificationCounter,
+    NotificationEvent,
+)
+from .outbox import deliver_batch, queue_depth
+from .search import search_notifications
+from .serializers import NotificationListSerializer, NotificationSerializer
+from .throttling import KEY_PREFIX as THROTTLE_KEY_PREFIX
+from .throttling import TokenBucket
+from .throttling import get_cache as get_throttle_cache
+from .uploads import StreamingAttachmentUploadHandler
+
+
+def setUpModule():
+    # Most tests write fixtures straight through the ORM, which does not
+    # invalidate the response cache; NotificationResponseCacheTests turn it on.
+    # Likewise the contact form throttle and duplicate suppression, which
+    # ContactFormThrottleTests and DuplicateSubmissionTests cover.
+    override = override_settings(
+        NOTIFICATIONS_RESPONSE_CACHE=False,
+        NOTIFICATIONS_THROTTLE=False,
+        NOTIFICATIONS_DUPLICATE_WINDOW=0,
+    )
+    override.enable()
+    addModuleCleanup(override.disable)
+
+
+CONTACT_FORM = {
+    "name": "Asha Juma",
+    "email": "asha@example.com",
+    "phone": "+255700000000",
+    "company": "Kilimo Ltd",
+    "service": "Website Development",
+    "message": "We need a new website for our cooperative.",
+}
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    DEFAULT_FROM_EMAIL="info@vitohub.org",
+)
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        reset_mail_pool()
+        self.addCleanup(reset_mail_pool)
+
+    def test_create_queues_emails_without_sending(self):
+        response = self.client.post("/api/notifications/", CONTACT_FORM)
+
+        self.assertEqual(response.status_code, 201)
+        rows = EmailOutbox.objects.filter(notification_id=response.data["id"])
+        self.assertEqual(rows.count(), 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_worker_delivers_and_settles_rows(self):
+        self.client.post("/api/notifications/", CONTACT_FORM)
+
+        result = deliver_batch("test-worker")
+
+        self.assertEqual((result.claimed, result.sent), (2, 2))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(queue_depth()["sent"], 2)
+        self.assertEqual(deliver_batch("test-worker").claimed, 0)
+
+    def test_failed_send_is_retried_later(self):
+        self.client.post("/api/notifications/", CONTACT_FORM)
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=OSError("connection refused"),
+        ):
+            result = deliver_batch("test-worker")
+
+        self.assertEqual(result.retried, 2)
+        row = EmailOutbox.objects.first()
+        self.assertEqual(row.status, EmailOutbox.STATUS_PENDING)
+        self.assertEqual(row.attempts, 1)
+        self.assertGreater(row.next_attempt_at, row.created_at)
+        # Not due yet, so nothing is claimed.
+        self.assertEqual(deliver_batch("test-worker").claimed, 0)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_batches_reuse_one_pooled_connection(self):
+        self.client.post("/api/notifications/", CONTACT_FORM)
+        deliver_batch("test-worker")
+        self.client.post("/api/notifications/", CONTACT_FORM)
+        deliver_batch("test-worker")
+
+        stats = get_mail_pool().stats.as_dict()
+        self.assertEqual(stats["handshakes"], 1)
+        self.assertEqual(stats["reuses"], 1)
+        self.assertEqual(stats["messages_sent"], 4)
+
+
+class NotificationPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+
+        # Identical timestamps force the id tie-breaker to do its job.
+        now = timezone.now()
+        for i in range(7):
+            Notification.objects.create(
+                name=f"Visitor {i}",
+                email=f"visitor{i}@example.com",
+                service="IT Consulting" if i % 2 else "Other",
+                message="Hello",
+            )
+        Notification.objects.update(created_at=now)
+        self.expected = list(
+            Notification.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+    def _walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row["id"] for row in response.data["results"]]
+            url = response.data["next"]
+            pages += 1
+        return ids, pages
+
+    def test_forward_walk_visits_every_row_once(self):
+        ids, pages = self._walk("/api/notifications/?page_size=3")
+
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(pages, 3)
+
+    def test_previous_link_returns_to_earlier_page(self):
+        first = self.client.get("/api/notifications/?page_size=3").data
+        second = self.client.get(first["next"]).data
+        back = self.client.get(second["previous"]).data
+
+        self.assertIsNone(first["previous"])
+        self.assertEqual(
+            [row["id"] for row in back["results"]],
+            [row["id"] for row in first["results"]],
+        )
+
+    def test_filters_apply_inside_pages(self):
+        ids, _ = self._walk("/api/notifications/?page_size=2&service=Other")
+
+        expected = list(
+            Notification.objects.filter(service="Other")
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_no_count_query(self):
+        # One aggregate for the ETag validators, then the page itself,
+        # which never counts.
+        with self.assertNumQueries(2) as captured:
+            self.client.get("/api/notifications/?page_size=3")
+        self.assertNotIn("COUNT(", captured.captured_queries[-1]["sql"])
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get("/api/notifications/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+
+class NotificationSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+
+        self.named = Notification.objects.create(
+            name="Kilimo Cooperative", email="info@kilimo.co.tz", message="Hello"
+        )
+        self.mentioned = Notification.objects.create(
+            name="Juma", email="juma@example.com", message="We met the kilimo team"
+        )
+        Notification.objects.create(name="Other", email="x@example.com", message="Hi")
+
+    def _search(self, term):
+        response = self.client.get("/api/notifications/", {"search": term})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_ranked_prefix_search(self):
+        # A name match outranks a message match; "kili" matches as a prefix.
+        self.assertEqual(self._search("kili"), [self.named.id, self.mentioned.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        Notification.objects.filter(pk=self.mentioned.pk).update(message="Nothing here")
+        self.assertEqual(self._search("kilimo"), [self.named.id])
+
+        self.named.delete()
+        self.assertEqual(self._search("kilimo"), [])
+
+    def test_ranked_results_paginate(self):
+        first = self.client.get("/api/notifications/", {"search": "kilimo", "page_size": 1}).data
+        second = self.client.get(first["next"]).data
+
+        self.assertEqual(first["results"][0]["id"], self.named.id)
+        self.assertEqual(second["results"][0]["id"], self.mentioned.id)
+        self.assertIsNone(second["next"])
+
+    def test_falls_back_to_icontains_without_index(self):
+        with mock.patch("notifications.search.has_search_index", return_value=False):
+            qs = search_notifications(Notification.objects.all(), "example.com")
+            self.assertNotIn("search_rank", qs.query.annotations)
+            self.assertEqual(qs.count(), 2)
+
+
+class NotificationQueryPlanTests(TestCase):
+    """
+    The hot list/stats queries must be answered from the composite indexes,
+    without a full table scan or a temporary sort.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+        Notification.objects.bulk_create(
+            Notification(
+                name=f"Visitor {i}",
+                email="visitor@example.com",
+                service="Other" if i % 2 else "IT Consulting",
+                message="Hello",
+                is_read=bool(i % 3),
+            )
+            for i in range(50)
+        )
+
+    def _plans(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        plans = []
+        for query in captured.captured_queries:
+            if '"notifications_notification"' not in query["sql"]:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                plans.append(" / ".join(row[-1] for row in cursor.fetchall()))
+        return plans
+
+    def test_endpoints_use_notification_indexes(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN output is SQLite specific")
+
+        next_page = self.client.get("/api/notifications/?page_size=5").data["next"]
+        urls = [
+            "/api/notifications/",
+            "/api/notifications/?is_read=false",
+            "/api/notifications/?is_read=true",
+            "/api/notifications/?service=Other",
+            "/api/notifications/?service=Other&is_read=false",
+            next_page,
+            "/api/notifications/stats/?is_read=false",
+            "/api/notifications/stats/?service=Other&is_read=true",
+        ]
+        for url in urls:
+            plans = self._plans(url)
+            self.assertTrue(plans, url)
+            for plan in plans:
+                with self.subTest(url=url, plan=plan):
+                    self.assertRegex(plan, r"USING (COVERING )?INDEX notif_")
+                    self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_unread_inbox_uses_partial_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN output is SQLite specific")
+
+        plans = self._plans("/api/notifications/?is_read=false")
+        self.assertIn("notif_unread_created_idx", plans[0])
+
+
+class NotificationCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+
+    def _create(self, **overrides):
+        self.client.force_authenticate(None)
+        response = self.client.post("/api/notifications/", {**CONTACT_FORM, **overrides})
+        self.assertEqual(response.status_code, 201)
+        self.client.force_authenticate(self.admin)
+        return response.data["id"]
+
+    def _stats(self, **params):
+        response = self.client.get("/api/notifications/stats/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_counters_follow_writes(self):
+        first = self._create()
+        second = self._create(service="Other")
+        self._create(service="Other")
+
+        self.client.post(f"/api/notifications/{first}/mark_read/")
+        self.client.post(f"/api/notifications/{second}/mark_read/")
+        # Repeated clicks are counted once.
+        self.client.post(f"/api/notifications/{second}/mark_read/")
+        self.client.post(f"/api/notifications/{second}/mark_unread/")
+        self.client.delete(f"/api/notifications/{first}/")
+
+        self.assertEqual(self._stats(), {"total": 2, "read": 0, "unread": 2})
+        self.assertEqual(self._stats(service="Other"), {"total": 2, "read": 0, "unread": 2})
+        self.assertEqual(
+            self._stats(service="Website Development"),
+            {"total": 0, "read": 0, "unread": 0},
+        )
+
+    def test_unfiltered_stats_is_one_lookup(self):
+        self._create()
+        with self.assertNumQueries(1):
+            self._stats()
+
+    def test_filtered_stats_use_one_aggregate(self):
+        first = self._create()
+        self._create()
+        self.client.post(f"/api/notifications/{first}/mark_read/")
+
+        with self.assertNumQueries(1):
+            stats = self._stats(is_read="true")
+        self.assertEqual(stats, {"total": 1, "read": 1, "unread": 0})
+
+    def test_rebuild_fixes_drift(self):
+        self._create()
+        NotificationCounter.objects.filter(pk="all").update(total=99)
+
+        NotificationCounter.objects.rebuild()
+
+        self.assertEqual(self._stats(), {"total": 1, "read": 0, "unread": 1})
+
+
+@override_settings(MAX_UPLOAD_SIZE=1024)
+class AttachmentUploadTests(TestCase):
+    PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 100
+
+    def setUp(self):
+        self.client = APIClient()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _post(self, name, content):
+        upload = SimpleUploadedFile(name, content)
+        return self.client.post("/api/notifications/", {**CONTACT_FORM, "attachment": upload})
+
+    def test_create_streams_through_upload_handler(self):
+        with mock.patch.object(
+            StreamingAttachmentUploadHandler,
+            "file_complete",
+            autospec=True,
+            side_effect=StreamingAttachmentUploadHandler.file_complete,
+        ) as file_complete:
+            response = self._post("logo.png", self.PNG)
+
+        self.assertEqual(response.status_code, 201)
+        uploaded = file_complete.call_args.args[0].file
+        self.assertEqual(uploaded.sniffed_type, "png")
+        self.assertEqual(len(uploaded.sha256), 64)
+        notification = Notification.objects.get(pk=response.data["id"])
+        self.assertEqual(notification.attachment.read(), self.PNG)
+
+    def test_oversized_upload_is_rejected(self):
+        response = self._post("big.pdf", b"%PDF-" + b"x" * 2048)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("attachment", response.data)
+        self.assertEqual(Notification.objects.count(), 0)
+
+    def test_content_must_match_extension(self):
+        response = self._post("invoice.pdf", self.PNG)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["attachment"], ["File content does not match its extension."]
+        )
+
+    def test_identical_uploads_share_one_file(self):
+        first = self._post("logo.png", self.PNG).data["id"]
+        second = self._post("copy.png", self.PNG).data["id"]
+
+        a, b = Notification.objects.filter(pk__in=[first, second])
+        self.assertEqual(a.attachment.name, b.attachment.name)
+        self.assertRegex(a.attachment.name, r"^attachments/\w\w/\w\w/[0-9a-f]{64}\.png$")
+        blob = AttachmentBlob.objects.get()
+        self.assertEqual((blob.refcount, blob.size), (2, len(self.PNG)))
+
+        storage, name = a.attachment.storage, a.attachment.name
+        with self.captureOnCommitCallbacks(execute=True):
+            a.delete()
+        self.assertTrue(storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            b.delete()
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(AttachmentBlob.objects.exists())
+
+    def test_replacing_or_clearing_releases_the_old_file(self):
+        pk = self._post("logo.png", self.PNG).data["id"]
+        old = Notification.objects.get(pk=pk).attachment
+        storage, old_name = old.storage, old.name
+        admin = get_user_model().objects.create_user("admin", password="secret", is_staff=True)
+        self.client.force_authenticate(admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f"/api/notifications/{pk}/",
+                {"attachment": SimpleUploadedFile("brief.pdf", b"%PDF-1.4 brief")},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(storage.exists(old_name))
+        new_name = Notification.objects.get(pk=pk).attachment.name
+        self.assertEqual(
+            list(AttachmentBlob.objects.values_list("name", "refcount")), [(new_name, 1)]
+        )
+
+        # The same bytes again: a new reference replaces the old one.
+        notification = Notification.objects.get(pk=pk)
+        notification.attachment = SimpleUploadedFile("again.pdf", b"%PDF-1.4 brief")
+        with self.captureOnCommitCallbacks(execute=True):
+            notification.save()
+        self.assertEqual(AttachmentBlob.objects.get(name=new_name).refcount, 1)
+        self.assertTrue(storage.exists(new_name))
+
+        # Cleared, e.g. with the admin form's "Clear" checkbox.
+        notification = Notification.objects.get(pk=pk)
+        notification.attachment = None
+        with self.captureOnCommitCallbacks(execute=True):
+            notification.save()
+        self.assertFalse(storage.exists(new_name))
+        self.assertFalse(AttachmentBlob.objects.exists())
+
+        # Saves that don't touch the file leave it alone.
+        pk = self._post("logo.png", self.PNG).data["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.get(pk=pk).save()
+            Notification.objects.only("id", "name").get(pk=pk).save()
+        self.assertEqual(AttachmentBlob.objects.get().refcount, 1)
+
+
+@override_settings(MAX_UPLOAD_SIZE=1024, NOTIFICATIONS_PURGE_IN_BACKGROUND=False)
+class NotificationBulkDeleteTests(TestCase):
+    PDF = b"%PDF-1.4 brochure"
+
+    def setUp(self):
+        self.client = APIClient()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True, is_superuser=True
+        )
+        self.shared = [self._create(attachment=self.PDF), self._create(attachment=self.PDF)]
+        self.other = self._create(service="Other")
+        self.client.force_authenticate(self.admin)
+
+    def _create(self, attachment=None, **overrides):
+        data = {**CONTACT_FORM, **overrides}
+        if attachment:
+            data["attachment"] = SimpleUploadedFile("brochure.pdf", attachment)
+        response = self.client.post("/api/notifications/", data)
+        self.assertEqual(response.status_code, 201)
+        return response.data["id"]
+
+    def test_bulk_delete_by_ids(self):
+        name = Notification.objects.get(pk=self.shared[0]).attachment.name
+        storage = Notification._meta.get_field("attachment").storage
+
+        with CaptureQueriesContext(connection) as captured:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    "/api/notifications/bulk_delete/", {"ids": self.shared}, format="json"
+                )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data,
+            {"deleted": 2, "attachments": 2, "files": 1, "bytes_freed": len(self.PDF)},
+        )
+        deletes = [
+            q["sql"] for q in captured.captured_queries
+            if q["sql"].startswith('DELETE FROM "notifications_notification"')
+        ]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(list(Notification.objects.values_list("id", flat=True)), [self.other])
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(EmailOutbox.objects.filter(notification_id__in=self.shared).exists())
+        self.assertEqual(EmailOutbox.objects.filter(notification__isnull=True).count(), 4)
+        stats = self.client.get("/api/notifications/stats/").data
+        self.assertEqual(stats, {"total": 1, "read": 0, "unread": 1})
+
+    def test_bulk_delete_by_filter(self):
+        response = self.client.post("/api/notifications/bulk_delete/?service=Other")
+
+        self.assertEqual(response.data["deleted"], 1)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_bulk_delete_needs_a_selection(self):
+        response = self.client.post("/api/notifications/bulk_delete/", {}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_bulk_actions_reject_filters_that_select_nothing(self):
+        for query in ("?is_read=all", "?is_read=x", "?search=%20", "?service="):
+            with self.subTest(query=query):
+                deleted = self.client.post(f"/api/notifications/bulk_delete/{query}")
+                marked = self.client.post(f"/api/notifications/bulk_mark_read/{query}")
+
+                self.assertEqual(deleted.status_code, 400)
+                self.assertEqual(marked.status_code, 400)
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertFalse(Notification.objects.filter(is_read=True).exists())
+        self.assertEqual(self.client.get("/api/notifications/?is_read=x").status_code, 400)
+
+    def test_admin_delete_action(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            "/admin/notifications/notification/",
+            {"action": "delete_selected", "_selected_action": self.shared, "post": "yes"},
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(AttachmentBlob.objects.get().refcount, 0)
+
+
+class NotificationBulkReadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.ids = [
+            self.client.post(
+                "/api/notifications/", {**CONTACT_FORM, "service": service}
+            ).data["id"]
+            for service in ("Other", "Other", "IT Consulting", "AI Services")
+        ]
+        admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+        self.client.post(f"/api/notifications/{self.ids[0]}/mark_read/")
+
+    def test_mark_all_read_is_one_update(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post("/api/notifications/bulk_mark_read/?is_read=false")
+
+        self.assertEqual(response.data, {"updated": 3})
+        updates = [
+            q["sql"] for q in captured.captured_queries
+            if q["sql"].startswith('UPDATE "notifications_notification"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+        self.assertFalse(Notification.objects.filter(read_at__isnull=True).exists())
+        stats = self.client.get("/api/notifications/stats/", {"service": "Other"}).data
+        self.assertEqual(stats, {"total": 2, "read": 2, "unread": 0})
+
+    def test_mark_unread_by_ids_counts_only_changes(self):
+        response = self.client.post(
+            "/api/notifications/bulk_mark_unread/", {"ids": self.ids[:2]}, format="json"
+        )
+
+        self.assertEqual(response.data, {"updated": 1})
+        self.assertEqual(
+            self.client.get("/api/notifications/stats/").data,
+            {"total": 4, "read": 0, "unread": 4},
+        )
+
+    def test_filters_narrow_the_selection(self):
+        response = self.client.post("/api/notifications/bulk_mark_read/?service=Other")
+
+        self.assertEqual(response.data, {"updated": 1})
+        self.assertEqual(Notification.objects.filter(is_read=True).count(), 2)
+
+
+class NotificationConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+        self.first = Notification.objects.create(name="A", email="a@example.com", message="Hi")
+        Notification.objects.create(name="B", email="b@example.com", message="Hi")
+
+    def _revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_unchanged_list_is_304_without_fetching_rows(self):
+        url = "/api/notifications/?is_read=false"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(1):
+            cached = self._revalidate(url, response)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+    def test_writes_and_filters_change_the_etag(self):
+        url = "/api/notifications/"
+        response = self.client.get(url)
+
+        self.assertEqual(self._revalidate("/api/notifications/?service=Other", response).status_code, 200)
+        self.client.post(f"/api/notifications/{self.first.pk}/mark_read/")
+        self.assertEqual(self._revalidate(url, response).status_code, 200)
+
+        response = self.client.get(url)
+        Notification.objects.filter(pk=self.first.pk).delete()
+        self.assertEqual(self._revalidate(url, response).status_code, 200)
+
+    def test_detail_honours_if_modified_since(self):
+        url = f"/api/notifications/{self.first.pk}/"
+        response = self.client.get(url)
+
+        cached = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_stats_revalidate(self):
+        url = "/api/notifications/stats/"
+        response = self.client.get(url)
+
+        self.assertEqual(self._revalidate(url, response).status_code, 304)
+        self.client.post(f"/api/notifications/{self.first.pk}/mark_read/")
+        self.assertEqual(self._revalidate(url, response).status_code, 200)
+
+
+@override_settings(NOTIFICATIONS_RESPONSE_CACHE=True)
+class NotificationResponseCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        reset_cache_stats()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        self.notification = Notification.objects.create(
+            name="A", email="a@example.com", message="Hi"
+        )
+
+    def test_repeat_reads_skip_the_database(self):
+        for url in (
+            "/api/notifications/?page_size=5",
+            f"/api/notifications/{self.notification.pk}/",
+            "/api/notifications/stats/",
+        ):
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual((first["X-Cache"], second["X-Cache"]), ("MISS", "HIT"))
+            self.assertEqual(second.data, first.data)
+            self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_query_parameter_order_does_not_matter(self):
+        self.client.get("/api/notifications/?service=Other&page_size=5")
+        response = self.client.get("/api/notifications/?page_size=5&service=Other")
+
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_writes_invalidate(self):
+        url = "/api/notifications/"
+        self.client.get(url)
+
+        self.client.post(f"/api/notifications/{self.notification.pk}/mark_read/")
+        response = self.client.get(url)
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertTrue(response.data["results"][0]["is_read"])
+
+        self.client.force_authenticate(None)
+        self.client.post("/api/notifications/", CONTACT_FORM)
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_metrics(self):
+        self.client.get("/api/notifications/stats/")
+        self.client.get("/api/notifications/stats/")
+
+        stats = self.client.get("/api/notifications/cache_stats/").data
+        self.assertEqual((stats["hits"], stats["misses"], stats["stores"]), (1, 1, 1))
+        self.assertTrue(stats["enabled"])
+        self.assertEqual(stats["backend"], cache_stats()["backend"])
+
+
+class NotificationExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True, is_superuser=True
+        )
+        self.client.force_authenticate(self.admin)
+        for i in range(5):
+            Notification.objects.create(
+                name=f"Visitor {i}",
+                email=f"visitor{i}@example.com",
+                service="Other" if i % 2 else "IT Consulting",
+                message='Says "hello",\nover two lines',
+            )
+
+    def _body(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export_matches_api_and_filters(self):
+        response = self.client.get("/api/notifications/export/", {"service": "Other"})
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        rows = list(csv.DictReader(io.StringIO(self._body(response))))
+        listed = self.client.get("/api/notifications/", {"service": "Other"}).data["results"]
+        self.assertEqual([int(row["id"]) for row in rows], [row["id"] for row in listed])
+        self.assertEqual(rows[0]["message"], listed[0]["message"])
+        self.assertEqual(rows[0]["created_at"], listed[0]["created_at"])
+
+    def test_csv_cells_cannot_run_as_formulas(self):
+        Notification.objects.create(
+            name="=HYPERLINK(\"http://evil.example\")",
+            email="e@example.com",
+            phone="+255700000000",
+            company="@SUM(1+1)",
+            message="-2+3",
+        )
+        response = self.client.get("/api/notifications/export/", {"search": "evil"})
+
+        row = next(csv.DictReader(io.StringIO(self._body(response))))
+        self.assertEqual(row["name"], "'=HYPERLINK(\"http://evil.example\")")
+        self.assertEqual(row["phone"], "'+255700000000")
+        self.assertEqual(row["company"], "'@SUM(1+1)")
+        self.assertEqual(row["message"], "'-2+3")
+        self.assertEqual(row["email"], "e@example.com")
+
+    def test_export_falls_back_to_drf_serializer(self):
+        with mock.patch.object(FastNotificationSerializer, "compile", return_value=None):
+            response = self.client.get("/api/notifications/export/?format=ndjson")
+
+        lines = self._body(response).splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])["name"], "Visitor 4")
+
+    def test_ndjson_export(self):
+        response = self.client.get("/api/notifications/export/?format=ndjson")
+
+        lines = self._body(response).splitlines()
+        self.assertEqual(len(lines), 5)
+        first = json.loads(lines[0])
+        self.assertEqual((first["name"], first["attachment"]), ("Visitor 4", None))
+
+    def test_rows_are_read_in_chunks(self):
+        with override_settings(NOTIFICATIONS_EXPORT_CHUNK_SIZE=2):
+            with mock.patch(
+                "django.db.models.query.QuerySet.iterator",
+                autospec=True,
+                side_effect=lambda qs, chunk_size=None: iter(list(qs)),
+            ) as iterator:
+                self._body(self.client.get("/api/notifications/export/"))
+        self.assertEqual(iterator.call_args.kwargs["chunk_size"], 2)
+
+    def test_admin_export_action(self):
+        self.client.force_login(self.admin)
+        ids = list(Notification.objects.values_list("id", flat=True)[:2])
+        response = self.client.post(
+            "/admin/notifications/notification/",
+            {"action": "export_csv", "_selected_action": ids},
+        )
+
+        rows = list(csv.DictReader(io.StringIO(self._body(response))))
+        self.assertEqual(sorted(int(row["id"]) for row in rows), sorted(ids))
+
+
+class NotificationSparseFieldsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+        self.notification = Notification.objects.create(
+            name="A", email="a@example.com", service="Other", message="x" * 10000
+        )
+
+    def _get(self, url, **params):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        # The last query is the one that fetches the rows.
+        return response, captured.captured_queries[-1]["sql"]
+
+    def test_compact_list_skips_message_body(self):
+        response, sql = self._get("/api/notifications/", view="compact")
+
+        row = response.data["results"][0]
+        self.assertNotIn("message", row)
+        self.assertIs(row["has_attachment"], False)
+        self.assertNotIn('"message"', sql)
+
+    def test_sparse_fieldset_list_and_detail(self):
+        response, sql = self._get("/api/notifications/", fields="id,name,service")
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.notification.id, "name": "A", "service": "Other"}],
+        )
+        self.assertNotIn('"message"', sql)
+
+        response, sql = self._get(f"/api/notifications/{self.notification.pk}/", fields="message")
+        self.assertEqual(response.data, {"message": "x" * 10000})
+        self.assertNotIn('"email"', sql)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get("/api/notifications/", {"fields": "id,password"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", response.data["fields"][0])
+
+    def test_default_list_is_unchanged(self):
+        response = self.client.get("/api/notifications/")
+
+        self.assertEqual(len(response.data["results"][0]["message"]), 10000)
+
+
+class FastSerializerTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+        now = timezone.now()
+        for i in range(5):
+            Notification.objects.create(
+                name=f"Visitor {i}",
+                email=f"visitor{i}@example.com",
+                company="Acme" if i % 2 else "",
+                service="Other",
+                message="hello",
+                attachment=f"attachments/ab/cd/{i:064x}.pdf" if i % 2 else "",
+                is_read=bool(i % 2),
+                read_at=now if i % 2 else None,
+            )
+
+    def _serialize_both(self, serializer_class=NotificationSerializer, **kwargs):
+        request = Request(APIRequestFactory().get("/api/notifications/"))
+        serializer = serializer_class(context={"request": request}, **kwargs)
+        fast = FastNotificationSerializer.compile(serializer)
+        self.assertIsNotNone(fast)
+        queryset = Notification.objects.order_by("id")
+        expected = serializer_class(
+            list(queryset), many=True, context={"request": request}, **kwargs
+        ).data
+        return json.loads(json.dumps(expected)), fast.many(queryset.values(*fast.columns))
+
+    def test_output_matches_serializer(self):
+        for serializer_class, kwargs in (
+            (NotificationSerializer, {}),
+            (NotificationListSerializer, {}),
+            (NotificationSerializer, {"fields": ["id", "attachment", "read_at"]}),
+        ):
+            with self.subTest(serializer=serializer_class.__name__, **kwargs):
+                expected, actual = self._serialize_both(serializer_class, **kwargs)
+                self.assertEqual(actual, expected)
+
+    def test_unsupported_field_is_not_compiled(self):
+        class WithMethodField(NotificationSerializer):
+            shout = serializers.SerializerMethodField()
+
+            class Meta(NotificationSerializer.Meta):
+                fields = [*NotificationSerializer.Meta.fields, "shout"]
+
+            def get_shout(self, obj):
+                return obj.name.upper()
+
+        self.assertIsNone(FastNotificationSerializer.compile(WithMethodField()))
+
+    def test_list_pages_through_fast_path(self):
+        first = self.client.get("/api/notifications/", {"page_size": 2})
+        second = self.client.get(first.data["next"])
+
+        names = [row["name"] for row in first.data["results"] + second.data["results"]]
+        self.assertEqual(names, ["Visitor 4", "Visitor 3", "Visitor 2", "Visitor 1"])
+        # The protected download route, never the storage path.
+        row = first.data["results"][1]
+        self.assertEqual(
+            row["attachment"], f"http://testserver/api/notifications/{row['id']}/download/"
+        )
+
+
+@override_settings(
+    NOTIFICATIONS_THROTTLE=True,
+    NOTIFICATIONS_THROTTLE_IP_BURST=2,
+    NOTIFICATIONS_THROTTLE_IP_RATE=1 / 60,
+    NOTIFICATIONS_THROTTLE_GLOBAL_BURST=3,
+    NOTIFICATIONS_THROTTLE_GLOBAL_RATE=1 / 60,
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class ContactFormThrottleTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.addCleanup(get_cache().clear)
+        self.client = APIClient()
+
+    def _post(self, ip="203.0.113.1"):
+        # A distinct message each time, so duplicate suppression stays out of it.
+        self.sent = getattr(self, "sent", 0) + 1
+        return self.client.post(
+            "/api/notifications/",
+            {**CONTACT_FORM, "message": f"Message {self.sent}"},
+            REMOTE_ADDR=ip,
+            format="multipart",
+        )
+
+    def test_per_ip_burst_then_retry_after(self):
+        self.assertEqual([self._post().status_code for _ in range(2)], [201, 201])
+
+        response = self._post()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "60")
+        self.assertEqual(self._post(ip="203.0.113.2").status_code, 201)
+
+    def test_global_bucket_caps_all_clients(self):
+        codes = [self._post(ip=f"203.0.113.{i}").status_code for i in range(4)]
+
+        self.assertEqual(codes, [201, 201, 201, 429])
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_global_refusal_does_not_use_up_the_senders_own_bucket(self):
+        codes = [self._post(ip=f"203.0.113.{i}").status_code for i in (1, 2, 3)]
+        self.assertEqual(codes, [201, 201, 201])
+        self.assertEqual(self._post().status_code, 429)
+
+        # The flood passes; the sender still has the second of its two tokens.
+        get_throttle_cache().delete(f"{THROTTLE_KEY_PREFIX}:global")
+        self.assertEqual(self._post().status_code, 201)
+        self.assertEqual(self._post().status_code, 429)
+
+    def test_refused_request_body_is_not_parsed(self):
+        for _ in range(2):
+            self._post()
+        with mock.patch("rest_framework.parsers.MultiPartParser.parse") as parse:
+            response = self._post()
+
+        self.assertEqual(response.status_code, 429)
+        parse.assert_not_called()
+
+    def test_spoofed_forwarded_for_is_ignored(self):
+        for i in range(2):
+            self._post()
+        response = self.client.post(
+            "/api/notifications/",
+            CONTACT_FORM,
+            REMOTE_ADDR="10.0.0.2",
+            HTTP_X_FORWARDED_FOR="198.51.100.7, 203.0.113.1",
+        )
+        # nginx appends the real address; only that one counts.
+        self.assertEqual(response.status_code, 429)
+
+    def test_bucket_refills(self):
+        bucket = TokenBucket("test", burst=1, rate=0.5)
+
+        self.assertEqual(bucket.take(now=100.0), 0)
+        self.assertEqual(bucket.take(now=100.5), 1.5)
+        self.assertEqual(bucket.take(now=102.0), 0)
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    NOTIFICATIONS_DUPLICATE_WINDOW=600,
+)
+class DuplicateSubmissionTests(TestCase):
+    PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 100
+
+    def setUp(self):
+        self.client = APIClient()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _post(self, key=None, **fields):
+        data = {**CONTACT_FORM, **fields}
+        headers = {"HTTP_IDEMPOTENCY_KEY": key} if key else {}
+        return self.client.post("/api/notifications/", data, **headers)
+
+    def test_idempotency_key_replays_original(self):
+        first = self._post(key="form-1", attachment=SimpleUploadedFile("logo.png", self.PNG))
+        with mock.patch("notifications.storage.ContentAddressedStorage._save") as save:
+            retry = self._post(
+                key="form-1", attachment=SimpleUploadedFile("logo.png", self.PNG)
+            )
+
+        self.assertEqual((first.status_code, retry.status_code), (201, 201))
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        save.assert_not_called()
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+        self.assertEqual(AttachmentBlob.objects.get().refcount, 1)
+
+    def test_key_reused_for_different_message(self):
+        self._post(key="form-1")
+        response = self._post(key="form-1", message="Something else entirely.")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_same_submission_within_window_is_suppressed(self):
+        first = self._post()
+        again = self._post(email="ASHA@example.com ")
+        different = self._post(message="A follow-up question.")
+
+        self.assertEqual(again.data["id"], first.data["id"])
+        self.assertNotEqual(different.data["id"], first.data["id"])
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_same_submission_after_window_is_new(self):
+        first = self._post()
+        Notification.objects.filter(pk=first.data["id"]).update(
+            created_at=timezone.now() - timezone.timedelta(seconds=601)
+        )
+
+        self.assertNotEqual(self._post().data["id"], first.data["id"])
+
+    def test_lookup_is_one_indexed_query(self):
+        self._post(key="form-1")
+        with CaptureQueriesContext(connection) as captured:
+            self._post(key="form-1")
+        lookups = [
+            q["sql"] for q in captured.captured_queries if '"fingerprint"' in q["sql"]
+        ]
+
+        self.assertEqual(len(lookups), 1)
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + lookups[0])
+                plan = " / ".join(row[-1] for row in cursor.fetchall())
+            self.assertIn("notif_fingerprint_idx", plan)
+            self.assertIn("notif_idempotency_key_uniq", plan)
+
+
+@override_settings(
+    NOTIFICATIONS_EVENT_POLL_INTERVAL=0.01,
+    NOTIFICATIONS_EVENT_KEEPALIVE=0.05,
+    NOTIFICATIONS_EVENT_RETENTION=5,
+)
+class NotificationEventStreamTests(TestCase):
+    URL = "/api/notifications/events/"
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        self.token = str(RefreshToken.for_user(self.admin).access_token)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _ticket(self, user=None):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user or self.admin).access_token}"
+        )
+        return client.post("/api/notifications/event_ticket/")
+
+    def _create(self, name="Visitor"):
+        return Notification.objects.create(
+            name=name, email="v@example.com", service="Other", message="Hi"
+        )
+
+    async def _open(self, last_event_id=None):
+        headers = {} if last_event_id is None else {"Last-Event-ID": str(last_event_id)}
+        ticket = (await sync_to_async(self._ticket)()).data["ticket"]
+        response = await self.async_client.get(self.URL, {"ticket": ticket}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        return response.streaming_content
+
+    async def _next_event(self, stream):
+        """The next chunk that isn't a retry hint or keepalive, parsed."""
+        for _ in range(100):
+            chunk = await asyncio.wait_for(anext(stream), timeout=5)
+            chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+            if chunk.startswith("id:"):
+                lines = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+                return int(lines["id"]), lines["event"], json.loads(lines["data"])
+        self.fail("No event received")
+
+    def test_writes_record_compact_events(self):
+        notification = self._create()
+        self.client.post(f"/api/notifications/{notification.pk}/mark_read/")
+        self.client.post("/api/notifications/bulk_delete/", {"ids": [notification.pk]})
+
+        self.assertEqual(
+            list(NotificationEvent.objects.values_list("kind", "notification_ids")),
+            [("read", [notification.pk]), ("deleted", [notification.pk])],
+        )
+
+    async def test_requires_a_staff_ticket_or_bearer_token(self):
+        response = await self.async_client.get(self.URL)
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(self.URL, {"ticket": "nonsense"})
+        self.assertEqual(response.status_code, 401)
+        # Access tokens are not accepted in the query string.
+        response = await self.async_client.get(self.URL, {"token": self.token})
+        self.assertEqual(response.status_code, 401)
+
+        with override_settings(NOTIFICATIONS_EVENT_TICKET_TTL=-1):
+            ticket = (await sync_to_async(self._ticket)()).data["ticket"]
+            response = await self.async_client.get(self.URL, {"ticket": ticket})
+        self.assertEqual(response.status_code, 401)
+
+        user = await get_user_model().objects.acreate(username="visitor")
+        self.assertEqual((await sync_to_async(self._ticket)(user)).status_code, 403)
+        token = str(RefreshToken.for_user(user).access_token)
+        response = await self.async_client.get(
+            self.URL, headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_refused_outside_asgi(self):
+        ticket = self._ticket().data["ticket"]
+        response = Client().get(self.URL, {"ticket": ticket})
+        self.assertEqual(response.status_code, 501)
+
+    async def test_pushes_new_events(self):
+        stream = await self._open()
+        try:
+            self.assertTrue((await anext(stream)).startswith(b"retry:"))
+            await sync_to_async(self.client.post)(
+                "/api/notifications/",
+                {**CONTACT_FORM, "name": "Live"},
+                format="multipart",
+            )
+            _, kind, data = await self._next_event(stream)
+        finally:
+            await stream.aclose()
+
+        self.assertEqual(kind, "created")
+        self.assertEqual(data["name"], "Live")
+        self.assertNotIn("message", data)
+
+    async def test_resumes_from_last_event_id(self):
+        events = []
+        for name in ("A", "B", "C"):
+            notification = await sync_to_async(self._create)(name)
+            events.append(
+                await sync_to_async(NotificationEvent.objects.record)(
+                    NotificationEvent.CREATED, [notification.pk], {"name": name}
+                )
+            )
+
+        stream = await self._open(last_event_id=events[0].pk)
+        try:
+            received = [await self._next_event(stream) for _ in range(2)]
+        finally:
+            await stream.aclose()
+
+        self.assertEqual(
+            [(event_id, data["name"]) for event_id, _, data in received],
+            [(events[1].pk, "B"), (events[2].pk, "C")],
+        )
+
+    async def test_resume_past_retention_resets(self):
+        first = await sync_to_async(NotificationEvent.objects.record)(
+            NotificationEvent.DELETED, [1]
+        )
+        for i in range(6):
+            await sync_to_async(NotificationEvent.objects.record)(
+                NotificationEvent.DELETED, [i + 2]
+            )
+
+        stream = await self._open(last_event_id=first.pk - 1)
+        try:
+            _, kind, _ = await self._next_event(stream)
+        finally:
+            await stream.aclose()
+
+        self.assertEqual(kind, "reset")
+        self.assertEqual(await NotificationEvent.objects.acount(), 5)
+
+
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        Notification.objects.create(name="A", email="a@example.com", message="Hi")
+
+    def _client(self):
+        # Middleware is loaded on a client's first request, under the
+        # settings in force at that point.
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        return client
+
+    def test_off_by_default(self):
+        response = self._client().get("/api/notifications/")
+
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_PROFILING=True)
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs("VitoTechWebsite.profiling", "INFO") as logs:
+            response = self._client().get("/api/notifications/")
+
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn("serialize;dur=", timing)
+        self.assertIn("total;dur=", timing)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record["path"], record["status"]), ("/api/notifications/", 200))
+        self.assertGreater(record["queries"], 0)
+        self.assertEqual(logs.records[0].levelname, "INFO")
+
+    @override_settings(
+        REQUEST_PROFILING=True,
+        REQUEST_PROFILING_SLOW_QUERY_MS=0,
+        EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    )
+    def test_create_sections_and_slow_queries(self):
+        with self.assertLogs("VitoTechWebsite.profiling", "INFO") as logs:
+            response = self._client().post(
+                "/api/notifications/", CONTACT_FORM, format="multipart"
+            )
+
+        self.assertEqual(response.status_code, 201)
+        for section in ("parse", "perform_create", "serialize"):
+            self.assertIn(f"{section};dur=", response["Server-Timing"])
+        self.assertEqual(logs.records[0].levelname, "WARNING")
+        self.assertTrue(json.loads(logs.records[0].getMessage())["slow_queries"])
+
+    def test_repeated_statements_are_flagged(self):
+        profile = RequestProfile(slow_query_ms=1000, n_plus_one=5)
+        with connection.execute_wrapper(profile):
+            for pk in range(5):
+                Notification.objects.filter(pk=pk).exists()
+            Notification.objects.count()
+
+        [(sql, count)] = profile.repeated_queries()
+        self.assertEqual(count, 5)
+        self.assertIn("LIMIT 1", sql)
+        self.assertEqual(profile.slow_queries(), [])
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_benchmark_api_reports_json_and_cleans_up(self):
+        out = io.StringIO()
+        call_command(
+            "benchmark_api", sizes="30", requests=3, stdout=out, stderr=io.StringIO()
+        )
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(
+            {(row["variant"], row["endpoint"]) for row in report["results"]},
+            {
+                (variant, endpoint)
+                for variant in ("plain", "attachments")
+                for endpoint in ("create", "list", "search", "stats", "mark_read", "delete")
+            },
+        )
+        for row in report["results"]:
+            with self.subTest(variant=row["variant"], endpoint=row["endpoint"]):
+                self.assertEqual((row["requests"], row["errors"]), (3, 0))
+                self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+                self.assertGreater(row["queries_per_request"], 0)
+        self.assertEqual(Notification.objects.count(), 0)
+        self.assertFalse(EmailOutbox.objects.exists())
+        # The files themselves are purged on commit.
+        self.assertFalse(AttachmentBlob.objects.filter(refcount__gt=0).exists())
+        self.assertFalse(NotificationCounter.objects.exclude(total=0).exists())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+    def test_seeding_inserts_one_batch_at_a_time(self):
+        with mock.patch.object(
+            Notification.objects, "bulk_create", wraps=Notification.objects.bulk_create
+        ) as bulk_create:
+            self.assertEqual(seed_notifications(25, batch_size=10), 25)
+            self.assertEqual(seed_notifications(30, batch_size=10), 5)
+
+        self.assertEqual(
+            [len(call.args[0]) for call in bulk_create.call_args_list], [10, 10, 5, 5]
+        )
+        self.assertEqual(benchmark_queryset().count(), 30)
+
+
+class SQLiteTuningTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = f"{directory}/tuned.sqlite3"
+
+    def _connect(self):
+        return SQLiteDatabaseWrapper(
+            {
+                **connection.settings_dict,
+                "ENGINE": "VitoTechWebsite.sqlite3",
+                "NAME": self.path,
+                "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+            },
+            alias="tuned",
+        )
+
+    def test_connections_are_tuned(self):
+        wrapper = self._connect()
+        self.addCleanup(wrapper.close)
+        with override_settings(SQLITE_BUSY_TIMEOUT_MS=1234), wrapper.cursor() as cursor:
+            pragmas = {}
+            for pragma in ("journal_mode", "busy_timeout", "synchronous"):
+                cursor.execute(f"PRAGMA {pragma}")
+                pragmas[pragma] = cursor.fetchone()[0]
+
+        # synchronous: 1 is NORMAL.
+        self.assertEqual(pragmas, {"journal_mode": "wal", "busy_timeout": 1234, "synchronous": 1})
+
+    @override_settings(SQLITE_SERIALIZED_WRITES=True)
+    def test_serialized_writes_queue_on_one_lock(self):
+        writer = self._connect()
+        self.addCleanup(writer.close)
+        with writer.cursor() as cursor:
+            cursor.execute("CREATE TABLE t (n integer)")
+        lock = sqlite_write_lock(self.path)
+
+        # A transaction holds the writer lock until it commits.
+        writer.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        self.assertTrue(lock._thread_lock.locked())
+        writer.commit()
+        writer.set_autocommit(True)
+        self.assertFalse(lock._thread_lock.locked())
+
+        # Autocommit writes from another connection wait their turn.
+        def insert():
+            other = self._connect()
+            with other.cursor() as cursor:
+                cursor.execute("INSERT INTO t VALUES (1)")
+            other.close()
+
+        lock.acquire()
+        thread = threading.Thread(target=insert)
+        thread.start()
+        thread.join(0.2)
+        self.assertTrue(thread.is_alive())
+        lock.release()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        with writer.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM t")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+class DatabaseConnectionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+        reset_connection_stats()
+
+    def test_db_stats_counts_requests_and_connections(self):
+        self.client.get("/api/notifications/stats/")
+        stats = self.client.get("/api/notifications/db_stats/").data
+
+        # The test client keeps its connection, so no new ones per request.
+        self.assertEqual(stats["requests"], 1)
+        default = stats["databases"]["default"]
+        self.assertEqual(default["vendor"], connection.vendor)
+        self.assertEqual(default["connections_opened"], 0)
+        self.assertIsNone(default["pool"])
+
+    def test_benchmark_db_connections_reports_each_mode(self):
+        out, err = io.StringIO(), io.StringIO()
+        call_command("benchmark_db_connections", requests=5, stdout=out, stderr=err)
+
+        results = {row["mode"]: row for row in json.loads(out.getvalue())["results"]}
+        # Pooling needs PostgreSQL.
+        self.assertEqual(set(results), {"per_request", "persistent"})
+        self.assertIn("pooled: skipped", err.getvalue())
+        for row in results.values():
+            self.assertEqual((row["requests"], row["errors"]), (5, 0))
+
+
+@mock.patch("notifications.replica.replica_configured", return_value=True)
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        replica._lag.update(checked_at=float("-inf"), caught_up=False)
+        self.factory = APIRequestFactory()
+        self.router = replica.ReplicaRouter()
+
+    def _through_middleware(self, request, view, status=None, user=None):
+        seen = {}
+        request.user = user or AnonymousUser()
+
+        def get_response(request):
+            seen.update(view())
+            return HttpResponse(status=status or (201 if request.method == "POST" else 200))
+
+        response = replica.ReadYourWritesMiddleware(get_response)(request)
+        return response, seen
+
+    def _read(self):
+        return {
+            "allowed": replica.allow_replica_reads(),
+            "read": self.router.db_for_read(Notification),
+        }
+
+    @mock.patch("notifications.replica.replica_caught_up", return_value=True)
+    def test_opted_in_reads_use_replica_until_the_request_writes(self, caught_up, configured):
+        def view():
+            before = self.router.db_for_read(Notification)
+            replica.allow_replica_reads()
+            during = self.router.db_for_read(Notification)
+            write = self.router.db_for_write(Notification)
+            return {"before": before, "during": during, "write": write,
+                    "after": self.router.db_for_read(Notification)}
+
+        _, seen = self._through_middleware(self.factory.get("/"), view)
+
+        self.assertEqual(
+            seen, {"before": "default", "during": "replica", "write": "default", "after": "default"}
+        )
+        # Outside a request nothing is routed to the replica.
+        self.assertEqual(self.router.db_for_read(Notification), "default")
+
+    @mock.patch("notifications.replica.replica_caught_up", return_value=True)
+    def test_only_staff_writers_are_pinned_to_default(self, caught_up, configured):
+        staff = get_user_model().objects.create_user("admin", password="secret", is_staff=True)
+        # Contact-form posts and failed writes pin nobody.
+        for status, user in ((201, None), (400, staff), (403, staff)):
+            response, _ = self._through_middleware(
+                self.factory.post("/"), dict, status=status, user=user
+            )
+            self.assertNotIn(replica.PIN_COOKIE, response.cookies)
+
+        response, _ = self._through_middleware(self.factory.post("/"), dict, user=staff)
+        cookie = response.cookies[replica.PIN_COOKIE].value
+
+        # The writer reads from default from any worker via the cookie...
+        request = self.factory.get("/")
+        request.COOKIES[replica.PIN_COOKIE] = cookie
+        _, seen = self._through_middleware(request, self._read, user=staff)
+        self.assertEqual(seen, {"allowed": False, "read": "default"})
+
+        # ...while everyone else keeps reading from the replica.
+        _, seen = self._through_middleware(self.factory.get("/"), self._read, user=staff)
+        self.assertEqual(seen, {"allowed": True, "read": "replica"})
+
+    @override_settings(DB_REPLICA_MAX_LAG=2, DB_REPLICA_LAG_CHECK_INTERVAL=60)
+    def test_lagging_or_unreachable_replica_falls_back_to_default(self, configured):
+        with mock.patch("notifications.replica.replica_lag", return_value=10.0):
+            with self.assertLogs("notifications.replica", "WARNING"):
+                _, seen = self._through_middleware(self.factory.get("/"), self._read)
+        self.assertEqual(seen, {"allowed": False, "read": "default"})
+
+        replica._lag.update(checked_at=float("-inf"))
+        with mock.patch("notifications.replica.replica_lag", side_effect=DatabaseError):
+            with self.assertLogs("notifications.replica", "WARNING"):
+                self.assertFalse(replica.replica_caught_up())
+
+        replica._lag.update(checked_at=float("-inf"))
+        with mock.patch("notifications.replica.replica_lag", return_value=0.5) as lag:
+            self.assertTrue(replica.replica_caught_up())
+            self.assertTrue(replica.replica_caught_up())
+        # Checked once per interval, not per request.
+        lag.assert_called_once()
+
+    @mock.patch("notifications.replica.replica_caught_up", return_value=False)
+    def test_viewset_reads_opt_in_and_writes_do_not(self, caught_up, configured):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("admin", password="secret", is_staff=True)
+        )
+        with mock.patch(
+            "notifications.views.allow_replica_reads", wraps=replica.allow_replica_reads
+        ) as allow:
+            client.get("/api/notifications/")
+            client.get("/api/notifications/stats/")
+            self.assertEqual(allow.call_count, 2)
+            response = APIClient().post("/api/notifications/", CONTACT_FORM, format="multipart")
+            self.assertEqual(allow.call_count, 2)
+        self.assertEqual(response.status_code, 201)
+        # An anonymous contact-form post pins nobody; a staff write does.
+        self.assertNotIn(replica.PIN_COOKIE, response.cookies)
+
+        response = client.post(f"/api/notifications/{response.data['id']}/mark_read/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(replica.PIN_COOKIE, response.cookies)
+
+    @override_settings(NOTIFICATIONS_RESPONSE_CACHE=True)
+    @mock.patch("notifications.replica.replica_caught_up", return_value=True)
+    def test_replica_reads_are_not_stored_in_the_response_cache(self, caught_up, configured):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("admin", password="secret", is_staff=True)
+        )
+        with mock.patch("notifications.views.read_database", return_value="default"), \
+                mock.patch("notifications.cache.read_database", return_value=replica.REPLICA):
+            response = client.get("/api/notifications/stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Cache", response)
+
+        # A read from default is cached and then served to replica readers too.
+        client.cookies[replica.PIN_COOKIE] = f"{time.time() + 60:.3f}"
+        self.assertEqual(client.get("/api/notifications/stats/")["X-Cache"], "MISS")
+        del client.cookies[replica.PIN_COOKIE]
+        self.assertEqual(client.get("/api/notifications/stats/")["X-Cache"], "HIT")
+
+
+class AttachmentDownloadTests(TestCase):
+    PDF = b"%PDF-1.4\n" + bytes(range(256)) * 4
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        response = APIClient().post(
+            "/api/notifications/",
+            {**CONTACT_FORM, "attachment": SimpleUploadedFile("brief.pdf", self.PDF)},
+        )
+        self.notification = Notification.objects.get(pk=response.data["id"])
+        self.url = f"/api/notifications/{self.notification.pk}/download/"
+        self.admin = get_user_model().objects.create_user(
+            "admin", password="secret", is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_download_requires_staff(self):
+        self.assertEqual(APIClient().get(self.url).status_code, 401)
+
+    def test_full_download(self):
+        response = self.client.get(self.url, HTTP_ACCEPT="application/pdf")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._body(response), self.PDF)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Content-Length"], str(len(self.PDF)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertTrue(response["Content-Disposition"].startswith("attachment;"))
+
+    def test_range_requests(self):
+        size = len(self.PDF)
+        cases = {
+            "bytes=2-5": (self.PDF[2:6], f"bytes 2-5/{size}"),
+            "bytes=-4": (self.PDF[-4:], f"bytes {size - 4}-{size - 1}/{size}"),
+            f"bytes={size - 2}-{size + 50}": (self.PDF[-2:], f"bytes {size - 2}-{size - 1}/{size}"),
+        }
+        for header, (body, content_range) in cases.items():
+            with self.subTest(header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(self._body(response), body)
+                self.assertEqual(response["Content-Range"], content_range)
+                self.assertEqual(response["Content-Length"], str(len(body)))
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={size}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{size}")
+
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._body(response), self.PDF)
+
+    @override_settings(NOTIFICATIONS_ACCEL_REDIRECT="/protected-media/")
+    def test_accel_redirect_hands_the_transfer_to_nginx(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected-media/{self.notification.attachment.name}"
+        )
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertIn("Content-Disposition", response)
+
+    def test_message_without_attachment_is_404(self):
+        notification = Notification.objects.create(name="Juma", email="j@example.com", message="Hi")
+        response = self.client.get(f"/api/notifications/{notification.pk}/download/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_admin_link_uses_protected_view(self):
+        url = f"/admin/notifications/notification/{self.notification.pk}/attachment/"
+        browser = Client()
+        self.assertEqual(browser.get(url).status_code, 302)  # to the login page
+        # Staff without the view permission on messages.
+        browser.force_login(self.admin)
+        self.assertEqual(browser.get(url).status_code, 403)
+        browser.force_login(get_user_model().objects.create_superuser("root", password="secret"))
+        self.assertEqual(self._body(browser.get(url)), self.PDF)
+        # MEDIA_ROOT itself is not served.
+        self.assertEqual(browser.get(self.notification.attachment.url).status_code, 404)
@@ -0,0 +1,126 @@
+# notifications/throttling.py
+"""
+Token-bucket flood protection for the public contact form.
+
+Each bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+second; a request takes one token or is refused with ``429`` and a
+``Retry-After`` of however long the next token is away. There is one bucket
+per client IP and one global bucket, so a single bot is cut off early and a
+distributed flood still cannot take more than the global rate.
+
+DRF checks throttles in ``initial()``, before anything touches
+``request.data``, so a refused request never has its multipart body parsed,
+its attachment written or its emails queued.
+
+Buckets live in the cache (``NOTIFICATIONS_THROTTLE_CACHE_ALIAS``), which
+must be shared between workers (``CACHE_BACKEND=file`` or Redis) for the
+limits to hold across processes. The read-modify-write is not atomic across
+processes, so concurrent requests can slip a token or two past a bucket
+-- the same trade-off DRF's own cache throttles make.
+"""
+from __future__ import annotations
+
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+KEY_PREFIX = "notifications:throttle"
+
+
+def get_cache():
+    return caches[getattr(settings, "NOTIFICATIONS_THROTTLE_CACHE_ALIAS", "default")]
+
+
+def is_enabled() -> bool:
+    return bool(getattr(settings, "NOTIFICATIONS_THROTTLE", True))
+
+
+class TokenBucket:
+    def __init__(self, key: str, burst: float, rate: float):
+        self.key = f"{KEY_PREFIX}:{key}"
+        self.burst = burst
+        self.rate = rate
+
+    def take(self, now: float | None = None) -> float:
+        """
+        Take one token. Returns ``0`` on success, otherwise the seconds until
+        a token will be available (nothing is taken).
+        """
+        if self.rate <= 0 or self.burst <= 0:
+            return 0.0
+        now = time.time() if now is None else now
+        tokens = self._tokens(now)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._store(tokens, now)
+        return wait
+
+    def give_back(self, now: float | None = None) -> None:
+        """Return the token an earlier ``take()`` removed."""
+        if self.rate <= 0 or self.burst <= 0:
+            return
+        now = time.time() if now is None else now
+        self._store(min(self.burst, self._tokens(now) + 1), now)
+
+    def _tokens(self, now: float) -> float:
+        tokens, stamp = get_cache().get(self.key, (self.burst, now))
+        return min(self.burst, tokens + max(now - stamp, 0) * self.rate)
+
+    def _store(self, tokens: float, now: float) -> None:
+        # Keep the entry only as long as it takes the bucket to fill up again;
+        # after that a missing entry and a full bucket are the same thing.
+        get_cache().set(
+            self.key, (tokens, now), timeout=math.ceil(self.burst / self.rate) + 1
+        )
+
+
+class ContactFormThrottle(BaseThrottle):
+    """
+    Per-IP then global token buckets for ``POST /api/notifications/``.
+
+    The global bucket is only charged for requests the per-IP bucket lets
+    through, so one client hammering the form cannot use up everyone
+    else's share; and a request the global bucket refuses gets its per-IP
+    token back, so a flood does not also lock out the clients caught in it.
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_buckets(self, request) -> list[TokenBucket]:
+        return [
+            TokenBucket(
+                f"ip:{self.get_ident(request)}",
+                float(getattr(settings, "NOTIFICATIONS_THROTTLE_IP_BURST", 5)),
+                float(getattr(settings, "NOTIFICATIONS_THROTTLE_IP_RATE", 1 / 60)),
+            ),
+            TokenBucket(
+                "global",
+                float(getattr(settings, "NOTIFICATIONS_THROTTLE_GLOBAL_BURST", 60)),
+                float(getattr(settings, "NOTIFICATIONS_THROTTLE_GLOBAL_RATE", 1)),
+            ),
+        ]
+
+    def allow_request(self, request, view) -> bool:
+        if not is_enabled():
+            return True
+        now = time.time()
+        taken = []
+        for bucket in self.get_buckets(request):
+            wait = bucket.take(now)
+            if wait:
+                for earlier in taken:
+                    earlier.give_back(now)
+                self.wait_seconds = wait
+                return False
+            taken.append(bucket)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
@@ -0,0 +1,117 @@
+# notifications/uploads.py
+"""
+Upload handling for contact-form attachments.
+
+``StreamingAttachmentUploadHandler`` replaces Django's default handlers on
+the notifications endpoint: every chunk goes straight to a temporary file
+(never into memory), the upload is abandoned as soon as it passes
+``MAX_UPLOAD_SIZE``, and the SHA-256 and real file type are worked out while
+the bytes stream past, so nothing has to re-read the file afterwards.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+
+# Leading bytes -> detected type. DOCX/PPTX are ZIP containers and
+# DOC/PPT are OLE compound files, so those share a signature.
+FILE_SIGNATURES = (
+    (b"%PDF-", "pdf"),
+    (b"PK\x03\x04", "zip"),
+    (b"PK\x05\x06", "zip"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+)
+SNIFF_BYTES = max(len(signature) for signature, _ in FILE_SIGNATURES)
+
+# Which detected type each allowed extension must have.
+EXTENSION_TYPES = {
+    "pdf": "pdf",
+    "doc": "ole",
+    "ppt": "ole",
+    "docx": "zip",
+    "pptx": "zip",
+    "zip": "zip",
+    "jpg": "jpeg",
+    "jpeg": "jpeg",
+    "png": "png",
+}
+
+
+def sniff_file_type(head: bytes) -> str | None:
+    for signature, file_type in FILE_SIGNATURES:
+        if head.startswith(signature):
+            return file_type
+    return None
+
+
+def max_upload_size() -> int:
+    return int(getattr(settings, "MAX_UPLOAD_SIZE", 5 * 1024 * 1024))
+
+
+class StreamingAttachmentUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream uploads to disk, enforce the size limit while reading, and attach
+    ``sha256`` and ``sniffed_type`` to the resulting file object.
+
+    A file over the limit is skipped (its remaining bytes are read and
+    discarded, never stored) and the reason is recorded in
+    ``request.upload_errors`` for the serializer to report.
+    """
+
+    def __init__(self, request=None, max_size: int | None = None):
+        super().__init__(request)
+        self.max_size = max_size or max_upload_size()
+
+    def new_file(
+        self,
+        field_name,
+        file_name,
+        content_type,
+        content_length=None,
+        charset=None,
+        content_type_extra=None,
+    ):
+        # Forget the previous file so an abort here never closes it.
+        self.__dict__.pop("file", None)
+        self.received = 0
+        self.head = b""
+        self.hasher = hashlib.sha256()
+        if content_length is not None and content_length > self.max_size:
+            self._reject(field_name)
+        super().new_file(
+            field_name,
+            file_name,
+            content_type,
+            content_length,
+            charset,
+            content_type_extra,
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self._reject(self.field_name)
+        if len(self.head) < SNIFF_BYTES:
+            self.head += raw_data[: SNIFF_BYTES - len(self.head)]
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.hasher.hexdigest()
+        uploaded.sniffed_type = sniff_file_type(self.head)
+        return uploaded
+
+    def _reject(self, field_name):
+        if self.request is not None:
+            if not hasattr(self.request, "upload_errors"):
+                self.request.upload_errors = {}
+            limit_mb = self.max_size // (1024 * 1024)
+            self.request.upload_errors[field_name] = (
+                f"File size must be less than {limit_mb}MB."
+            )
+        raise SkipFile()
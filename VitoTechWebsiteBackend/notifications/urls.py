@@ -2,11 +2,14 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from .events import notification_events
 from .views import NotificationViewSet
 
 router = DefaultRouter()
 router.register("notifications", NotificationViewSet, basename="notification")
 
 urlpatterns = [
+    # Before the router, whose detail route would take "events" for a pk.
+    path("notifications/events/", notification_events, name="notification-events"),
     path("", include(router.urls)),
 ]
\ No newline at end of file
@@ -1,17 +1,46 @@
 # notifications/views.py
 from __future__ import annotations
 
-from django.db import models
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
 from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
+from VitoTechWebsite.profiling import timed
 
-from .models import Notification
-from .serializers import NotificationSerializer
-from .emails import send_admin_notification_email, send_user_ack_email
+from . import cache as response_cache
+from .bulk import bulk_delete_notifications, bulk_set_read
+from .conditional import make_etag, not_modified, queryset_validators, set_validators
+from .db_metrics import connection_stats
+from .downloads import attachment_response
+from .events import event_row, issue_ticket
+from .export import CSVRenderer, NDJSONRenderer, export_response
+from .fast_serializers import FastNotificationSerializer
+from .idempotency import HEADER as IDEMPOTENCY_HEADER
+from .idempotency import MAX_KEY_LENGTH, find_original, submission_fingerprint
+from .models import Notification, NotificationCounter, NotificationEvent
+from .pagination import NotificationPagination
+from .replica import allow_replica_reads, read_database
+from .search import is_ranked, search_notifications
+from .serializers import (
+    BulkDeleteReportSerializer,
+    BulkSelectionSerializer,
+    BulkUpdateResultSerializer,
+    EventTicketSerializer,
+    NotificationListSerializer,
+    NotificationSerializer,
+)
+from .throttling import ContactFormThrottle
+from .uploads import StreamingAttachmentUploadHandler
+from .outbox import enqueue_notification_emails
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
@@ -19,22 +48,72 @@ class NotificationViewSet(viewsets.ModelViewSet):
     Contact messages API.
 
     Public:
-      - POST /api/notifications/             -> create (website contact form)
+      - POST /api/notifications/             -> create (website contact form),
+                                                throttled per IP and globally;
+                                                repeats (Idempotency-Key header or
+                                                same message) return the original
 
     Admin (JWT + is_staff):
-      - GET  /api/notifications/             -> list
+      - GET  /api/notifications/             -> list (?cursor=&page_size=)
       - GET  /api/notifications/{id}/        -> retrieve
+
+      list and retrieve take ?fields=id,name,... (sparse fieldset) and list
+      takes ?view=compact (no message body); only those columns are fetched.
       - PATCH/PUT /api/notifications/{id}/   -> update
       - DELETE /api/notifications/{id}/      -> delete
+      - GET  /api/notifications/{id}/download/ -> attachment file (Range supported)
       - POST /api/notifications/{id}/mark_read/
       - POST /api/notifications/{id}/mark_unread/
+      - POST /api/notifications/bulk_mark_read/    -> {"ids": [...]} or ?filters
+      - POST /api/notifications/bulk_mark_unread/  -> {"ids": [...]} or ?filters
+      - POST /api/notifications/bulk_delete/       -> {"ids": [...]} or ?filters
       - GET  /api/notifications/stats/       -> total, read, unread
+      - GET  /api/notifications/export/      -> streamed CSV (?format=ndjson for NDJSON)
+      - GET  /api/notifications/cache_stats/ -> response cache hit/miss metrics
+      - GET  /api/notifications/db_stats/    -> database connection/pool metrics
+      - POST /api/notifications/event_ticket/ -> short-lived ticket for the stream
+      - GET  /api/notifications/events/      -> Server-Sent Events stream of changes
+                                                (?ticket=; ASGI only, notifications/events.py)
+
+    list, retrieve and stats send ETag/Last-Modified, answer
+    If-None-Match/If-Modified-Since with 304 Not Modified, and are served
+    from the response cache until the next write. With DB_REPLICA_HOST set,
+    they and export read from the replica (see replica.py).
     """
 
-    queryset = Notification.objects.all().order_by("-created_at")
+    queryset = Notification.objects.all().order_by("-created_at", "-id")
     serializer_class = NotificationSerializer
+    pagination_class = NotificationPagination
     parser_classes = [MultiPartParser, FormParser]  # MPYA: Support file uploads
     permission_classes = [IsAdminUser]
+    true_values = ("true", "1", "yes")
+    false_values = ("false", "0", "no")
+    # List pages skip DRF field-by-field serialization (fast_serializers.py).
+    fast_serialization = True
+    # Read from the replica when one is configured (replica.py).
+    replica_actions = ("list", "retrieve", "stats", "export")
+
+    def initialize_request(self, request, *args, **kwargs):
+        request = super().initialize_request(request, *args, **kwargs)
+        if self.action == "create":
+            # Stream attachments to a temp file and stop at MAX_UPLOAD_SIZE,
+            # instead of buffering up to the limit in memory.
+            request._request.upload_handlers = [
+                StreamingAttachmentUploadHandler(request._request)
+            ]
+        return request
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions:
+            allow_replica_reads()
+
+    def perform_content_negotiation(self, request, force=False):
+        # Downloads go to whatever the browser says it accepts (application/pdf,
+        # image/*, ...); errors on them are still rendered as JSON.
+        return super().perform_content_negotiation(
+            request, force=force or self.action == "download"
+        )
 
     def get_permissions(self):
         """
@@ -46,85 +125,380 @@ class NotificationViewSet(viewsets.ModelViewSet):
             return [AllowAny()]
         return [IsAdminUser()]
 
+    def get_throttles(self):
+        # Checked in initial(), before the multipart body is read.
+        if self.action == "create":
+            return [ContactFormThrottle()]
+        return super().get_throttles()
+
+    def get_list_filters(self) -> dict:
+        """
+        The list filters in the query string that actually narrow the
+        queryset: ``is_read`` as a bool, ``service`` and ``search`` when not
+        blank. An ``is_read`` that isn't a boolean is a 400, never ignored.
+        """
+        params = self.request.query_params
+        filters = {}
+        is_read = params.get("is_read")
+        if is_read:
+            value = is_read.lower()
+            if value in self.true_values:
+                filters["is_read"] = True
+            elif value in self.false_values:
+                filters["is_read"] = False
+            else:
+                raise ValidationError(
+                    {"is_read": [f"Must be one of: {', '.join(self.true_values + self.false_values)}."]}
+                )
+        for name in ("service", "search"):
+            value = (params.get(name) or "").strip()
+            if value:
+                filters[name] = value
+        return filters
+
     def get_queryset(self):
         qs = super().get_queryset()
+        filters = self.get_list_filters()
 
         # Filter by is_read=true|false if provided
-        is_read = self.request.query_params.get("is_read")
-        if is_read is not None:
-            value = is_read.lower()
-            if value in ("true", "1", "yes"):
-                qs = qs.filter(is_read=True)
-            elif value in ("false", "0", "no"):
-                qs = qs.filter(is_read=False)
+        if "is_read" in filters:
+            qs = qs.filter(is_read=filters["is_read"])
 
         # Filter by service if provided
-        service = self.request.query_params.get("service")
-        if service:
-            qs = qs.filter(service=service)
-
-        # Simple text search across name / email / phone / company / message
-        search = self.request.query_params.get("search")
-        if search:
-            qs = qs.filter(
-                models.Q(name__icontains=search)
-                | models.Q(email__icontains=search)
-                | models.Q(phone__icontains=search)
-                | models.Q(company__icontains=search)
-                | models.Q(message__icontains=search)
-            )
+        if "service" in filters:
+            qs = qs.filter(service=filters["service"])
+
+        # Full-text search across name / email / phone / company / message,
+        # ranked by relevance (falls back to icontains without an index)
+        if "search" in filters:
+            qs = search_notifications(qs, filters["search"])
+
+        if self.action in ("list", "retrieve"):
+            # Fetch only the columns the response needs (plus the keyset
+            # the paginator reads), so large message bodies stay in the DB.
+            columns = self.get_serializer_class().columns_for(self.get_requested_fields())
+            if self.action == "list":
+                columns += [
+                    name for name in (t.lstrip("-") for t in self.get_keyset_ordering(qs))
+                    if self._is_column(name)
+                ]
+            qs = qs.only(*columns)
 
         return qs
 
-    def perform_create(self, serializer: NotificationSerializer) -> None:
+    @staticmethod
+    def _is_column(name: str) -> bool:
+        try:
+            Notification._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    def get_serializer_class(self):
+        if self.action == "list" and self.request.query_params.get("view") == "compact":
+            return NotificationListSerializer
+        return super().get_serializer_class()
+
+    def get_requested_fields(self) -> list[str] | None:
+        """``?fields=`` for list/retrieve, validated against the serializer."""
+        raw = self.request.query_params.get("fields")
+        if not raw or self.action not in ("list", "retrieve"):
+            return None
+        fields = [name.strip() for name in raw.split(",") if name.strip()]
+        allowed = self.get_serializer_class().field_names()
+        unknown = [name for name in fields if name not in allowed]
+        if unknown:
+            raise ValidationError(
+                {"fields": [f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}."]}
+            )
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ("list", "retrieve"):
+            kwargs.setdefault("fields", self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_keyset_ordering(self, queryset):
+        """Paginate ranked search results by relevance, everything else by date."""
+        if is_ranked(queryset):
+            return ("-search_rank", "-id")
+        return self.pagination_class.ordering
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("fields", str, description="Comma-separated fields to return."),
+            OpenApiParameter("view", str, enum=["compact"], description="Compact inbox rows."),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        key, cached = response_cache.lookup(request)
+        if cached is not None:
+            return cached
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = queryset_validators(request, queryset)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+        response = self._fast_list(queryset)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        set_validators(response, etag, last_modified)
+        return response_cache.store(key, response, etag, last_modified)
+
+    def _fast_list(self, queryset):
         """
-        Save the notification and send e-mails:
+        Serve the page from ``values()`` rows through the precompiled
+        serializer; ``None`` if the serializer can't be compiled.
+        """
+        if not self.fast_serialization:
+            return None
+        fast = FastNotificationSerializer.compile(self.get_serializer())
+        if fast is None:
+            return None
+        keyset = [term.lstrip("-") for term in self.get_keyset_ordering(queryset)]
+        rows = queryset.values(*dict.fromkeys([*fast.columns, *keyset]))
+        page = self.paginate_queryset(rows)
+        with timed("serialize"):
+            data = fast.many(page)
+        return self.get_paginated_response(data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("fields", str, description="Comma-separated fields to return."),
+        ]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        key, cached = response_cache.lookup(request)
+        if cached is not None:
+            return cached
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            etag, last_modified = queryset_validators(
+                request, queryset.filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+            )
+        except (TypeError, ValueError):
+            # Malformed id: let get_object() turn it into a 404.
+            return super().retrieve(request, *args, **kwargs)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+        instance = self.get_object()
+        with timed("serialize"):
+            data = self.get_serializer(instance).data
+        response = Response(data)
+        set_validators(response, etag, last_modified)
+        return response_cache.store(key, response, etag, last_modified)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                IDEMPOTENCY_HEADER,
+                str,
+                location=OpenApiParameter.HEADER,
+                description="Client-chosen key; a retry with the same key returns the original message.",
+            ),
+        ]
+    )
+    def create(self, request, *args, **kwargs):
+        """
+        Save a contact message, unless it repeats an earlier one (same
+        Idempotency-Key, or same sender/message/attachment within the
+        duplicate window): then the original is returned and nothing is
+        stored or e-mailed again.
+        """
+        with timed("parse"):
+            data = request.data
+        serializer = self.get_serializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        key = request.headers.get(IDEMPOTENCY_HEADER) or None
+        if key is not None and len(key) > MAX_KEY_LENGTH:
+            raise ValidationError(
+                {IDEMPOTENCY_HEADER: f"Must be at most {MAX_KEY_LENGTH} characters."}
+            )
+        fingerprint = submission_fingerprint(serializer.validated_data)
+
+        original = find_original(Notification.objects.all(), key, fingerprint)
+        if original is None:
+            try:
+                with timed("perform_create"):
+                    self.perform_create(serializer, idempotency_key=key, fingerprint=fingerprint)
+            except IntegrityError:
+                # A concurrent retry with the same key committed first.
+                original = find_original(Notification.objects.all(), key, fingerprint)
+                if original is None:
+                    raise
+            else:
+                with timed("serialize"):
+                    data = serializer.data
+                headers = self.get_success_headers(data)
+                return Response(data, status=status.HTTP_201_CREATED, headers=headers)
+        return self._replay(original, key, fingerprint)
+
+    def _replay(self, original: Notification, key: str | None, fingerprint: str) -> Response:
+        if key is not None and original.idempotency_key == key and original.fingerprint != fingerprint:
+            return Response(
+                {"detail": f"{IDEMPOTENCY_HEADER} was already used for a different message."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        response = Response(self.get_serializer(original).data, status=status.HTTP_201_CREATED)
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    def perform_create(self, serializer: NotificationSerializer, **extra) -> None:
+        """
+        Save the notification and queue its e-mails:
 
         - one to the VitoTech team (admin notification),
         - one to the visitor confirming receipt.
-        
-        NOTE: Emails are sent in a background thread to prevent blocking the response
-        if the email server is slow or unreachable (e.g. firewall issues).
+
+        NOTE: E-mails are written to the outbox in the same transaction as
+        the notification and delivered by ``manage.py deliver_emails``, so
+        the response never waits on (or fails because of) the mail server.
         """
-        notification = serializer.save()
+        with transaction.atomic():
+            notification = serializer.save(**extra)
+            enqueue_notification_emails(notification)
+            NotificationCounter.objects.record_created(notification)
+            NotificationEvent.objects.record(
+                NotificationEvent.CREATED, [notification.pk], event_row(notification)
+            )
+            response_cache.invalidate()
 
-        def send_emails_in_background(notif):
-            try:
-                # E-mail to internal VitoTech address (DEFAULT_FROM_EMAIL)
-                send_admin_notification_email(notif)
-                
-                # Acknowledgement e-mail to the visitor
-                send_user_ack_email(notif)
-            except Exception as e:
-                # Log error silently (or use logging module)
-                print(f"Error sending background emails: {e}")
-
-        # Start background thread
-        import threading
-        email_thread = threading.Thread(target=send_emails_in_background, args=(notification,))
-        email_thread.daemon = True
-        email_thread.start()
+    def perform_update(self, serializer: NotificationSerializer) -> None:
+        old = (serializer.instance.service, serializer.instance.is_read)
+        with transaction.atomic():
+            notification = serializer.save()
+            NotificationCounter.objects.record_changed(
+                old, (notification.service, notification.is_read)
+            )
+            NotificationEvent.objects.record(
+                NotificationEvent.UPDATED, [notification.pk], event_row(notification)
+            )
+            response_cache.invalidate()
+
+    def _set_read(self, notification: Notification, is_read: bool) -> None:
+        """
+        Flip ``is_read`` with a conditional UPDATE so concurrent clicks can
+        only change (and count) the message once.
+        """
+        now = timezone.now()
+        read_at = now if is_read else None
+        with transaction.atomic():
+            changed = Notification.objects.filter(
+                pk=notification.pk, is_read=not is_read
+            ).update(is_read=is_read, read_at=read_at, updated_at=now)
+            if changed:
+                NotificationCounter.objects.record_read_changed(
+                    notification.service, 1 if is_read else -1
+                )
+                NotificationEvent.objects.record(
+                    NotificationEvent.READ if is_read else NotificationEvent.UNREAD,
+                    [notification.pk],
+                )
+                response_cache.invalidate()
+        if changed:
+            notification.is_read = is_read
+            notification.read_at = read_at
+            notification.updated_at = now
+
+    @extend_schema(
+        responses={
+            (200, "application/octet-stream"): OpenApiTypes.BINARY,
+            (206, "application/octet-stream"): OpenApiTypes.BINARY,
+        }
+    )
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        """
+        GET /api/notifications/{id}/download/
+
+        The message's attachment as a file download. Range requests get
+        206 Partial Content; behind nginx the bytes are sent by nginx via
+        X-Accel-Redirect (NOTIFICATIONS_ACCEL_REDIRECT, see downloads.py).
+        """
+        return attachment_response(request, self.get_object())
 
     @action(detail=True, methods=["post"])
     def mark_read(self, request, pk=None):
         notification = self.get_object()
-        if not notification.is_read:
-            notification.is_read = True
-            notification.read_at = timezone.now()
-            notification.save(update_fields=["is_read", "read_at"])
+        self._set_read(notification, True)
         serializer = self.get_serializer(notification)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["post"])
     def mark_unread(self, request, pk=None):
         notification = self.get_object()
-        if notification.is_read:
-            notification.is_read = False
-            notification.read_at = None
-            notification.save(update_fields=["is_read", "read_at"])
+        self._set_read(notification, False)
         serializer = self.get_serializer(notification)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def get_bulk_queryset(self, request):
+        """
+        Messages a bulk action applies to: the ``ids`` in the body, or
+        everything matching the list filters in the query string. One of
+        the two is required so an empty request never touches every row;
+        filters that would be ignored (blank, or an unknown ``is_read``)
+        don't count as a selection.
+        """
+        serializer = BulkSelectionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data.get("ids")
+        queryset = self.get_queryset()
+        if ids:
+            return queryset.filter(pk__in=ids)
+        if not self.get_list_filters():
+            raise ValidationError(
+                {"ids": ["Provide ids or at least one of: is_read, service, search."]}
+            )
+        return queryset
+
+    @extend_schema(request=BulkSelectionSerializer, responses=BulkUpdateResultSerializer)
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[JSONParser, FormParser, MultiPartParser],
+    )
+    def bulk_mark_read(self, request):
+        """
+        POST /api/notifications/bulk_mark_read/
+
+        "Mark all as read" in one UPDATE, e.g. ``?is_read=false`` for the
+        whole inbox. Returns only the number of messages that changed.
+        """
+        updated = bulk_set_read(self.get_bulk_queryset(request), True)
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+    @extend_schema(request=BulkSelectionSerializer, responses=BulkUpdateResultSerializer)
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[JSONParser, FormParser, MultiPartParser],
+    )
+    def bulk_mark_unread(self, request):
+        """
+        POST /api/notifications/bulk_mark_unread/
+        """
+        updated = bulk_set_read(self.get_bulk_queryset(request), False)
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+    @extend_schema(request=BulkSelectionSerializer, responses=BulkDeleteReportSerializer)
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[JSONParser, FormParser, MultiPartParser],
+    )
+    def bulk_delete(self, request):
+        """
+        POST /api/notifications/bulk_delete/
+
+        Deletes the selected messages in one statement. Attachment files no
+        longer used by any message are removed in the background; the
+        response reports how many rows went and how many bytes will be freed.
+        """
+        report = bulk_delete_notifications(self.get_bulk_queryset(request))
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
     @action(detail=False, methods=["get"])
     def stats(self, request):
         """
@@ -137,11 +511,85 @@ class NotificationViewSet(viewsets.ModelViewSet):
           "unread": 4
         }
         """
-        qs = self.get_queryset()
-        total = qs.count()
-        read = qs.filter(is_read=True).count()
-        unread = total - read
+        key, cached = response_cache.lookup(request)
+        if cached is not None:
+            return cached
+        filters = self.get_list_filters()
+        counts = None
+        if "is_read" not in filters and "search" not in filters:
+            # Unfiltered (or per-service) stats: one primary-key lookup.
+            counts = NotificationCounter.objects.stats(filters.get("service"))
+
+        if counts is None:
+            totals = self.get_queryset().aggregate(
+                total=Count("id"),
+                read=Count("id", filter=Q(is_read=True)),
+            )
+            counts = {
+                "total": totals["total"],
+                "read": totals["read"],
+                "unread": totals["total"] - totals["read"],
+            }
+
+        # The counts are as cheap as any validator, so they are the ETag.
+        etag = make_etag(request, counts)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        response = set_validators(Response(counts, status=status.HTTP_200_OK), etag)
+        return response_cache.store(key, response, etag)
+
+    @extend_schema(
+        responses={
+            (200, "text/csv"): OpenApiTypes.STR,
+            (200, "application/x-ndjson"): OpenApiTypes.STR,
+        }
+    )
+    @action(detail=False, methods=["get"], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        GET /api/notifications/export/?format=csv|ndjson
+
+        Streams every message matching the list filters (is_read, service,
+        search) without pagination, reading the table in chunks.
+        """
+        # Bound now: the rows are read while streaming, after this request
+        # has left the router's view.
+        queryset = self.filter_queryset(self.get_queryset()).using(read_database())
+        return export_response(queryset, request.accepted_renderer.format, request)
+
+    @extend_schema(request=None, responses=EventTicketSerializer)
+    @action(detail=False, methods=["post"])
+    def event_ticket(self, request):
+        """
+        POST /api/notifications/event_ticket/
+
+        A ticket for ``GET /api/notifications/events/?ticket=``, so the
+        browser's EventSource never carries the access token in its URL.
+        """
+        ttl = int(getattr(settings, "NOTIFICATIONS_EVENT_TICKET_TTL", 30))
         return Response(
-            {"total": total, "read": read, "unread": unread},
+            {"ticket": issue_ticket(request.user, request.auth), "expires_in": ttl},
             status=status.HTTP_200_OK,
-        )
\ No newline at end of file
+        )
+
+    @action(detail=False, methods=["get"])
+    def cache_stats(self, request):
+        """
+        GET /api/notifications/cache_stats/
+
+        Response cache hits, misses and stores for the worker that answers,
+        plus the cache backend and the current invalidation generation.
+        """
+        return Response(response_cache.cache_stats(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"])
+    def db_stats(self, request):
+        """
+        GET /api/notifications/db_stats/
+
+        Connections opened and requests served by the worker that answers,
+        per database alias, with the connection pool's statistics when
+        DB_POOL is on.
+        """
+        return Response(connection_stats(), status=status.HTTP_200_OK)
\ No newline at end of file
@@ -116,6 +116,32 @@ export async function formDataRequest<TResponse>(
   return data as TResponse;
 }
 
+// Download a protected file (admin only): the bytes plus the filename from
+// Content-Disposition. A plain link can't send the Authorization header.
+export async function authedDownload(
+  path: string
+): Promise<{ blob: Blob; filename: string | null }> {
+  const url =
+    path.startsWith("http://") || path.startsWith("https://")
+      ? path
+      : `${API_BASE_URL}${path}`;
+
+  const response = await fetch(url, { headers: getAuthHeaders("") });
+  if (!response.ok) {
+    const error: ApiError = new Error(`API error ${response.status}`);
+    error.status = response.status;
+    throw error;
+  }
+
+  const disposition = response.headers.get("Content-Disposition") ?? "";
+  const match =
+    /filename\*=utf-8''([^;]+)/i.exec(disposition) ?? /filename="([^"]+)"/i.exec(disposition);
+  return {
+    blob: await response.blob(),
+    filename: match ? decodeURIComponent(match[1]) : null,
+  };
+}
+
 // Helper for authenticated requests (admin only)
 export async function authedRequest<TResponse>(
   path: string,
@@ -1,5 +1,5 @@
 // src/lib/notifications.ts
-import { formDataRequest, authedRequest } from "./api";
+import { API_BASE_URL, formDataRequest, authedRequest, authedDownload } from "./api";
 
 export type NotificationDto = {
   id: number;
@@ -16,12 +16,25 @@ export type NotificationDto = {
   updated_at: string;
 };
 
+export type NotificationPage = {
+  next: string | null;
+  previous: string | null;
+  results: NotificationDto[];
+};
+
 export type NotificationStats = {
   total: number;
   read: number;
   unread: number;
 };
 
+// Payload of a live event: the affected ids, plus a compact row for
+// "created"/"updated". ids is null when one change touched more messages
+// than the server lists (NOTIFICATIONS_EVENT_MAX_IDS): refetch instead.
+export type NotificationEventData = {
+  ids: number[] | null;
+};
+
 export type NotificationPayload = {
   name: string;
   email: string;
@@ -51,9 +64,20 @@ export async function createNotification(
   return formDataRequest<NotificationDto>("/api/notifications/", formData, "POST");
 }
 
-// Get all notifications (admin only)
-export async function getNotifications(): Promise<NotificationDto[]> {
-  return authedRequest<NotificationDto[]>("/api/notifications/");
+// Get a page of notifications, newest first (admin only).
+// Pass the `next`/`previous` URL of a previous page to move through the list.
+export async function getNotifications(
+  pageUrl = "/api/notifications/?page_size=100"
+): Promise<NotificationPage> {
+  return authedRequest<NotificationPage>(pageUrl);
+}
+
+// Mark every unread notification as read, loaded or not (admin only)
+export async function markAllNotificationsRead(): Promise<{ updated: number }> {
+  return authedRequest<{ updated: number }>(
+    "/api/notifications/bulk_mark_read/?is_read=false",
+    { method: "POST" }
+  );
 }
 
 // Get notification by ID (admin only)
@@ -61,6 +85,13 @@ export async function getNotification(id: number): Promise<NotificationDto> {
   return authedRequest<NotificationDto>(`/api/notifications/${id}/`);
 }
 
+// Download a notification's attachment (admin only)
+export async function downloadAttachment(
+  id: number
+): Promise<{ blob: Blob; filename: string | null }> {
+  return authedDownload(`/api/notifications/${id}/download/`);
+}
+
 // Mark notification as read (admin only)
 export async function markNotificationRead(id: number): Promise<NotificationDto> {
   return authedRequest<NotificationDto>(`/api/notifications/${id}/mark_read/`, {
@@ -78,4 +109,20 @@ export async function markNotificationUnread(id: number): Promise<NotificationDt
 // Get notification statistics (admin only)
 export async function getNotificationStats(): Promise<NotificationStats> {
   return authedRequest<NotificationStats>("/api/notifications/stats/");
-}
\ No newline at end of file
+}
+
+// Short-lived ticket for the live event stream (admin only)
+export async function getEventTicket(): Promise<{ ticket: string; expires_in: number }> {
+  return authedRequest<{ ticket: string; expires_in: number }>(
+    "/api/notifications/event_ticket/",
+    { method: "POST" }
+  );
+}
+
+// URL for an EventSource on the live event stream. The ticket, not the
+// access token, goes in the URL; pass the last event id seen to resume.
+export function notificationEventsUrl(ticket: string, lastEventId?: string): string {
+  const params = new URLSearchParams({ ticket });
+  if (lastEventId) params.set("last_event_id", lastEventId);
+  return `${API_BASE_URL}/api/notifications/events/?${params.toString()}`;
+}
@@ -14,10 +14,18 @@ import {
   FiUserPlus,
 } from "react-icons/fi";
 import {
+  getEventTicket,
+  getNotification,
   getNotifications,
+  markAllNotificationsRead,
   markNotificationRead,
   markNotificationUnread,
   getNotificationStats,
+  notificationEventsUrl,
+} from "../../../lib/notifications";
+import type {
+  NotificationDto,
+  NotificationEventData,
 } from "../../../lib/notifications";
 import { clearAdminToken } from "../../../lib/api";
 
@@ -42,12 +50,30 @@ export type MessagesOutletContext = {
   unread: number;
   read: number;
   loading: boolean;
+  hasMore: boolean;
+  loadingMore: boolean;
+  loadMore: () => void;
   error: string | null;
   refresh: () => void;
   handleToggleStatus: (id: number) => void;
   handleMarkAllRead: () => void;
 };
 
+function toContactMessage(n: NotificationDto): ContactMessage {
+  return {
+    id: n.id,
+    name: n.name,
+    email: n.email,
+    phone: n.phone,
+    company: n.company,
+    service: n.service,
+    message: n.message,
+    attachment: n.attachment,
+    status: n.is_read ? "read" : "unread",
+    createdAt: n.created_at,
+  };
+}
+
 export default function SidebarTopbar() {
   const navigate = useNavigate();
   const [sidebarOpen, setSidebarOpen] = useState(false);
@@ -59,6 +85,8 @@ export default function SidebarTopbar() {
 
   const [messages, setMessages] = useState<ContactMessage[]>([]);
   const [loading, setLoading] = useState<boolean>(false);
+  const [nextPage, setNextPage] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
   const [error, setError] = useState<string | null>(null);
   const [adminName, setAdminName] = useState<string | null>(null);
   const [stats, setStats] = useState({ total: 0, unread: 0, read: 0 });
@@ -99,25 +127,13 @@ export default function SidebarTopbar() {
     setError(null);
 
     try {
-      const [apiMessages, statsData] = await Promise.all([
+      const [page, statsData] = await Promise.all([
         getNotifications(),
         getNotificationStats(),
       ]);
 
-      const mapped: ContactMessage[] = apiMessages.map((n) => ({
-        id: n.id,
-        name: n.name,
-        email: n.email,
-        phone: n.phone,
-        company: n.company,
-        service: n.service,
-        message: n.message,
-        attachment: n.attachment,
-        status: n.is_read ? "read" : "unread",
-        createdAt: n.created_at,
-      }));
-
-      setMessages(mapped);
+      setMessages(page.results.map(toContactMessage));
+      setNextPage(page.next);
       setStats(statsData);
     } catch {
       setError("Failed to load messages. Please try again in a moment.");
@@ -130,6 +146,130 @@ export default function SidebarTopbar() {
     void loadNotifications();
   }, [loadNotifications]);
 
+  // Live updates from the server's event stream. The EventSource is opened
+  // with a short-lived ticket; whenever the stream ends (token expiry,
+  // deploys, network) it is re-opened with a fresh ticket, resuming after
+  // the last event seen.
+  useEffect(() => {
+    let source: EventSource | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let lastEventId: string | undefined;
+    let retryDelayMs = 3000;
+    let stopped = false;
+
+    const refreshStats = () => {
+      getNotificationStats()
+        .then(setStats)
+        .catch(() => undefined);
+    };
+
+    const upsert = (ids: number[]) => {
+      ids.forEach((id) => {
+        getNotification(id)
+          .then((n) => {
+            const message = toContactMessage(n);
+            setMessages((prev) =>
+              prev.some((m) => m.id === id)
+                ? prev.map((m) => (m.id === id ? message : m))
+                : [message, ...prev],
+            );
+          })
+          .catch(() => undefined);
+      });
+    };
+
+    const handlers: Record<string, (ids: number[]) => void> = {
+      created: upsert,
+      updated: upsert,
+      read: (ids) =>
+        setMessages((prev) =>
+          prev.map((m) => (ids.includes(m.id) ? { ...m, status: "read" } : m)),
+        ),
+      unread: (ids) =>
+        setMessages((prev) =>
+          prev.map((m) => (ids.includes(m.id) ? { ...m, status: "unread" } : m)),
+        ),
+      deleted: (ids) =>
+        setMessages((prev) => prev.filter((m) => !ids.includes(m.id))),
+    };
+
+    // Back off while the stream keeps failing (e.g. no ASGI server in dev).
+    const reconnect = () => {
+      if (stopped) return;
+      retryTimer = setTimeout(() => void connect(), retryDelayMs);
+      retryDelayMs = Math.min(retryDelayMs * 2, 60000);
+    };
+
+    const connect = async () => {
+      let ticket: string;
+      try {
+        ticket = (await getEventTicket()).ticket;
+      } catch {
+        reconnect();
+        return;
+      }
+      if (stopped) return;
+
+      source = new EventSource(notificationEventsUrl(ticket, lastEventId));
+      source.onopen = () => {
+        retryDelayMs = 3000;
+      };
+      Object.entries(handlers).forEach(([kind, handle]) => {
+        source?.addEventListener(kind, (event) => {
+          const message = event as MessageEvent<string>;
+          lastEventId = message.lastEventId || lastEventId;
+          const { ids } = JSON.parse(message.data) as NotificationEventData;
+          // Too many messages changed to list them: reload the first page.
+          if (ids === null) {
+            void loadNotifications();
+          } else {
+            handle(ids);
+          }
+          refreshStats();
+        });
+      });
+      source.addEventListener("reset", (event) => {
+        lastEventId = (event as MessageEvent<string>).lastEventId || lastEventId;
+        void loadNotifications();
+      });
+      source.onerror = () => {
+        // The browser would retry with the same, by now expired, ticket.
+        source?.close();
+        reconnect();
+      };
+    };
+
+    void connect();
+    return () => {
+      stopped = true;
+      source?.close();
+      clearTimeout(retryTimer);
+    };
+  }, [loadNotifications]);
+
+  // Append the next (older) page by following the cursor the API returned.
+  const loadMore = useCallback(async () => {
+    if (!nextPage || loadingMore) return;
+    setLoadingMore(true);
+    setError(null);
+
+    try {
+      const page = await getNotifications(nextPage);
+      setMessages((prev) => {
+        const seen = new Set(prev.map((m) => m.id));
+        return [
+          ...prev,
+          ...page.results.filter((n) => !seen.has(n.id)).map(toContactMessage),
+        ];
+      });
+      setNextPage(page.next);
+    } catch {
+      setError("Failed to load more messages. Please try again in a moment.");
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [nextPage, loadingMore]);
+
   const handleToggleStatus = (id: number) => {
     void (async () => {
       const target = messages.find((m) => m.id === id);
@@ -162,20 +302,13 @@ export default function SidebarTopbar() {
 
   const handleMarkAllRead = () => {
     void (async () => {
-      const unreadIds = messages
-        .filter((m) => m.status === "unread")
-        .map((m) => m.id);
-
-      if (unreadIds.length === 0) return;
+      if (stats.unread === 0) return;
 
       try {
-        await Promise.all(unreadIds.map((id) => markNotificationRead(id)));
+        // One request for the whole inbox, including pages not loaded yet.
+        await markAllNotificationsRead();
 
-        setMessages((prev) =>
-          prev.map((m) =>
-            unreadIds.includes(m.id) ? { ...m, status: "read" } : m,
-          ),
-        );
+        setMessages((prev) => prev.map((m) => ({ ...m, status: "read" })));
 
         setStats((prev) => ({
           ...prev,
@@ -228,6 +361,11 @@ export default function SidebarTopbar() {
     unread: stats.unread,
     read: stats.read,
     loading,
+    hasMore: nextPage !== null,
+    loadingMore,
+    loadMore: () => {
+      void loadMore();
+    },
     error,
     refresh: () => {
       void loadNotifications();
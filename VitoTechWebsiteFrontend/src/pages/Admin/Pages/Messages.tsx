@@ -21,6 +21,9 @@ export default function Messages() {
   const {
     messages,
     loading,
+    hasMore,
+    loadingMore,
+    loadMore,
     handleToggleStatus,
     handleMarkAllRead,
   } = useMessagesContext();
@@ -227,6 +230,19 @@ export default function Messages() {
           </>
         )}
       </div>
+
+      {!loading && hasMore && (
+        <div className="mt-4 flex justify-center">
+          <button
+            type="button"
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="rounded-md border border-slate-300 bg-white px-4 py-2 text-xs font-semibold text-slate-700 transition hover:border-indigo-400 hover:bg-indigo-50 disabled:cursor-not-allowed disabled:opacity-60"
+          >
+            {loadingMore ? "Loading..." : "Load older messages"}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
\ No newline at end of file
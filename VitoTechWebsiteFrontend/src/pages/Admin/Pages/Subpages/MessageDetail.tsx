@@ -2,7 +2,7 @@
 import { useEffect, useState } from "react";
 import { useParams, useNavigate, Link } from "react-router-dom";
 import { FiDownload, FiFile } from "react-icons/fi";
-import { getNotification } from "../../../../lib/notifications";
+import { downloadAttachment, getNotification } from "../../../../lib/notifications";
 import type { NotificationDto } from "../../../../lib/notifications";
 
 function formatDate(dateString: string) {
@@ -36,15 +36,23 @@ export default function MessageDetail() {
     void loadMessage();
   }, [id]);
 
-  const handleDownloadAttachment = () => {
+  const handleDownloadAttachment = async () => {
     if (message?.attachment) {
-      // Create a temporary link to download the file
-      const link = document.createElement('a');
-      link.href = message.attachment;
-      link.download = message.attachment.split('/').pop() || 'attachment';
-      document.body.appendChild(link);
-      link.click();
-      document.body.removeChild(link);
+      // Attachments are private: fetch with the admin token, then hand the
+      // bytes to a temporary link to download the file
+      try {
+        const { blob, filename } = await downloadAttachment(message.id);
+        const url = URL.createObjectURL(blob);
+        const link = document.createElement('a');
+        link.href = url;
+        link.download = filename || message.attachment.split('/').pop() || 'attachment';
+        document.body.appendChild(link);
+        link.click();
+        document.body.removeChild(link);
+        URL.revokeObjectURL(url);
+      } catch (err) {
+        console.error("Error downloading attachment:", err);
+      }
     }
   };
 
@@ -152,7 +160,7 @@ export default function MessageDetail() {
           <div className="mt-2">
             {message.attachment ? (
               <button
-                onClick={handleDownloadAttachment}
+                onClick={() => void handleDownloadAttachment()}
                 className="inline-flex items-center gap-2 rounded-md bg-blue-50 px-3 py-2 text-xs font-semibold text-blue-700 hover:bg-blue-100"
               >
                 <FiDownload className="h-4 w-4" />